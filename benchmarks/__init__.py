@@ -0,0 +1,6 @@
+"""
+Benchmark-Suite: misst Durchsatz, Latenz, Speicher und Dateischreibvorgänge der
+Pipeline Plan → Tickets → Tests → Code gegen einen lokalen Stub-MCP-Server.
+
+Aufruf: `python -m benchmarks.run --help`
+"""
@@ -0,0 +1,334 @@
+"""
+benchmarks/run.py
+
+Lastmessung der Pipeline Plan → Tickets → Tests → Code gegen den Stub-MCP-Server
+(`benchmarks.stub_server`) bei mehreren Nebenläufigkeitsstufen.
+
+Modi:
+  - app: Jede Sitzung meldet sich mit eigenem User an und ruft `/plan`,
+    `/tickets` und `/generate_all` einer per `create_app()` erzeugten App auf.
+  - planner: Jede Sitzung ruft die Planner-Module direkt auf, ohne Flask und
+    ohne Speicherung.
+
+Je Stufe werden Latenz-Perzentile (p50/p95/p99) pro Route, Durchsatz,
+Spitzen-Speicherverbrauch und die Anzahl der Schreibzugriffe auf das
+Dateisystem ausgegeben. Alle Anfragen laufen mit `fresh`, damit der
+Antwort-Cache keine Messung verfälscht.
+
+Beispiel:
+    python -m benchmarks.run --concurrency 1 4 8 --sessions 8 --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.stub_server import StubConfig, StubServer
+from core.response_cache import bypass
+from planner.code_generator import generate_code_for_ticket
+from planner.planner import generate_project_plan
+from planner.test_generator import generate_tests
+from planner.ticket_generator import generate_tickets
+from storage import log_store
+from web_app import create_app
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+
+class FsCounter:
+    """
+    Zählt Dateisystem-Schreibzugriffe über einen Audit-Hook.
+
+    Audit-Hooks lassen sich nicht wieder entfernen; deshalb wird genau ein Hook
+    pro Prozess installiert und nur bei gesetztem `enabled` gezählt.
+    """
+
+    _installed = False
+
+    def __init__(self):
+        self.enabled = False
+        self.counts = {"open_write": 0, "rename": 0, "mkdir": 0, "remove": 0}
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        if not FsCounter._installed:
+            sys.addaudithook(self._hook)
+            FsCounter._installed = True
+
+    def _hook(self, event: str, args: tuple) -> None:
+        if not self.enabled:
+            return
+        if event == "open":
+            _, mode, flags = args
+            if isinstance(mode, str):
+                writing = any(c in mode for c in "wax+")
+            else:
+                writing = bool((flags or 0) & _WRITE_FLAGS)
+            if not writing:
+                return
+            kind = "open_write"
+        elif event == "os.rename":  # auch os.replace
+            kind = "rename"
+        elif event == "os.mkdir":
+            kind = "mkdir"
+        elif event == "os.remove":
+            kind = "remove"
+        else:
+            return
+        with self._lock:
+            self.counts[kind] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            for kind in self.counts:
+                self.counts[kind] = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Perzentil nach dem Nearest-Rank-Verfahren (None bei leerer Liste)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Sammelt Latenzen und Fehler je Route über alle Sitzungen einer Stufe."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def measure(self, route: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn()
+        except Exception:
+            with self._lock:
+                self.errors[route] = self.errors.get(route, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.setdefault(route, []).append(elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                route: {
+                    "count": len(values),
+                    "errors": self.errors.get(route, 0),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                }
+                for route, values in self.latencies.items()
+            }
+
+
+class AppDriver:
+    """Führt Sitzungen über den Flask-Test-Client einer frisch erzeugten App aus."""
+
+    def __init__(self, workdir: str, api_url: str, max_workers: int):
+        self.workdir = workdir
+        self.api_url = api_url
+        self.max_workers = max_workers
+        self.app = create_app({
+            "TESTING": True,
+            "SECRET_KEY": "benchmark",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "GENERATE_ALL_MAX_WORKERS": max_workers,
+        })
+        self._users = 0
+
+    def prepare(self, sessions: int) -> List[Any]:
+        """Legt je Sitzung einen eingeloggten Client an (nicht Teil der Messung)."""
+        clients = []
+        for _ in range(sessions):
+            self._users += 1
+            client = self.app.test_client()
+            client.post("/register", data={"username": f"bench{self._users}", "password": "pw"})
+            clients.append(client)
+        return clients
+
+    def _post(self, client, route: str, payload: dict) -> dict:
+        rv = client.post(route, json=dict(payload, api_url=self.api_url, model="stub", fresh=True))
+        if rv.status_code != 200:
+            raise RuntimeError(f"{route}: {rv.status_code} {rv.get_data(as_text=True)[:200]}")
+        return rv.get_json()
+
+    def session(self, client, name: str, recorder: Recorder) -> None:
+        plan = recorder.measure("/plan", lambda: self._post(client, "/plan", {
+            "api_key": "bench-key",
+            "project_name": name,
+            "project_desc": "Benchmark-Projekt",
+            "project_path": self.workdir,
+        }))
+        folder = plan["project_folder"]
+        recorder.measure("/tickets", lambda: self._post(client, "/tickets", {
+            "project_folder": folder, "plan_text": plan["plan"],
+        }))
+        result = recorder.measure("/generate_all", lambda: self._post(client, "/generate_all", {
+            "project_folder": folder, "max_workers": self.max_workers,
+        }))
+        failed = [r for r in result["results"] if r.get("status") == "error"]
+        if failed:
+            raise RuntimeError(f"/generate_all: {len(failed)} Ticket(s) fehlgeschlagen")
+
+
+class PlannerDriver:
+    """Führt Sitzungen direkt über die Planner-Module aus (ohne Flask und Speicherung)."""
+
+    def __init__(self, workdir: str, api_url: str, max_workers: int):
+        self.workdir = workdir
+        self.api_url = api_url
+        self.max_workers = max_workers
+
+    def prepare(self, sessions: int) -> List[Any]:
+        return [None] * sessions
+
+    def session(self, client, name: str, recorder: Recorder) -> None:
+        url, key = self.api_url, "bench-key"
+        with bypass():
+            plan = recorder.measure("plan", lambda: generate_project_plan(
+                url, key, f"{name}\nBenchmark-Projekt", "stub"))
+            tickets = recorder.measure("tickets", lambda: generate_tickets(url, key, plan, "stub"))
+            for ticket in tickets:
+                recorder.measure("tests", lambda: generate_tests(url, key, ticket, "stub"))
+                recorder.measure("code", lambda: generate_code_for_ticket(
+                    url, key, self.workdir, ticket, "stub"))
+
+
+def run_level(driver, concurrency: int, sessions: int, fs: FsCounter, trace_memory: bool) -> Dict[str, Any]:
+    """Führt `sessions` Sitzungen mit `concurrency` Threads aus und liefert die Kennzahlen."""
+    clients = driver.prepare(sessions)
+    recorder = Recorder()
+    failures: List[str] = []
+
+    def one(i: int) -> None:
+        try:
+            recorder.measure("pipeline", lambda: driver.session(
+                clients[i], f"bench-c{concurrency}-{i}", recorder))
+        except Exception as e:
+            failures.append(str(e))
+
+    if trace_memory:
+        tracemalloc.start()
+    fs.reset()
+    fs.enabled = True
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(sessions)))
+    elapsed = time.perf_counter() - start
+    fs.enabled = False
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    routes = recorder.summary()
+    requests = sum(r["count"] for name, r in routes.items() if name != "pipeline")
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "failed_sessions": len(failures),
+        "first_failure": failures[0] if failures else None,
+        "seconds": elapsed,
+        "sessions_per_s": sessions / elapsed if elapsed else None,
+        "requests_per_s": requests / elapsed if elapsed else None,
+        "peak_traced_bytes": peak,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "fs_writes": fs.snapshot(),
+        "routes": routes,
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:8.1f}"
+
+
+def print_report(results: List[Dict[str, Any]], stub_stats: Dict[str, int]) -> None:
+    for level in results:
+        peak = level["peak_traced_bytes"]
+        print(
+            f"\n== Nebenläufigkeit {level['concurrency']}: {level['sessions']} Sitzungen"
+            f" in {level['seconds']:.2f}s, {level['requests_per_s']:.1f} req/s,"
+            f" {level['failed_sessions']} fehlgeschlagen"
+        )
+        if level["first_failure"]:
+            print(f"   erster Fehler: {level['first_failure']}")
+        print(
+            f"   Speicher: Spitze {peak / 1024 / 1024:.1f} MiB (tracemalloc)" if peak is not None
+            else "   Speicher: tracemalloc deaktiviert",
+            f"/ max RSS {level['max_rss_kb'] / 1024:.1f} MiB",
+        )
+        print("   Dateisystem: " + ", ".join(f"{k}={v}" for k, v in level["fs_writes"].items()))
+        print(f"   {'Route':<16}{'n':>6}{'Fehler':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for route, r in level["routes"].items():
+            print(
+                f"   {route:<16}{r['count']:>6}{r['errors']:>8}"
+                f"  {_ms(r['p50'])}  {_ms(r['p95'])}  {_ms(r['p99'])}"
+            )
+    print(f"\nStub-Server: {stub_stats['requests']} Anfragen, {stub_stats['errors']} injizierte Fehler")
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark der Generierungs-Pipeline")
+    parser.add_argument("--mode", choices=("app", "planner"), default="app")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8],
+                        help="Nebenläufigkeitsstufen (parallele Sitzungen)")
+    parser.add_argument("--sessions", type=int, default=8, help="Sitzungen pro Stufe")
+    parser.add_argument("--tickets", type=int, default=5, help="Tickets pro Plan")
+    parser.add_argument("--max-workers", type=int, default=4, help="Worker für /generate_all")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub-Latenz in Sekunden")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Stub-Tokens pro Sekunde (0 = sofort)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil injizierter Fehler")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP-Status injizierter Fehler")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Speicher nur über max RSS messen (tracemalloc bremst merklich)")
+    parser.add_argument("--json", dest="json_path", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=args.latency, token_rate=args.token_rate, error_rate=args.error_rate,
+        error_status=args.error_status, tickets=args.tickets, seed=args.seed,
+    )
+    fs = FsCounter()
+    fs.install()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="projectcoder-bench-") as workdir, \
+            StubServer(config) as server:
+        driver_cls = AppDriver if args.mode == "app" else PlannerDriver
+        driver = driver_cls(workdir, server.url, args.max_workers)
+        for concurrency in args.concurrency:
+            results.append(run_level(
+                driver, concurrency, args.sessions, fs, not args.no_tracemalloc
+            ))
+        # Gepufferte Antwort-Logs schreiben, bevor das Arbeitsverzeichnis verschwindet
+        log_store.flush_all()
+        stub_stats = dict(server.stats)
+
+    print_report(results, stub_stats)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "stub": stub_stats, "levels": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
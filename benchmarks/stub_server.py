@@ -0,0 +1,194 @@
+"""
+benchmarks/stub_server.py
+
+Lokaler Stub-Server für MCP "tools/call"-Anfragen (`generateText`).
+
+Die Antwort richtet sich nach dem Prompt der Planner-Module: ein Plan, ein
+JSON-Array von Tickets, Tests oder Code. Latenz, Token-Rate und Fehlerquote sind
+konfigurierbar; bei `Accept: text/event-stream` wird die Antwort als
+`notifications/progress`-Events gestreamt.
+
+Direkt startbar: `python -m benchmarks.stub_server --port 8765 --latency 0.2`
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StubConfig:
+    """
+    Verhalten des Stub-Servers.
+
+    Attributes:
+        latency (float): Wartezeit vor der ersten Antwort in Sekunden.
+        token_rate (float): Erzeugte Tokens (Wörter) pro Sekunde; 0 = sofort.
+        error_rate (float): Anteil der Anfragen, die mit `error_status` scheitern.
+        error_status (int): HTTP-Status injizierter Fehler (503 wird vom Client wiederholt).
+        tickets (int): Anzahl Tickets in der Ticket-Antwort.
+        seed (Optional[int]): Startwert für die Fehlerinjektion.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        token_rate: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        tickets: int = 5,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.tickets = tickets
+        self.random = random.Random(seed)
+
+
+def _respond_text(prompt: str, tickets: int) -> str:
+    """Erzeugt eine zum Prompt passende, plausible Antwort."""
+    if "JSON-Array von Tickets" in prompt:
+        return json.dumps([
+            {
+                "title": f"Modul {i}",
+                "beschreibung": f"Implementiert Modul {i}",
+                "anforderungen": [f"Funktion f{i} bereitstellen", "Fehler sauber behandeln"],
+                "file_path": f"mod{i}.py",
+            }
+            for i in range(tickets)
+        ], ensure_ascii=False, indent=2)
+    if prompt.startswith("Erstelle Unit-Tests"):
+        name = re.search(r"Datei: (\S+)", prompt).group(1).rsplit(".", 1)[0]
+        return (
+            f"```python\nfrom {name} import *\n\n\ndef test_{name}():\n    assert True\n```"
+        )
+    if prompt.startswith("Implementiere"):
+        name = re.search(r"Datei: (\S+)", prompt).group(1)
+        return f"```python\n# {name}\n\ndef run(x):\n    return x * 2\n```"
+    # Projektname übernehmen, damit sich die Folge-Prompts je Sitzung unterscheiden
+    lines = prompt.splitlines()
+    title = lines[1] if len(lines) > 1 else ""
+    return f"# Projektplan {title}\n\n" + "\n".join(
+        f"{i}. Schritt {i}: Komponente {i} umsetzen und testen." for i in range(1, 11)
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header und Body werden getrennt geschrieben; ohne TCP_NODELAY verzögert Nagle jede Antwort
+    disable_nagle_algorithm = True
+    config: StubConfig
+    stats: Dict[str, int]
+    lock: threading.Lock
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        cfg = self.config
+        with self.lock:
+            self.stats["requests"] += 1
+            fail = cfg.error_rate and cfg.random.random() < cfg.error_rate
+            if fail:
+                self.stats["errors"] += 1
+        if cfg.latency:
+            time.sleep(cfg.latency)
+        if fail:
+            self._send(cfg.error_status, b'{"error": "injected"}')
+            return
+
+        arguments = (request.get("params") or {}).get("arguments") or {}
+        text = _respond_text(arguments.get("prompt", ""), cfg.tickets)
+        tokens = re.findall(r"\S+\s*", text) or [text]
+        result = {
+            "jsonrpc": "2.0", "id": request.get("id"),
+            "result": {"content": [{"type": "text", "text": text}], "isError": False},
+        }
+
+        if "text/event-stream" not in self.headers.get("Accept", ""):
+            if cfg.token_rate:
+                time.sleep(len(tokens) / cfg.token_rate)
+            self._send(200, json.dumps(result).encode("utf-8"))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if cfg.token_rate:
+                time.sleep(1 / cfg.token_rate)
+            event = {"jsonrpc": "2.0", "method": "notifications/progress",
+                     "params": {"progressToken": 1, "progress": i, "message": token}}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.write(f"data: {json.dumps(result)}\n\n".encode("utf-8"))
+        self.close_connection = True
+
+
+class StubServer:
+    """
+    Startet den Stub in einem Hintergrund-Thread.
+
+    Die URL endet auf `/mcp`, damit `core.providers` unabhängig vom Host das
+    MCP-Backend wählt.
+
+    Attributes:
+        config (StubConfig): Das Verhalten des Servers.
+        stats (Dict[str, int]): Anzahl empfangener Anfragen und injizierter Fehler.
+    """
+
+    def __init__(self, config: Optional[StubConfig] = None, port: int = 0):
+        self.config = config or StubConfig()
+        self.stats = {"requests": 0, "errors": 0}
+        handler = type("Handler", (_Handler,), {
+            "config": self.config, "stats": self.stats, "lock": threading.Lock(),
+        })
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/mcp"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stub-MCP-Server für Benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tickets", type=int, default=5)
+    args = parser.parse_args()
+    config = StubConfig(args.latency, args.token_rate, args.error_rate, tickets=args.tickets)
+    with StubServer(config, args.port) as server:
+        print(f"Stub-MCP-Server läuft unter {server.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,70 @@
+"""
+core/async_runner.py
+
+Dieses Modul stellt eine dauerhaft laufende Event-Loop in einem Hintergrund-Thread
+bereit, über die synchroner Code (z. B. Flask-Routen) Koroutinen ausführen kann.
+
+Da die Loop über Aufrufe hinweg bestehen bleibt, bleiben auch die an sie
+gebundenen `httpx.AsyncClient`-Instanzen aus `core.http_client` samt ihrer
+Keep-Alive-Verbindungen erhalten – anders als bei `asyncio.run()` pro Request.
+"""
+
+import asyncio
+import threading
+from contextvars import copy_context
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Startet die Hintergrund-Loop beim ersten Aufruf und gibt sie zurück."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="async-runner", daemon=True)
+            _thread.start()
+        return _loop
+
+
+def run(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """
+    Führt eine Koroutine auf der Hintergrund-Loop aus und wartet auf ihr Ergebnis.
+
+    Die Koroutine läuft in einer Kopie des aufrufenden Kontexts, sodass
+    Kontextvariablen wie `response_cache.bypass()` erhalten bleiben.
+
+    Args:
+        coro (Awaitable[Any]): Die auszuführende Koroutine.
+        timeout (Optional[float]): Maximale Wartezeit in Sekunden.
+
+    Returns:
+        Any: Das Ergebnis der Koroutine.
+
+    Raises:
+        RuntimeError: Wenn aus der Hintergrund-Loop selbst aufgerufen (Deadlock).
+        Exception: Jede Ausnahme der Koroutine wird weitergereicht.
+    """
+    loop = _get_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run() darf nicht auf der Hintergrund-Loop aufgerufen werden.")
+    context = copy_context()
+
+    async def wrapper():
+        return await asyncio.get_running_loop().create_task(coro, context=context)
+
+    return asyncio.run_coroutine_threadsafe(wrapper(), loop).result(timeout)
+
+
+def shutdown() -> None:
+    """Stoppt die Hintergrund-Loop; ein späterer `run()` startet eine neue."""
+    global _loop, _thread
+    with _lock:
+        loop, thread, _loop, _thread = _loop, _thread, None, None
+    if loop is not None:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,392 @@
+"""
+core/context_budget.py
+
+Dieses Modul begrenzt den Kontext, der in Prompts eingebettet wird, auf ein
+konfigurierbares Token-Budget.
+
+  - `estimate_tokens` schätzt die Tokenzahl modellabhängig: Mit installiertem
+    `tiktoken` wird für OpenAI-Modelle exakt gezählt, sonst nach Wortstücken
+    mit einer typischen Zeichenzahl pro Token je Modellfamilie.
+  - `fit_plan` zerlegt einen Projektplan in Abschnitte (Überschriften bzw.
+    nummerierte Schritte), bewertet sie nach Relevanz für ein Ticket und
+    kürzt weniger relevante Abschnitte auf ihre Überschrift oder lässt sie weg.
+  - `fit_dependencies` ersetzt den Code benachbarter Dateien durch ihre
+    Signaturen (Klassen, Funktionen, Methoden ohne Rumpf) und nimmt nur so viel
+    vollständigen Code auf, wie das Budget erlaubt.
+
+Ohne konfiguriertes Budget (Standard) bleibt der Kontext unverändert. Jede
+Kürzung liefert ein `Fitted`-Objekt mit der Zahl eingesparter Tokens.
+"""
+
+import ast
+import math
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional
+    tiktoken = None
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "plan_tokens": None,
+    "dependency_tokens": None,
+    "model_budgets": {},
+}
+
+# Typische Zeichen pro Token je Modellfamilie (Präfix des Modellnamens)
+_CHARS_PER_TOKEN: List[Tuple[str, float]] = [
+    ("gpt", 4.0),
+    ("o1", 4.0),
+    ("o3", 4.0),
+    ("gemini", 4.0),
+    ("claude", 3.5),
+    ("llama", 3.6),
+    ("mistral", 3.6),
+    ("mixtral", 3.6),
+    ("qwen", 3.8),
+]
+# Unbekannte Modelle werden vorsichtig (eher zu viele Tokens) geschätzt
+_DEFAULT_CHARS_PER_TOKEN = 3.3
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+_HEADING = re.compile(r"^\s*(#{1,6}\s+\S|\d+[.)]\s+\S|[A-ZÄÖÜ][^\n]{0,80}:\s*$)")
+_TERM = re.compile(r"[A-Za-zÄÖÜäöüß_][A-Za-zÄÖÜäöüß0-9_]{2,}")
+_OMITTED = "[…]"
+
+_encoders: Dict[str, Any] = {}
+
+
+class Fitted:
+    """
+    Ergebnis einer Kürzung.
+
+    Attributes:
+        text (str): Der gekürzte Kontext.
+        tokens (int): Geschätzte Tokens nach der Kürzung.
+        original_tokens (int): Geschätzte Tokens vor der Kürzung.
+    """
+
+    def __init__(self, text: str, tokens: int, original_tokens: int):
+        self.text = text
+        self.tokens = tokens
+        self.original_tokens = original_tokens
+
+    @property
+    def saved(self) -> int:
+        """Eingesparte Tokens."""
+        return max(0, self.original_tokens - self.tokens)
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Budgets an.
+
+    Unterstützte Optionen:
+      - plan_tokens (Optional[int]): Budget für den eingebetteten Projektplan.
+      - dependency_tokens (Optional[int]): Budget für den Code von Abhängigkeiten.
+      - model_budgets (Dict[str, Dict[str, int]]): Abweichende Budgets je
+        Modell-Präfix, z. B. {"llama": {"plan_tokens": 1500}}.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+
+
+def budget(kind: str, model: Optional[str] = None) -> Optional[int]:
+    """
+    Liefert das Budget `kind` ("plan_tokens" oder "dependency_tokens") für ein Modell.
+
+    Returns:
+        Optional[int]: Das Budget in Tokens oder None (unbegrenzt).
+    """
+    name = (model or "").lower()
+    for prefix, budgets in _config["model_budgets"].items():
+        if name.startswith(prefix.lower()) and kind in budgets:
+            return budgets[kind]
+    return _config[kind]
+
+
+def _encoder(model: str):
+    if tiktoken is None or not model.lower().startswith(("gpt", "o1", "o3")):
+        return None
+    if model not in _encoders:
+        try:
+            _encoders[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encoders[model] = tiktoken.get_encoding("cl100k_base")
+    return _encoders[model]
+
+
+def chars_per_token(model: Optional[str]) -> float:
+    """Typische Zeichenzahl pro Token für ein Modell."""
+    name = (model or "").lower()
+    for prefix, ratio in _CHARS_PER_TOKEN:
+        if name.startswith(prefix):
+            return ratio
+    return _DEFAULT_CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Schätzt die Tokenzahl eines Textes für ein Modell.
+
+    Jedes Wort bzw. Satzzeichen zählt mindestens ein Token; lange Wörter
+    (Komposita, Bezeichner) entsprechend ihrer Länge mehrere.
+
+    Args:
+        text (str): Der Text.
+        model (Optional[str]): Der Modellname, z. B. "gpt-4" oder "llama2".
+
+    Returns:
+        int: Die geschätzte Tokenzahl.
+    """
+    if not text:
+        return 0
+    encoder = _encoder(model or "")
+    if encoder is not None:
+        return len(encoder.encode(text))
+    ratio = chars_per_token(model)
+    return sum(max(1, math.ceil(len(m) / ratio)) for m in _WORD.findall(text))
+
+
+def _terms(text: str) -> set:
+    return {t.lower() for t in _TERM.findall(text)}
+
+
+def ticket_query(ticket: dict) -> str:
+    """Fasst die Felder eines Tickets zu einem Suchtext für die Relevanzbewertung zusammen."""
+    if not isinstance(ticket, dict):
+        return ""
+    file_path = str(ticket.get("file_path") or "")
+    parts = [file_path, Path(file_path).stem]
+    parts += [str(ticket.get(k) or "") for k in ("title", "beschreibung", "anforderungen")]
+    return "\n".join(parts)
+
+
+def split_sections(plan_text: str) -> List[str]:
+    """
+    Zerlegt einen Plan an Überschriften und nummerierten Schritten.
+
+    Text vor der ersten Überschrift bildet einen eigenen Abschnitt.
+    """
+    sections: List[List[str]] = [[]]
+    for line in plan_text.splitlines():
+        if _HEADING.match(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(lines) for lines in sections if any(l.strip() for l in lines)]
+
+
+def _relevance(section: str, query_terms: set) -> float:
+    terms = _terms(section)
+    if not terms or not query_terms:
+        return 0.0
+    return len(terms & query_terms) / math.sqrt(len(terms))
+
+
+def fit_plan(
+    plan_text: str, limit: Optional[int], model: Optional[str] = None, query: str = ""
+) -> Fitted:
+    """
+    Kürzt einen Projektplan auf `limit` Tokens.
+
+    Der erste Abschnitt (Titel, Einleitung) bleibt immer erhalten. Die übrigen
+    werden nach Relevanz für `query` (ohne Query: nach Position) vollständig
+    aufgenommen, solange das Budget reicht; danach nur noch ihre erste Zeile.
+    Ausgelassene Abschnitte werden durch "[…]" markiert, die Reihenfolge bleibt.
+
+    Args:
+        plan_text (str): Der Projektplan.
+        limit (Optional[int]): Das Budget; None = unverändert.
+        model (Optional[str]): Modell für die Token-Schätzung.
+        query (str): Text, nach dessen Begriffen die Abschnitte bewertet werden.
+
+    Returns:
+        Fitted: Der gekürzte Plan.
+    """
+    original = estimate_tokens(plan_text, model)
+    if limit is None or original <= limit:
+        return Fitted(plan_text, original, original)
+
+    sections = split_sections(plan_text)
+    costs = [estimate_tokens(s, model) for s in sections]
+    query_terms = _terms(query)
+    order = sorted(
+        range(1, len(sections)),
+        key=lambda i: (-_relevance(sections[i], query_terms), i),
+    )
+    chosen: Dict[int, str] = {0: sections[0]} if sections else {}
+    used = costs[0] if sections else 0
+    for i in order:
+        if used + costs[i] <= limit:
+            chosen[i] = sections[i]
+            used += costs[i]
+    for i in order:
+        if i in chosen:
+            continue
+        heading = sections[i].splitlines()[0]
+        cost = estimate_tokens(heading, model) + 1
+        if used + cost <= limit:
+            chosen[i] = heading + " " + _OMITTED
+            used += cost
+
+    parts, skipped = [], False
+    for i in range(len(sections)):
+        if i in chosen:
+            parts.append(chosen[i])
+            skipped = False
+        elif not skipped:
+            parts.append(_OMITTED)
+            skipped = True
+    text = "\n".join(parts)
+    return Fitted(text, estimate_tokens(text, model), original)
+
+
+def _python_signatures(code: str) -> Optional[str]:
+    """Liefert Importe, Klassen- und Funktionssignaturen samt erster Docstring-Zeile."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    lines = code.splitlines()
+    out: List[str] = []
+
+    def header(node) -> Tuple[str, bool]:
+        """Dekoratoren und (mehrzeilige) Signatur; zweiter Wert: Rumpf steht in derselben Zeile."""
+        start = min([d.lineno for d in node.decorator_list] + [node.lineno]) - 1
+        body_line = node.body[0].lineno
+        if body_line == node.lineno:
+            return "\n".join(lines[start:node.lineno]), True
+        return "\n".join(lines[start:body_line - 1]), False
+
+    def visit(nodes, indent: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                out.append(indent + (ast.get_source_segment(code, node) or ""))
+            elif isinstance(node, ast.Assign) and not indent:
+                segment = ast.get_source_segment(code, node) or ""
+                if len(segment) <= 120:
+                    out.append(segment)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                head, inline = header(node)
+                out.append(head)
+                if inline:
+                    continue
+                inner = indent + "    "
+                doc = ast.get_docstring(node)
+                if doc:
+                    out.append(f'{inner}"""{doc.strip().splitlines()[0]}"""')
+                if isinstance(node, ast.ClassDef):
+                    before = len(out)
+                    visit(node.body, inner)
+                    if len(out) == before and not doc:
+                        out.append(inner + "...")
+                else:
+                    out.append(inner + "...")
+
+    visit(tree.body, "")
+    return "\n".join(out)
+
+
+_JAVA_MODIFIERS = r"(?:(?:public|protected|private|static|final|abstract|default|synchronized|native)\s+)"
+_JAVA_TYPE = re.compile(rf"^\s*{_JAVA_MODIFIERS}*(?:class|interface|enum|record)\s+\w+[^;{{]*")
+_JAVA_METHOD = re.compile(
+    rf"^\s*{_JAVA_MODIFIERS}+(?:<[^>]*>\s*)?(?:[\w<>\[\],.? ]+\s+)?\w+\s*\([^;{{]*?\)[^;{{=]*"
+)
+
+
+def signatures(code: str, file_path: str = "") -> str:
+    """
+    Reduziert Quellcode auf seine Signaturen.
+
+    Python wird per `ast` ausgewertet, Java über Deklarationszeilen; für andere
+    Sprachen oder nicht parsebaren Code werden die Zeilen mit Definitionen übernommen.
+
+    Args:
+        code (str): Der Quellcode.
+        file_path (str): Dateipfad, dessen Endung die Sprache bestimmt.
+
+    Returns:
+        str: Die Signaturen (Rümpfe durch "..." bzw. "{ … }" ersetzt).
+    """
+    ext = Path(file_path).suffix.lower()
+    if ext in ("", ".py"):
+        result = _python_signatures(code)
+        if result is not None:
+            return result
+    if ext == ".java":
+        out = []
+        for line in code.splitlines():
+            stripped = line.strip()
+            if stripped.startswith(("package ", "import ", "@")):
+                out.append(line)
+            elif _JAVA_TYPE.match(line):
+                out.append(_JAVA_TYPE.match(line).group(0).rstrip() + " {")
+            elif _JAVA_METHOD.match(line):
+                out.append(_JAVA_METHOD.match(line).group(0).rstrip() + " { … }")
+        return "\n".join(out)
+    return "\n".join(
+        line for line in code.splitlines()
+        if re.match(r"^\s*(def|class|function|func|fn|pub|export|interface|type)\b", line)
+    )
+
+
+def fit_dependencies(
+    dependencies: Dict[str, str],
+    limit: Optional[int],
+    model: Optional[str] = None,
+    query: str = "",
+) -> Tuple[Dict[str, str], int]:
+    """
+    Kürzt den Code von Abhängigkeiten auf `limit` Tokens.
+
+    Passt der vollständige Code nicht, werden zunächst alle Dateien auf ihre
+    Signaturen reduziert. Anschließend erhalten die für `query` relevantesten
+    Dateien wieder ihren vollständigen Code, solange das Budget reicht. Reichen
+    selbst die Signaturen nicht, werden die am wenigsten relevanten Dateien
+    weggelassen.
+
+    Args:
+        dependencies (Dict[str, str]): Dateipfad -> Code.
+        limit (Optional[int]): Das Budget; None = unverändert.
+        model (Optional[str]): Modell für die Token-Schätzung.
+        query (str): Text, nach dessen Begriffen die Dateien bewertet werden.
+
+    Returns:
+        Tuple[Dict[str, str], int]: Die (ggf. gekürzten) Abhängigkeiten in
+            ursprünglicher Reihenfolge und die Zahl eingesparter Tokens.
+    """
+    full = {path: estimate_tokens(code, model) for path, code in dependencies.items()}
+    original = sum(full.values())
+    if limit is None or original <= limit:
+        return dict(dependencies), 0
+
+    query_terms = _terms(query)
+    ranked = sorted(
+        dependencies,
+        key=lambda p: -_relevance(p + "\n" + dependencies[p], query_terms),
+    )
+    compact = {path: signatures(code, path) for path, code in dependencies.items()}
+    cost = {path: estimate_tokens(compact[path], model) for path in dependencies}
+
+    chosen: Dict[str, str] = {}
+    used = 0
+    for path in ranked:
+        if used + cost[path] <= limit:
+            chosen[path] = compact[path]
+            used += cost[path]
+    for path in ranked:
+        extra = full[path] - cost.get(path, 0)
+        if path in chosen and extra > 0 and used + extra <= limit:
+            chosen[path] = dependencies[path]
+            used += extra
+
+    fitted = {path: chosen[path] for path in dependencies if path in chosen}
+    return fitted, max(0, original - used)
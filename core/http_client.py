@@ -0,0 +1,255 @@
+"""
+core/http_client.py
+
+Dieses Modul stellt eine gemeinsame HTTP-Client-Schicht bereit. Pro API-URL
+wird eine `requests.Session` mit eigenem Connection-Pool (Keep-Alive),
+Standard-Timeouts und Transport-Retries vorgehalten, sodass wiederholte
+Anfragen an denselben Endpunkt keinen neuen TCP/TLS-Handshake benötigen.
+
+Verbindungsfehler werden immer wiederholt, da der Request den Server dann
+nicht erreicht hat. Antworten mit 502/503/504 werden für POST nur wiederholt,
+wenn der Aufrufer dies per `retry_status=True` ausdrücklich erlaubt (z. B. für
+LLM-Aufrufe); nicht-idempotente Requests wie das Anlegen von GitLab-Issues
+würden sonst unter Umständen doppelt ausgeführt.
+
+Für den asynchronen Pfad wird analog pro Event-Loop und API-URL ein
+`httpx.AsyncClient` mit denselben Timeouts bereitgestellt; `async_post`
+wendet dieselbe Retry-Politik an wie der synchrone Pfad.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "pool_size": 10,
+    "async_pool_size": 100,
+    "connect_timeout": 5.0,
+    "read_timeout": 300.0,
+    "retries": 3,
+    "backoff_factor": 0.5,
+}
+
+_sessions: Dict[Tuple[str, bool], requests.Session] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Client-Konfiguration an und verwirft alle bestehenden Sessions.
+
+    Unterstützte Optionen:
+      - pool_size (int): Maximale Anzahl offener Verbindungen pro API-URL.
+      - async_pool_size (int): Maximale Anzahl Verbindungen pro API-URL im Async-Client.
+      - connect_timeout (float): Timeout für den Verbindungsaufbau in Sekunden.
+      - read_timeout (float): Timeout für das Lesen der Antwort in Sekunden.
+      - retries (int): Anzahl Transport-Retries bei Verbindungsfehlern bzw. (opt-in) 502/503/504.
+      - backoff_factor (float): Faktor für den exponentiellen Backoff zwischen Retries.
+
+    Args:
+        **options: Zu überschreibende Konfigurationswerte.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    with _lock:
+        _config.update(options)
+        _close_sessions()
+        # Async-Clients sind an ihre Event-Loop gebunden und können hier nicht
+        # geschlossen werden; sie werden verworfen und bei Bedarf neu angelegt.
+        _async_clients.clear()
+
+
+def get_config() -> Dict[str, Any]:
+    """Gibt eine Kopie der aktuellen Client-Konfiguration zurück."""
+    return dict(_config)
+
+
+def default_timeout() -> Tuple[float, float]:
+    """Gibt das Standard-Timeout als Tupel (connect, read) zurück."""
+    return (_config["connect_timeout"], _config["read_timeout"])
+
+
+def _build_session(retry_status: bool = False) -> requests.Session:
+    """
+    Erzeugt eine Session mit Connection-Pool und Retry-Strategie gemäß Konfiguration.
+
+    Lese-Fehler werden bewusst nicht wiederholt, da ein LLM-Aufruf bereits
+    serverseitig verarbeitet worden sein kann.
+
+    Args:
+        retry_status (bool): Wenn True, werden 502/503/504 auch für POST wiederholt;
+            sonst nur für idempotente Methoden.
+    """
+    retry = Retry(
+        total=_config["retries"],
+        connect=_config["retries"],
+        read=0,
+        status=_config["retries"],
+        status_forcelist=(502, 503, 504),
+        allowed_methods=None if retry_status else Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=_config["backoff_factor"],
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=_config["pool_size"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(api_url: str, retry_status: bool = False) -> requests.Session:
+    """
+    Liefert die geteilte Session für eine API-URL und legt sie bei Bedarf an.
+
+    Args:
+        api_url (str): Die URL des Endpunkts; jede URL erhält einen eigenen Pool.
+        retry_status (bool): Session, die 502/503/504 auch für POST wiederholt.
+
+    Returns:
+        requests.Session: Die wiederverwendbare Session.
+    """
+    key = (api_url, retry_status)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _build_session(retry_status)
+                _sessions[key] = session
+    return session
+
+
+def post(url: str, retry_status: bool = False, **kwargs: Any) -> requests.Response:
+    """
+    Sendet einen POST-Request über die gepoolte Session der URL.
+
+    Ist kein `timeout` angegeben, wird das konfigurierte Standard-Timeout gesetzt.
+
+    Args:
+        url (str): Ziel-URL.
+        retry_status (bool): True erlaubt Retries bei 502/503/504; nur für Requests
+            setzen, deren doppelte Ausführung unkritisch ist.
+        **kwargs: Weitere Argumente für `requests.Session.post`.
+
+    Returns:
+        requests.Response: Die HTTP-Antwort.
+    """
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session(url, retry_status).post(url, **kwargs)
+
+
+def get_async_client(api_url: str) -> httpx.AsyncClient:
+    """
+    Liefert den geteilten `httpx.AsyncClient` für eine API-URL auf der laufenden Event-Loop.
+
+    Clients sind an ihre Event-Loop gebunden und werden daher pro Loop gehalten.
+    Connect-Fehler werden entsprechend `retries` auf Transport-Ebene wiederholt.
+
+    Args:
+        api_url (str): Die URL des Endpunkts.
+
+    Returns:
+        httpx.AsyncClient: Der wiederverwendbare Client.
+
+    Raises:
+        RuntimeError: Wenn keine Event-Loop läuft.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_url)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=_config["async_pool_size"],
+                max_keepalive_connections=_config["async_pool_size"],
+            )
+            transport = httpx.AsyncHTTPTransport(retries=_config["retries"], limits=limits)
+            timeout = httpx.Timeout(_config["read_timeout"], connect=_config["connect_timeout"])
+            client = httpx.AsyncClient(transport=transport, timeout=timeout)
+            clients[api_url] = client
+    return client
+
+
+_RETRY_STATUS = (502, 503, 504)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Wartezeit vor dem nächsten Versuch: `Retry-After` (Sekunden) oder exponentieller Backoff."""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return _config["backoff_factor"] * (2 ** attempt)
+
+
+async def async_post(
+    url: str,
+    retry_status: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Asynchrones Gegenstück zu `post`.
+
+    Verbindungsfehler wiederholt der Transport des Clients; 502/503/504 werden
+    wie im synchronen Pfad nur bei `retry_status=True` erneut gesendet.
+
+    Args:
+        url (str): Ziel-URL.
+        retry_status (bool): True erlaubt Retries bei 502/503/504.
+        client (httpx.AsyncClient, optional): Zu verwendender Client; standardmäßig
+            der geteilte Client der laufenden Event-Loop.
+        **kwargs: Weitere Argumente für `httpx.AsyncClient.post`.
+
+    Returns:
+        httpx.Response: Die (letzte) HTTP-Antwort.
+    """
+    client = client or get_async_client(url)
+    attempts = _config["retries"] if retry_status else 0
+    for attempt in range(attempts + 1):
+        response = await client.post(url, **kwargs)
+        if response.status_code not in _RETRY_STATUS or attempt == attempts:
+            return response
+        await response.aclose()
+        await asyncio.sleep(_retry_delay(response, attempt))
+    return response
+
+
+async def aclose_all() -> None:
+    """Schließt alle Async-Clients der laufenden Event-Loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _close_sessions() -> None:
+    """Schließt alle Sessions; Aufrufer muss `_lock` halten."""
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+
+
+def close_all() -> None:
+    """Schließt alle gepoolten Sessions und gibt deren Verbindungen frei."""
+    with _lock:
+        _close_sessions()
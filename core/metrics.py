@@ -0,0 +1,295 @@
+"""
+core/metrics.py
+
+Dieses Modul sammelt Laufzeitmetriken der Generierungs-Pipeline und stellt sie
+im Prometheus-Textformat bereit (Route `/metrics`).
+
+  - Timer (`timer`, `timed`) messen einzelne Stufen wie Prompt-Aufbau,
+    HTTP-Wartezeit, Auswertung der Antwort, Fence-Extraktion oder Schreiben auf
+    die Platte. Je Stufe entstehen ein Histogramm der Dauer, ein Gauge der gerade
+    laufenden Aufrufe und ein Fehlerzähler.
+  - Zähler (`inc`) erfassen z. B. LLM-Anfragen, Cache-Treffer sowie Token- und
+    Bytemengen.
+
+Alle Werte tragen die Labels route, stage, model und api_url, soweit bekannt.
+Die Route wird per `bind(route=...)` für den aktuellen Kontext gesetzt (in der
+Web-App pro Request) und gilt damit auch für Stufen tief in `planner` und
+`storage`, inklusive Worker-Threads, die den Kontext kopieren.
+
+Mit `configure(trace=True)` wird jede gemessene Stufe zusätzlich als
+JSON-Zeile über den Logger "projectcoder.trace" ausgegeben, mit
+`trace_file` direkt in eine Datei.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.context_budget import estimate_tokens
+
+PREFIX = "projectcoder_"
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "enabled": True,
+    "trace": False,
+    "trace_file": None,
+    "buckets": (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+}
+
+_bound: contextvars.ContextVar = contextvars.ContextVar("metrics_labels", default={})
+_lock = threading.Lock()
+_trace_log = logging.getLogger("projectcoder.trace")
+_trace_handler: Optional[logging.Handler] = None
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_HELP = {
+    "stage_seconds": ("histogram", "Dauer einzelner Pipeline-Stufen in Sekunden."),
+    "stage_in_flight": ("gauge", "Gerade laufende Aufrufe je Stufe."),
+    "stage_errors_total": ("counter", "Fehlgeschlagene Aufrufe je Stufe."),
+    "llm_requests_total": ("counter", "LLM-Anfragen nach Cache-Ergebnis."),
+    "llm_prompt_bytes_total": ("counter", "Gesendete Prompt-Bytes (UTF-8)."),
+    "llm_response_bytes_total": ("counter", "Empfangene Antwort-Bytes (UTF-8)."),
+    "llm_prompt_tokens_total": ("counter", "Geschätzte Prompt-Tokens."),
+    "llm_response_tokens_total": ("counter", "Geschätzte Antwort-Tokens."),
+    "storage_bytes_written_total": ("counter", "Auf die Platte geschriebene Bytes."),
+    "storage_dedup_total": ("counter", "Nicht erneut geschriebene, bereits vorhandene Inhalte."),
+    "code_validation_errors_total": ("counter", "Generierte Dateien mit Syntaxfehlern."),
+    "context_tokens_saved_total": ("counter", "Durch das Kontext-Budget eingesparte Prompt-Tokens."),
+    "http_requests_total": ("counter", "Bearbeitete HTTP-Requests nach Status."),
+    "http_request_seconds": ("histogram", "Bearbeitungsdauer von HTTP-Requests in Sekunden."),
+}
+
+_counters: Dict[str, Dict[LabelKey, float]] = {}
+_gauges: Dict[str, Dict[LabelKey, float]] = {}
+# Histogramm: Label-Schlüssel -> [Zähler je Bucket..., Summe, Anzahl]
+_histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Konfiguration an.
+
+    Unterstützte Optionen:
+      - enabled (bool): False schaltet die Erfassung ab (alle Aufrufe werden zu No-ops).
+      - trace (bool): Jede gemessene Stufe als JSON-Zeile über den Logger
+        "projectcoder.trace" ausgeben.
+      - trace_file (Optional[str]): Datei, an die diese Zeilen angehängt werden.
+      - buckets (tuple): Obergrenzen der Histogramm-Buckets in Sekunden; eine
+        Änderung verwirft die bisherigen Histogramme.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    global _trace_handler
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    with _lock:
+        if "buckets" in options:
+            options["buckets"] = tuple(sorted(options["buckets"]))
+            if options["buckets"] != _config["buckets"]:
+                _histograms.clear()
+        _config.update(options)
+        if _trace_handler is not None:
+            _trace_log.removeHandler(_trace_handler)
+            _trace_handler.close()
+            _trace_handler = None
+        if _config["trace"] and _config["trace_file"]:
+            _trace_handler = logging.FileHandler(_config["trace_file"], encoding="utf-8")
+            _trace_handler.setFormatter(logging.Formatter("%(message)s"))
+            _trace_log.addHandler(_trace_handler)
+            _trace_log.setLevel(logging.INFO)
+
+
+def reset() -> None:
+    """Verwirft alle erfassten Werte (z. B. für Tests)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    merged = dict(_bound.get())
+    merged.update((k, v) for k, v in labels.items() if v is not None)
+    return tuple(sorted((k, str(v)) for k, v in merged.items() if v != ""))
+
+
+@contextmanager
+def bind(**labels: Any) -> Iterator[None]:
+    """Setzt Labels (z. B. route) für alle Metriken im aktuellen Kontext."""
+    token = _bound.set(dict(_bound.get(), **labels))
+    try:
+        yield
+    finally:
+        _bound.reset(token)
+
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    """Erhöht den Zähler `name` (ohne Präfix, z. B. "llm_requests_total")."""
+    if not _config["enabled"]:
+        return
+    key = _key(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + value
+
+
+def _add_gauge(name: str, key: LabelKey, delta: float) -> None:
+    with _lock:
+        series = _gauges.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + delta
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """Trägt einen Messwert in das Histogramm `name` ein."""
+    if not _config["enabled"]:
+        return
+    key = _key(labels)
+    buckets = _config["buckets"]
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        values = series.get(key)
+        if values is None:
+            values = series[key] = [0.0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                values[i] += 1
+        values[-2] += value
+        values[-1] += 1
+
+
+@contextmanager
+def timer(stage: str, **labels: Any) -> Iterator[None]:
+    """
+    Misst die Dauer einer Stufe.
+
+    Erfasst `stage_seconds`, `stage_in_flight` und bei einer Ausnahme
+    `stage_errors_total`; die Ausnahme wird weitergereicht.
+
+    Args:
+        stage (str): Name der Stufe, z. B. "llm.http" oder "storage.save_code".
+        **labels: Weitere Labels (model, api_url, ...).
+    """
+    if not _config["enabled"]:
+        yield
+        return
+    labels["stage"] = stage
+    key = _key(labels)
+    _add_gauge("stage_in_flight", key, 1)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except GeneratorExit:
+        # Abbruch eines Streams durch den Aufrufer ist kein Fehler der Stufe
+        raise
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _add_gauge("stage_in_flight", key, -1)
+        observe("stage_seconds", elapsed, **labels)
+        if error is not None:
+            inc("stage_errors_total", **labels)
+        if _config["trace"]:
+            _trace_log.info(json.dumps(
+                {"stage": stage, "seconds": round(elapsed, 6), "error": error,
+                 "labels": dict(key), "ts": time.time()},
+                ensure_ascii=False,
+            ))
+
+
+def timed(stage: str) -> Callable:
+    """Dekorator-Variante von `timer` für Funktionen."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_call(
+    api_url: str, model: Optional[str], prompt: str, response: Optional[str], cache: str
+) -> None:
+    """
+    Verbucht eine LLM-Anfrage mit Byte- und geschätzten Token-Mengen
+    (Schätzung über `core.context_budget.estimate_tokens`).
+
+    Args:
+        cache (str): "hit" oder "miss".
+        response (Optional[str]): Der Antworttext; None, wenn die Anfrage fehlschlug.
+    """
+    if not _config["enabled"]:
+        return
+    labels = {"api_url": api_url, "model": model or ""}
+    inc("llm_requests_total", cache=cache, **labels)
+    if cache == "hit":
+        return
+    inc("llm_prompt_bytes_total", len(prompt.encode("utf-8")), **labels)
+    inc("llm_prompt_tokens_total", estimate_tokens(prompt, model), **labels)
+    if response is not None:
+        inc("llm_response_bytes_total", len(response.encode("utf-8")), **labels)
+        inc("llm_response_tokens_total", estimate_tokens(response, model), **labels)
+
+
+def record_write(stage: str, data) -> None:
+    """Verbucht die Größe geschriebener Daten (str wird als UTF-8 gezählt)."""
+    if not _config["enabled"]:
+        return
+    size = len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+    inc("storage_bytes_written_total", size, stage=stage)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render() -> str:
+    """Liefert alle Metriken im Prometheus-Textformat (Version 0.0.4)."""
+    lines: List[str] = []
+    buckets = _config["buckets"]
+    with _lock:
+        families = [(n, "counter", dict(s)) for n, s in _counters.items()]
+        families += [(n, "gauge", dict(s)) for n, s in _gauges.items()]
+        families += [
+            (n, "histogram", {k: list(v) for k, v in s.items()}) for n, s in _histograms.items()
+        ]
+    for name, kind, series in sorted(families):
+        full = PREFIX + name
+        help_text = _HELP.get(name, (kind, name))[1]
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for key, value in sorted(series.items()):
+            if kind != "histogram":
+                lines.append(f"{full}{_format_labels(key)} {_number(value)}")
+                continue
+            for bound, count in zip(buckets + (float("inf"),), value[:-2] + [value[-1]]):
+                le = (("le", _number(bound) if bound == float("inf") else repr(float(bound))),)
+                lines.append(f"{full}_bucket{_format_labels(key, le)} {_number(count)}")
+            lines.append(f"{full}_sum{_format_labels(key)} {_number(value[-2])}")
+            lines.append(f"{full}_count{_format_labels(key)} {_number(value[-1])}")
+    return "\n".join(lines) + "\n"
@@ -8,6 +8,10 @@ Dateitypen und Nutzungsszenarien:
 - TEST_FILE_NOTE: Prompt, um pytest-Tests für ein Modul zu erstellen.
 - CODE_FILE_NOTE: Prompt, um Code-Dateien mit vollständigem Kontext und
   Ticketbeschreibung zu generieren.
+- CODE_PATCH_NOTE: Prompt, um eine bestehende Datei nur über
+  Suchen/Ersetzen-Blöcke bzw. einen Unified Diff zu ändern.
+- CODE_REPAIR_NOTE: Prompt, um eine generierte Datei mit Syntaxfehlern
+  korrigiert neu anzufordern.
 """
 
 # Prompt-Vorlage für reine JSON-Ausgabe
@@ -38,3 +42,38 @@ CODE_FILE_NOTE = (
     "und Anpassungen gemäß Ticket. "
     "Antworte **nur** mit dem Code zwischen ```{file_ext} … ```."
 )
+
+# Prompt-Vorlage für Änderungen an bestehenden Dateien (Patch-Modus, siehe `storage.patcher`)
+CODE_PATCH_NOTE = (
+    "Du bist ein reiner Code-Editor. "
+    "Die Datei `{file_path}` hat aktuell folgenden Inhalt:\n\n"
+    "```{file_ext}\n"
+    "{existing_code}\n"
+    "```\n\n"
+    "Ticket-Beschreibung:\n```{ticket_description}\n"
+    "```\n\n"
+    "Gib **nur** die nötigen Änderungen als Suchen/Ersetzen-Blöcke zurück:\n\n"
+    "<<<<<<< SEARCH\n"
+    "(zu ersetzende Zeilen, zeichengenau aus der Datei)\n"
+    "=======\n"
+    "(neue Zeilen)\n"
+    ">>>>>>> REPLACE\n\n"
+    "Jeder SEARCH-Teil muss genau einmal in der Datei vorkommen und nur so viele "
+    "Zeilen umfassen, wie für eine eindeutige Stelle nötig sind. "
+    "Alternativ ist ein Unified Diff mit `@@ -a,b +c,d @@`-Hunks erlaubt. "
+    "Gib **nicht** die vollständige Datei und keine Erklärungen zurück."
+)
+
+# Prompt-Vorlage zur Korrektur von Syntaxfehlern (siehe `planner.code_validator`)
+CODE_REPAIR_NOTE = (
+    "Du bist ein reiner Code-Generator. "
+    "Deine letzte Antwort für die Datei `{file_path}` enthält Syntaxfehler:\n\n"
+    "{errors}\n\n"
+    "Deine letzte Antwort:\n\n"
+    "{previous}\n\n"
+    "Ticket-Beschreibung:\n```{ticket_description}\n"
+    "```\n\n"
+    "Gib **die vollständige**, korrigierte Antwort zurück, mit denselben Dateien "
+    "und Code-Blöcken. "
+    "Antworte **nur** mit dem Code zwischen ```{file_ext} … ```."
+)
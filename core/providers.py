@@ -0,0 +1,332 @@
+"""
+core/providers.py
+
+Dieses Modul stellt austauschbare Provider-Backends für LLM-Anfragen bereit.
+
+Ein Backend kennt für seine API den Endpunkt, die Header, das Payload, die
+Auswertung der Antwort und das Streaming-Format. Anhand von
+`core.api_types.detect_api_type` wird für OpenAI, Gemini und Ollama direkt die
+native API angesprochen (Payload über `core.payload_builder`, Auswertung über
+`core.response_parser`); alle übrigen URLs laufen wie bisher über den
+MCP-JSON-RPC-Wrapper.
+
+Eigene Backends können per `register_backend` ergänzt oder ersetzt werden; mit
+`configure(native=False)` wird wieder jede Anfrage über MCP gesendet.
+"""
+
+import json
+from typing import Any, Dict, Iterator
+from urllib.parse import urlparse
+
+from core.api_types import detect_api_type
+from core.payload_builder import build_payload
+from core.response_parser import parse_response
+from mcp.types import CallToolRequestParams, JSONRPCRequest, CallToolResult
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "native": True,
+}
+
+
+def _iter_sse_data(lines: Iterator[str]) -> Iterator[str]:
+    """
+    Liest Server-Sent-Events zeilenweise und liefert den Inhalt der `data:`-Felder je Event.
+
+    Mehrzeilige `data:`-Felder werden gemäß SSE-Spezifikation mit Zeilenumbruch verbunden;
+    ein Event endet mit einer Leerzeile.
+    """
+    data_lines = []
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip(" "))
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def _with_default_path(api_url: str, path: str) -> str:
+    """Hängt `path` an, wenn die URL nur aus Schema und Host besteht."""
+    if urlparse(api_url).path in ("", "/"):
+        return api_url.rstrip("/") + path
+    return api_url
+
+
+def _is_event_stream(response) -> bool:
+    return response.headers.get("Content-Type", "").startswith("text/event-stream")
+
+
+class ProviderBackend:
+    """
+    Basisklasse eines Provider-Backends.
+
+    Unterklassen überschreiben `payload` und `parse`, bei Bedarf auch `endpoint`,
+    `headers` und `iter_stream`.
+
+    Attributes:
+        name (str): Name des Backends, z. B. "openai".
+    """
+
+    name = ""
+
+    def endpoint(self, api_url: str, model: str, stream: bool = False) -> str:
+        """Liefert die URL, an die der Request gesendet wird."""
+        return api_url
+
+    def headers(self, api_key: str, stream: bool = False) -> Dict[str, str]:
+        """Stellt die HTTP-Header zusammen; ohne api_key wird keine Authentifizierung gesetzt."""
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        return headers
+
+    def payload(self, user_input: str, model: str, stream: bool = False) -> Dict[str, Any]:
+        """Baut den Request-Body."""
+        raise NotImplementedError
+
+    def parse(self, data: Dict[str, Any]) -> str:
+        """Extrahiert den Antworttext aus einer vollständigen JSON-Antwort."""
+        raise NotImplementedError
+
+    def iter_stream(self, response) -> Iterator[str]:
+        """
+        Liest eine Streaming-Antwort und liefert Text-Deltas.
+
+        Die Standardimplementierung liefert die gesamte JSON-Antwort als ein Stück.
+
+        Returns:
+            str: Der vollständige, maßgebliche Antworttext (Rückgabewert des Generators).
+        """
+        text = self.parse(response.json())
+        yield text
+        return text
+
+
+class MCPBackend(ProviderBackend):
+    """Sendet den Prompt als MCP "tools/call"-Anfrage an das Tool `generateText`."""
+
+    name = "mcp"
+
+    def headers(self, api_key: str, stream: bool = False) -> Dict[str, str]:
+        headers = super().headers(api_key)
+        if stream:
+            headers["Accept"] = "application/json, text/event-stream"
+        return headers
+
+    def payload(self, user_input: str, model: str, stream: bool = False) -> Dict[str, Any]:
+        request_obj = JSONRPCRequest(
+            jsonrpc="2.0",
+            id=1,
+            method="tools/call",
+            params=CallToolRequestParams(
+                name="generateText",
+                arguments={"prompt": user_input, "model": model},
+            ).model_dump(),
+        )
+        return request_obj.model_dump()
+
+    def parse(self, data: Dict[str, Any]) -> str:
+        """Validiert das MCP-Ergebnis und verbindet alle Text-Teile zu einem String."""
+        result = CallToolResult.model_validate(data.get("result", {}))
+        return "".join(
+            part.text for part in result.content if getattr(part, "type", None) == "text"
+        )
+
+    def iter_stream(self, response) -> Iterator[str]:
+        """
+        Antwortet der MCP-Server mit `text/event-stream`, werden Text-Deltas aus
+        `notifications/progress`-Nachrichten (Feld `message`) sofort weitergereicht;
+        das abschließende `CallToolResult` liefert nur noch den noch nicht gesendeten Rest.
+
+        Raises:
+            ValueError: Bei einer JSON-RPC-Fehlermeldung oder wenn der Stream ohne Ergebnis endet.
+        """
+        if not _is_event_stream(response):
+            return (yield from super().iter_stream(response))
+        sent = ""
+        text = None
+        for data in _iter_sse_data(response.iter_lines(decode_unicode=True)):
+            message = json.loads(data)
+            if "error" in message:
+                raise ValueError(f"MCP-Fehler: {message['error']}")
+            if message.get("method") == "notifications/progress":
+                delta = (message.get("params") or {}).get("message")
+                if delta:
+                    sent += delta
+                    yield delta
+            elif "result" in message:
+                text = self.parse(message)
+                if text.startswith(sent) and len(text) > len(sent):
+                    yield text[len(sent):]
+                break
+        if text is None:
+            raise ValueError("MCP-Stream ohne Ergebnis beendet.")
+        return text
+
+
+class _NativeBackend(ProviderBackend):
+    """Gemeinsame Auswertung über `core.response_parser` für die nativen APIs."""
+
+    def payload(self, user_input: str, model: str, stream: bool = False) -> Dict[str, Any]:
+        return build_payload(self.name, user_input, model or None)
+
+    def parse(self, data: Dict[str, Any]) -> str:
+        text = parse_response(self.name, data)
+        if not isinstance(text, str) or text.startswith("[Parse error]"):
+            raise ValueError(f"Unerwartete Antwort von {self.name}: {text}")
+        return text
+
+    def _delta(self, data: Dict[str, Any]) -> str:
+        """Extrahiert den Text eines einzelnen Stream-Events."""
+        raise NotImplementedError
+
+    def iter_stream(self, response) -> Iterator[str]:
+        """Liest die SSE-Events der API; antwortet der Server ohne Stream, wird normal geparst."""
+        if not _is_event_stream(response):
+            return (yield from super().iter_stream(response))
+        parts = []
+        for data in _iter_sse_data(response.iter_lines(decode_unicode=True)):
+            if data == "[DONE]":
+                break
+            message = json.loads(data)
+            if "error" in message:
+                raise ValueError(f"{self.name}-Fehler: {message['error']}")
+            delta = self._delta(message)
+            if delta:
+                parts.append(delta)
+                yield delta
+        return "".join(parts)
+
+
+class OpenAIBackend(_NativeBackend):
+    """Chat-Completions-API von OpenAI (`/v1/chat/completions`)."""
+
+    name = "openai"
+
+    def endpoint(self, api_url: str, model: str, stream: bool = False) -> str:
+        return _with_default_path(api_url, "/v1/chat/completions")
+
+    def payload(self, user_input: str, model: str, stream: bool = False) -> Dict[str, Any]:
+        payload = super().payload(user_input, model)
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _delta(self, data: Dict[str, Any]) -> str:
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+
+
+class GeminiBackend(_NativeBackend):
+    """Generative-Language-API von Google (`generateContent` bzw. `streamGenerateContent`)."""
+
+    name = "gemini"
+
+    def endpoint(self, api_url: str, model: str, stream: bool = False) -> str:
+        url = _with_default_path(
+            api_url, f"/v1beta/models/{model or 'gemini-pro'}:generateContent"
+        )
+        if stream and ":generateContent" in url:
+            url = url.replace(":generateContent", ":streamGenerateContent")
+            url += ("&" if "?" in url else "?") + "alt=sse"
+        return url
+
+    def headers(self, api_key: str, stream: bool = False) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["x-goog-api-key"] = api_key
+        return headers
+
+    def _delta(self, data: Dict[str, Any]) -> str:
+        candidates = data.get("candidates") or [{}]
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+
+class OllamaBackend(_NativeBackend):
+    """Generate-API von Ollama (`/api/generate`), streamt zeilenweise JSON (NDJSON)."""
+
+    name = "ollama"
+
+    def endpoint(self, api_url: str, model: str, stream: bool = False) -> str:
+        return _with_default_path(api_url, "/api/generate")
+
+    def payload(self, user_input: str, model: str, stream: bool = False) -> Dict[str, Any]:
+        payload = super().payload(user_input, model)
+        # Ollama streamt ohne Angabe standardmäßig
+        payload["stream"] = stream
+        return payload
+
+    def iter_stream(self, response) -> Iterator[str]:
+        parts = []
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            message = json.loads(line)
+            if "error" in message:
+                raise ValueError(f"ollama-Fehler: {message['error']}")
+            delta = message.get("response") or ""
+            if delta:
+                parts.append(delta)
+                yield delta
+            if message.get("done"):
+                break
+        return "".join(parts)
+
+
+_backends: Dict[str, ProviderBackend] = {
+    "mcp": MCPBackend(),
+    "openai": OpenAIBackend(),
+    "gemini": GeminiBackend(),
+    "ollama": OllamaBackend(),
+}
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Backend-Auswahl an.
+
+    Unterstützte Optionen:
+      - native (bool): False sendet alle Anfragen über MCP (Verhalten vor den nativen Backends).
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+
+
+def register_backend(api_type: str, backend: ProviderBackend) -> None:
+    """
+    Registriert ein Backend für einen API-Typ aus `detect_api_type` (oder "mcp").
+
+    Args:
+        api_type (str): Der API-Typ, z. B. "openai".
+        backend (ProviderBackend): Das zu verwendende Backend.
+    """
+    _backends[api_type] = backend
+
+
+def get_backend(api_url: str) -> ProviderBackend:
+    """
+    Wählt das Backend für eine API-URL.
+
+    URLs, deren Pfad ein Segment "mcp" enthält, sowie nicht erkannte URLs
+    gehen an das MCP-Backend.
+
+    Args:
+        api_url (str): Die vom User konfigurierte API-URL.
+
+    Returns:
+        ProviderBackend: Das zuständige Backend.
+    """
+    if not _config["native"] or "mcp" in urlparse(api_url).path.lower().split("/"):
+        return _backends["mcp"]
+    return _backends.get(detect_api_type(api_url), _backends["mcp"])
@@ -0,0 +1,338 @@
+"""
+core/rate_limiter.py
+
+Dieses Modul begrenzt LLM-Aufrufe pro User und pro API-URL.
+
+  - Token-Buckets begrenzen die Rate neuer Generierungs-Requests
+    (`user_rate`/`user_burst` pro User, `endpoint_rate`/`endpoint_burst` pro API-URL).
+    Ist ein Bucket leer, wird der Request mit `RateLimitExceeded` abgelehnt; die
+    Flask-App antwortet dann mit 429 und `Retry-After`.
+  - Semaphoren begrenzen gleichzeitig laufende LLM-Aufrufe
+    (`user_concurrency` pro User, `endpoint_concurrency` pro API-URL). Wartende
+    Aufrufe verschiedener User werden reihum bedient (Fair Queueing), sodass ein
+    User mit vielen Tickets die übrigen nicht aushungert.
+
+Der User eines Aufrufs wird über `scope(user_id)` im aktuellen Kontext gesetzt;
+`core.request_handler` belegt um jeden LLM-Aufruf einen Slot über `slot()`.
+Ohne Konfiguration ist nichts begrenzt.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Hashable, Iterator, Optional, Tuple
+
+_user: contextvars.ContextVar = contextvars.ContextVar("rate_limit_user", default=None)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Wird geworfen, wenn ein Limit überschritten ist.
+
+    Attributes:
+        retry_after (float): Empfohlene Wartezeit in Sekunden bis zum nächsten Versuch.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token-Bucket mit kontinuierlicher Auffüllung.
+
+    Attributes:
+        rate (float): Nachgefüllte Tokens pro Sekunde.
+        capacity (float): Maximale Anzahl Tokens (Burst).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Liefert die Zeit in Sekunden, bis `tokens` verfügbar sind (0 = sofort)."""
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def take(self, tokens: float = 1.0) -> None:
+        """Entnimmt Tokens; vorher mit `wait_time` prüfen."""
+        self._refill()
+        self._tokens -= tokens
+
+
+class FairSemaphore:
+    """
+    Semaphore, die wartende Aufrufe reihum nach Schlüssel (User) freigibt.
+
+    Jeder Schlüssel hat eine eigene FIFO-Warteschlange; wird ein Slot frei,
+    erhält ihn der nächste Schlüssel in der Runde, nicht der älteste Aufruf.
+
+    Attributes:
+        limit (int): Maximale Anzahl gleichzeitig vergebener Slots.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._queues: "OrderedDict[Hashable, Deque[threading.Event]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enqueue(self, key: Hashable) -> threading.Event:
+        """Reiht einen Aufruf ein; das Event wird gesetzt, sobald er den Slot besitzt."""
+        waiter = threading.Event()
+        with self._lock:
+            if self._active < self.limit and not self._queues:
+                self._active += 1
+                waiter.set()
+            else:
+                self._queues.setdefault(key, deque()).append(waiter)
+        return waiter
+
+    def cancel(self, key: Hashable, waiter: threading.Event) -> bool:
+        """
+        Zieht einen wartenden Aufruf zurück.
+
+        Returns:
+            bool: False, wenn der Slot inzwischen doch vergeben wurde (dann muss
+                `release` aufgerufen werden).
+        """
+        with self._lock:
+            if waiter.is_set():
+                return False
+            queue = self._queues.get(key)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[key]
+            return True
+
+    def acquire(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """Wartet höchstens `timeout` Sekunden auf einen Slot."""
+        waiter = self.enqueue(key)
+        if waiter.wait(timeout):
+            return True
+        return not self.cancel(key, waiter)
+
+    def release(self) -> None:
+        """Gibt einen Slot frei bzw. reicht ihn an den nächsten User in der Runde weiter."""
+        with self._lock:
+            if self._queues:
+                key, queue = next(iter(self._queues.items()))
+                waiter = queue.popleft()
+                if queue:
+                    self._queues.move_to_end(key)
+                else:
+                    del self._queues[key]
+                waiter.set()
+            else:
+                self._active -= 1
+
+    def waiting(self, key: Hashable) -> int:
+        """Anzahl der wartenden Aufrufe eines Schlüssels."""
+        with self._lock:
+            return len(self._queues.get(key, ()))
+
+
+class RateLimiter:
+    """
+    Verwaltet Token-Buckets und Semaphoren pro User und API-URL.
+
+    Alle Limits sind optional; None bedeutet unbegrenzt.
+
+    Attributes:
+        user_rate (Optional[float]): Generierungs-Requests pro Sekunde und User.
+        user_burst (Optional[float]): Burst-Größe pro User (Standard: max(1, user_rate)).
+        endpoint_rate (Optional[float]): Generierungs-Requests pro Sekunde und API-URL.
+        endpoint_burst (Optional[float]): Burst-Größe pro API-URL.
+        user_concurrency (Optional[int]): Gleichzeitige LLM-Aufrufe pro User.
+        endpoint_concurrency (Optional[int]): Gleichzeitige LLM-Aufrufe pro API-URL.
+        max_queue (Optional[int]): Maximale Zahl wartender LLM-Aufrufe eines Users pro
+            API-URL, ab der neue Requests abgelehnt werden.
+        queue_timeout (float): Maximale Wartezeit eines LLM-Aufrufs auf einen Slot.
+    """
+
+    def __init__(
+        self,
+        user_rate: Optional[float] = None,
+        user_burst: Optional[float] = None,
+        endpoint_rate: Optional[float] = None,
+        endpoint_burst: Optional[float] = None,
+        user_concurrency: Optional[int] = None,
+        endpoint_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: float = 300.0,
+    ):
+        self.user_rate = user_rate
+        self.user_burst = user_burst or (max(1.0, user_rate) if user_rate else None)
+        self.endpoint_rate = endpoint_rate
+        self.endpoint_burst = endpoint_burst or (max(1.0, endpoint_rate) if endpoint_rate else None)
+        self.user_concurrency = user_concurrency
+        self.endpoint_concurrency = endpoint_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._buckets: Dict[Tuple[str, Hashable], TokenBucket] = {}
+        self._semaphores: Dict[Tuple[str, Hashable], FairSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, kind: str, key: Hashable) -> Optional[TokenBucket]:
+        rate, burst = (
+            (self.user_rate, self.user_burst) if kind == "user"
+            else (self.endpoint_rate, self.endpoint_burst)
+        )
+        if not rate:
+            return None
+        bucket = self._buckets.get((kind, key))
+        if bucket is None:
+            bucket = self._buckets[(kind, key)] = TokenBucket(rate, burst)
+        return bucket
+
+    def _semaphore(self, kind: str, key: Hashable) -> Optional[FairSemaphore]:
+        limit = self.user_concurrency if kind == "user" else self.endpoint_concurrency
+        if not limit:
+            return None
+        with self._lock:
+            semaphore = self._semaphores.get((kind, key))
+            if semaphore is None:
+                semaphore = self._semaphores[(kind, key)] = FairSemaphore(limit)
+            return semaphore
+
+    def admit(self, user_id: Hashable, api_url: str) -> None:
+        """
+        Prüft, ob ein neuer Generierungs-Request angenommen wird, und verbraucht ein Token.
+
+        Raises:
+            RateLimitExceeded: Wenn ein Bucket leer ist oder zu viele Aufrufe warten.
+        """
+        if self.max_queue is not None:
+            for kind, key in (("user", user_id), ("endpoint", api_url)):
+                semaphore = self._semaphore(kind, key)
+                if semaphore is not None and semaphore.waiting(user_id) >= self.max_queue:
+                    raise RateLimitExceeded(
+                        "Zu viele wartende LLM-Aufrufe. Bitte später erneut versuchen.", 1.0
+                    )
+        with self._lock:
+            buckets = [b for b in (self._bucket("user", user_id), self._bucket("endpoint", api_url)) if b]
+            wait = max((b.wait_time() for b in buckets), default=0.0)
+            if wait > 0:
+                raise RateLimitExceeded(
+                    "Rate-Limit überschritten. Bitte später erneut versuchen.", wait
+                )
+            for bucket in buckets:
+                bucket.take()
+
+    def _acquire_all(self, user_id: Hashable, api_url: str) -> list:
+        """Belegt die Slots für User und API-URL (in fester Reihenfolge) und liefert sie."""
+        held = []
+        deadline = time.monotonic() + self.queue_timeout
+        for kind, key in (("user", user_id), ("endpoint", api_url)):
+            semaphore = self._semaphore(kind, key)
+            if semaphore is None:
+                continue
+            if not semaphore.acquire(user_id, max(0.0, deadline - time.monotonic())):
+                for s in held:
+                    s.release()
+                raise RateLimitExceeded(
+                    "Zeitüberschreitung beim Warten auf einen freien LLM-Slot.", 1.0
+                )
+            held.append(semaphore)
+        return held
+
+    @contextmanager
+    def slot(self, api_url: str, user_id: Hashable = None) -> Iterator[None]:
+        """
+        Belegt für die Dauer eines LLM-Aufrufs je einen Slot für User und API-URL.
+
+        Args:
+            api_url (str): Die aufgerufene API-URL.
+            user_id (Hashable): Der User; standardmäßig der aus `scope()`.
+
+        Raises:
+            RateLimitExceeded: Wenn innerhalb von `queue_timeout` kein Slot frei wird.
+        """
+        user_id = user_id if user_id is not None else _user.get()
+        held = self._acquire_all(user_id, api_url)
+        try:
+            yield
+        finally:
+            for semaphore in reversed(held):
+                semaphore.release()
+
+    @asynccontextmanager
+    async def slot_async(self, api_url: str, user_id: Hashable = None):
+        """Asynchrone Variante von `slot`, die beim Warten die Event-Loop nicht blockiert."""
+        user_id = user_id if user_id is not None else _user.get()
+        held = []
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            for kind, key in (("user", user_id), ("endpoint", api_url)):
+                semaphore = self._semaphore(kind, key)
+                if semaphore is None:
+                    continue
+                waiter = semaphore.enqueue(user_id)
+                try:
+                    while not waiter.is_set():
+                        if time.monotonic() >= deadline:
+                            raise RateLimitExceeded(
+                                "Zeitüberschreitung beim Warten auf einen freien LLM-Slot.", 1.0
+                            )
+                        await asyncio.sleep(0.01)
+                except BaseException:
+                    # Auch bei Abbruch der Koroutine darf kein vergebener Slot verloren gehen
+                    if not semaphore.cancel(user_id, waiter):
+                        semaphore.release()
+                    raise
+                held.append(semaphore)
+            yield
+        finally:
+            for semaphore in reversed(held):
+                semaphore.release()
+
+
+_OPTIONS = (
+    "user_rate", "user_burst", "endpoint_rate", "endpoint_burst",
+    "user_concurrency", "endpoint_concurrency", "max_queue", "queue_timeout",
+)
+_limiter = RateLimiter()
+
+
+def configure(**options: Any) -> None:
+    """
+    Ersetzt den prozessweiten Limiter mit neuen Limits (siehe `RateLimiter`).
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    global _limiter
+    unknown = set(options) - set(_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _limiter = RateLimiter(**options)
+
+
+def get_limiter() -> RateLimiter:
+    """Gibt den prozessweiten Limiter zurück."""
+    return _limiter
+
+
+@contextmanager
+def scope(user_id: Hashable) -> Iterator[None]:
+    """Ordnet alle LLM-Aufrufe im aktuellen Kontext dem User `user_id` zu."""
+    token = _user.set(user_id)
+    try:
+        yield
+    finally:
+        _user.reset(token)
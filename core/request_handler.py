@@ -1,68 +1,234 @@
 """
 core/request_handler.py
 
-Dieses Modul stellt eine Funktion bereit, um eine Anfrage über die
-Model Context Protocol (MCP) zu senden.
+Dieses Modul stellt Funktionen bereit, um eine Anfrage an ein LLM zu senden –
+synchron über den gepoolten `requests`-Client und asynchron über einen
+`httpx.AsyncClient`. Das Format der Anfrage bestimmt das Provider-Backend aus
+`core.providers`: OpenAI, Gemini und Ollama werden nativ angesprochen, alle
+übrigen Endpunkte über das Model Context Protocol (MCP).
+
+Vor beiden Pfaden liegt der Antwort-Cache aus `core.response_cache`. Ist im
+aktuellen Kontext ein Router aus `core.router` aktiv, wird die Anfrage über
+dessen Endpunkt-Pool verteilt; jeder Aufruf belegt zudem einen Slot des
+Limiters aus `core.rate_limiter`.
+Mit `stream_llm_request` kann die Antwort zudem inkrementell gelesen werden.
+HTTP-Wartezeit, Auswertung der Antwort sowie Byte- und Token-Mengen werden in
+`core.metrics` erfasst.
 """
 
-import requests
-from mcp.types import CallToolRequestParams, JSONRPCRequest, CallToolResult
+from typing import Iterator, Optional
+
+import httpx
+from core import http_client, metrics, providers, rate_limiter, response_cache, router, single_flight
 
 
 def send_llm_request(
     api_url: str,
     api_key: str,
     user_input: str,
-    model: str
+    model: str,
+    use_cache: bool = True
 ):
     """
     Sendet eine Anfrage an die angegebene LLM-API und gibt die geparste Antwort zurück.
 
     Der Ablauf:
-      1. Zusammenstellung einer MCP "tools/call" Anfrage.
-      2. Absenden des HTTP-POST-Requests.
-      3. Fehlerbehandlung bei HTTP-Statuscodes >= 400.
-      4. Extraktion des Textes aus dem MCP Ergebnis.
+      1. Nachschlagen im Antwort-Cache (außer bei `use_cache=False` oder `response_cache.bypass()`).
+      2. Zusammenstellung der Anfrage durch das Provider-Backend (nativ oder MCP "tools/call").
+      3. Absenden des HTTP-POST-Requests über den gepoolten Client (`core.http_client`);
+         502/503/504 des Gateways werden dabei wiederholt.
+      4. Fehlerbehandlung bei HTTP-Statuscodes >= 400.
+      5. Extraktion des Antworttextes durch das Backend und Ablage im Cache.
+
+    Gleichzeitige identische Anfragen (gleiche API-URL, Modell und Prompt) teilen
+    sich über `core.single_flight` einen einzigen Upstream-Aufruf.
 
     Args:
-        api_url (str): MCP-Endpunkt.
+        api_url (str): LLM- bzw. MCP-Endpunkt.
         api_key (str): API-Schlüssel für die Authentifizierung. Wenn leer, wird keine Authorization-Header gesetzt.
         user_input (str): Der Eingabetext, der an das LLM gesendet wird.
         model (str): Modellname, der im Payload verwendet werden soll (z. B. "gpt-4" oder "llama2").
+        use_cache (bool): False erzwingt eine frische Antwort vom LLM.
 
     Returns:
-        str: Der extrahierte Text des Tools.
+        str: Der extrahierte Antworttext.
 
     Raises:
         requests.HTTPError: Wenn der HTTP-Statuscode des API-Responses auf einen Fehler hinweist.
+        requests.Timeout: Wenn der Endpunkt nicht innerhalb der konfigurierten Timeouts antwortet.
         KeyError / TypeError: Wenn das erwartete Format der API-Antwort nicht vorliegt.
     """
-    # 1. Payload bauen
-    request_obj = JSONRPCRequest(
-        jsonrpc="2.0",
-        id=1,
-        method="tools/call",
-        params=CallToolRequestParams(
-            name="generateText",
-            arguments={"prompt": user_input, "model": model},
-        ).model_dump(),
-    )
-
-    payload = request_obj.model_dump()
-
-    # 2. Header zusammenstellen
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-
-    # 3. Anfrage senden und auf HTTP-Fehler prüfen
-    response = requests.post(api_url, headers=headers, json=payload)
-    response.raise_for_status()
-
-    # 4. Antwort parsen und zurückgeben
-    data = response.json()
-    result = CallToolResult.model_validate(data.get("result", {}))
-    text = "".join(
-        part.text for part in result.content if getattr(part, "type", None) == "text"
-    )
+    route = router.current()
+    if route is not None:
+        return route.call(lambda ep: send_llm_request(
+            ep.api_url, ep.api_key, user_input, ep.model or model, use_cache
+        ))
+
+    cache = response_cache.get_cache()
+    key = response_cache.make_key(api_url, model, user_input)
+    if use_cache and not response_cache.is_bypassed():
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.record_llm_call(api_url, model, user_input, cached, "hit")
+            return cached
+
+    backend = providers.get_backend(api_url)
+
+    labels = {"api_url": api_url, "model": model}
+
+    def call() -> str:
+        with rate_limiter.get_limiter().slot(api_url), metrics.timer("llm.http", **labels):
+            response = http_client.post(
+                backend.endpoint(api_url, model),
+                headers=backend.headers(api_key),
+                json=backend.payload(user_input, model),
+                retry_status=True,
+            )
+        response.raise_for_status()
+        with metrics.timer("llm.parse", **labels):
+            text = backend.parse(response.json())
+        metrics.record_llm_call(api_url, model, user_input, text, "miss")
+        cache.put(key, text)
+        return text
+
+    return single_flight.do(key, call)
+
+
+async def async_send_llm_request(
+    api_url: str,
+    api_key: str,
+    user_input: str,
+    model: str,
+    client: Optional[httpx.AsyncClient] = None,
+    use_cache: bool = True
+) -> str:
+    """
+    Asynchrones Gegenstück zu `send_llm_request`.
+
+    Payload, Header und Auswertung sind identisch zur synchronen Variante; der
+    Request läuft jedoch über einen `httpx.AsyncClient`, sodass viele Aufrufe
+    gleichzeitig auf einer Event-Loop offen sein können.
+
+    Args:
+        api_url (str): LLM- bzw. MCP-Endpunkt.
+        api_key (str): API-Schlüssel für die Authentifizierung (oder leer).
+        user_input (str): Der Eingabetext, der an das LLM gesendet wird.
+        model (str): Modellname, der im Payload verwendet werden soll.
+        client (httpx.AsyncClient, optional): Zu verwendender Client; standardmäßig
+            der geteilte Client der laufenden Event-Loop aus `core.http_client`.
+        use_cache (bool): False erzwingt eine frische Antwort vom LLM.
+
+    Returns:
+        str: Der extrahierte Antworttext.
+
+    Raises:
+        httpx.HTTPStatusError: Wenn der HTTP-Statuscode auf einen Fehler hinweist.
+        httpx.TimeoutException: Wenn der Endpunkt nicht rechtzeitig antwortet.
+    """
+    route = router.current()
+    if route is not None:
+        return await route.call_async(lambda ep: async_send_llm_request(
+            ep.api_url, ep.api_key, user_input, ep.model or model, client, use_cache
+        ))
+
+    cache = response_cache.get_cache()
+    key = response_cache.make_key(api_url, model, user_input)
+    if use_cache and not response_cache.is_bypassed():
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.record_llm_call(api_url, model, user_input, cached, "hit")
+            return cached
+
+    backend = providers.get_backend(api_url)
+
+    labels = {"api_url": api_url, "model": model}
+
+    async def call() -> str:
+        async with rate_limiter.get_limiter().slot_async(api_url):
+            with metrics.timer("llm.http", **labels):
+                response = await http_client.async_post(
+                    backend.endpoint(api_url, model),
+                    retry_status=True,
+                    client=client,
+                    headers=backend.headers(api_key),
+                    json=backend.payload(user_input, model),
+                )
+        response.raise_for_status()
+        with metrics.timer("llm.parse", **labels):
+            text = backend.parse(response.json())
+        metrics.record_llm_call(api_url, model, user_input, text, "miss")
+        cache.put(key, text)
+        return text
+
+    return await single_flight.do_async(key, call)
+
+
+def stream_llm_request(
+    api_url: str,
+    api_key: str,
+    user_input: str,
+    model: str,
+    use_cache: bool = True
+) -> Iterator[str]:
+    """
+    Sendet eine Anfrage wie `send_llm_request`, liefert die Antwort aber stückweise.
+
+    Antwortet der MCP-Server mit `text/event-stream`, werden Text-Deltas aus
+    `notifications/progress`-Nachrichten (Feld `message`) sofort weitergereicht;
+    das abschließende `CallToolResult` liefert nur noch den noch nicht gesendeten Rest.
+    Bei einer normalen JSON-Antwort wird der gesamte Text als ein Stück geliefert.
+
+    Maßgeblich ist immer der Text des `CallToolResult`: Er wird als Rückgabewert
+    des Generators geliefert (`text = yield from stream_llm_request(...)`) und
+    im Antwort-Cache abgelegt. Weicht er von den gestreamten Deltas ab, sind die
+    Deltas nur eine Vorschau.
+
+    Args:
+        api_url (str): LLM- bzw. MCP-Endpunkt.
+        api_key (str): API-Schlüssel für die Authentifizierung (oder leer).
+        user_input (str): Der Eingabetext, der an das LLM gesendet wird.
+        model (str): Modellname, der im Payload verwendet werden soll.
+        use_cache (bool): False erzwingt eine frische Antwort vom LLM.
+
+    Yields:
+        str: Die Textstücke in Empfangsreihenfolge.
+
+    Returns:
+        str: Der vollständige Text des Ergebnisses.
+
+    Raises:
+        requests.HTTPError: Wenn der HTTP-Statuscode auf einen Fehler hinweist.
+        ValueError: Wenn der Server eine JSON-RPC-Fehlermeldung sendet oder der
+            Stream ohne Ergebnis endet.
+    """
+    route = router.current()
+    if route is not None:
+        return (yield from route.stream(lambda ep: stream_llm_request(
+            ep.api_url, ep.api_key, user_input, ep.model or model, use_cache
+        )))
+
+    cache = response_cache.get_cache()
+    key = response_cache.make_key(api_url, model, user_input)
+    if use_cache and not response_cache.is_bypassed():
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.record_llm_call(api_url, model, user_input, cached, "hit")
+            yield cached
+            return cached
+
+    backend = providers.get_backend(api_url)
+    labels = {"api_url": api_url, "model": model}
+    with rate_limiter.get_limiter().slot(api_url), metrics.timer("llm.stream", **labels):
+        with http_client.post(
+            backend.endpoint(api_url, model, stream=True),
+            headers=backend.headers(api_key, stream=True),
+            json=backend.payload(user_input, model, stream=True),
+            stream=True,
+            retry_status=True,
+        ) as response:
+            response.raise_for_status()
+            text = yield from backend.iter_stream(response)
+
+    metrics.record_llm_call(api_url, model, user_input, text, "miss")
+    cache.put(key, text)
     return text
@@ -0,0 +1,273 @@
+"""
+core/response_cache.py
+
+Dieses Modul stellt einen inhaltsadressierten Cache für LLM-Antworten bereit.
+Der Schlüssel ist ein SHA-256-Hash über (api_url, model, prompt).
+
+Der Cache besteht aus zwei Stufen:
+  - einer In-Memory-LRU mit begrenzter Anzahl Einträge,
+  - einer optionalen On-Disk-Stufe mit TTL- und größenbasierter Verdrängung.
+
+Über den Kontextmanager `bypass()` bzw. `use_cache=False` in
+`send_llm_request` kann der Cache pro Anfrage umgangen werden.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_bypass: contextvars.ContextVar = contextvars.ContextVar("response_cache_bypass", default=False)
+
+
+def make_key(api_url: str, model: Optional[str], prompt: str) -> str:
+    """
+    Berechnet den Cache-Schlüssel für eine Anfrage.
+
+    Args:
+        api_url (str): Der LLM-Endpunkt.
+        model (Optional[str]): Der Modellname (oder None).
+        prompt (str): Der vollständige Prompt.
+
+    Returns:
+        str: Hex-kodierter SHA-256-Hash.
+    """
+    raw = json.dumps([api_url, model or "", prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Zweistufiger Cache für LLM-Antworten.
+
+    Für die Disk-Stufe wird ein In-Memory-Index (Schlüssel -> Größe, Änderungszeit)
+    geführt, sodass `put` das Verzeichnis nicht erneut durchsuchen muss. Datei-I/O
+    findet außerhalb der Sperre statt; nur Index und LRU sind durch `_lock` geschützt.
+
+    Attributes:
+        max_entries (int): Maximale Anzahl Einträge im Speicher (LRU).
+        directory (Optional[Path]): Verzeichnis der Disk-Stufe; None deaktiviert sie.
+        ttl (Optional[float]): Lebensdauer eines Eintrags in Sekunden; None = unbegrenzt.
+        max_disk_bytes (Optional[int]): Maximale Gesamtgröße der Disk-Stufe in Bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        directory: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Disk-Index in Verdrängungsreihenfolge (älteste zuerst)
+        self._disk_index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._disk_bytes = 0
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, path.stem, st.st_size))
+            for mtime, key, size in sorted(entries):
+                self._disk_index[key] = (size, mtime)
+                self._disk_bytes += size
+
+    def _expired(self, created: float) -> bool:
+        """Prüft, ob ein Eintrag mit Erstellungszeit `created` abgelaufen ist."""
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _disk_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Liefert die gecachte Antwort für `key` oder None.
+
+        Treffer der Disk-Stufe werden in die Speicher-Stufe übernommen. Unlesbare
+        oder unvollständige Dateien gelten als Fehlschlag und werden entfernt.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+            on_disk = self.directory is not None and key in self._disk_index
+
+        if on_disk:
+            path = self._disk_path(key)
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+                created, response = float(record["created"]), record["response"]
+            except (OSError, ValueError, KeyError, TypeError):
+                created = response = None
+            if response is not None and not self._expired(created):
+                with self._lock:
+                    self._remember(key, created, response)
+                    self._counters["disk_hits"] += 1
+                return response
+            with self._lock:
+                removed = self._forget_disk(key)
+            if removed:
+                self._unlink(path)
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, response: str) -> None:
+        """Speichert eine Antwort in beiden Stufen und verdrängt bei Bedarf alte Einträge."""
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, response)
+        if not self.directory:
+            return
+
+        path = self._disk_path(key)
+        data = json.dumps({"created": created, "response": response}, ensure_ascii=False)
+        tmp = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError:
+            self._unlink(tmp)
+            return
+
+        with self._lock:
+            self._forget_disk(key)
+            self._disk_index[key] = (size, created)
+            self._disk_bytes += size
+            victims = self._select_disk_victims()
+        for victim in victims:
+            self._unlink(self._disk_path(victim))
+
+    def _remember(self, key: str, created: float, response: str) -> None:
+        """Fügt einen Eintrag in die LRU ein; Aufrufer muss `_lock` halten."""
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _forget_disk(self, key: str) -> bool:
+        """Entfernt einen Schlüssel aus dem Disk-Index; Aufrufer muss `_lock` halten."""
+        entry = self._disk_index.pop(key, None)
+        if entry is None:
+            return False
+        self._disk_bytes -= entry[0]
+        return True
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        """Löscht eine Datei und ignoriert dabei Dateisystemfehler."""
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _select_disk_victims(self) -> List[str]:
+        """
+        Wählt abgelaufene und die ältesten Einträge, bis die Größengrenze passt.
+
+        Ohne TTL und Größengrenze wird nichts verdrängt. Aufrufer muss `_lock` halten
+        und die zurückgegebenen Dateien anschließend außerhalb der Sperre löschen.
+        """
+        victims = []
+        cutoff = time.time() - self.ttl if self.ttl is not None else None
+        for key, (_, mtime) in list(self._disk_index.items()):
+            expired = cutoff is not None and mtime < cutoff
+            too_big = self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes
+            if not (expired or too_big):
+                break
+            self._forget_disk(key)
+            self._counters["evictions"] += 1
+            victims.append(key)
+        return victims
+
+    def clear(self) -> None:
+        """Leert beide Stufen und setzt die Zähler zurück."""
+        with self._lock:
+            self._memory.clear()
+            keys = list(self._disk_index)
+            self._disk_index.clear()
+            self._disk_bytes = 0
+            self._counters = dict.fromkeys(self._counters, 0)
+        for key in keys:
+            self._unlink(self._disk_path(key))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Liefert die Treffer-/Fehlzähler und Belegung des Caches.
+
+        Returns:
+            Dict[str, int]: hits, misses, memory_hits, disk_hits, evictions,
+                            memory_entries und disk_bytes.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+            return stats
+
+
+_cache = ResponseCache()
+
+
+def get_cache() -> ResponseCache:
+    """Gibt die prozessweite Cache-Instanz zurück."""
+    return _cache
+
+
+def configure(**options) -> ResponseCache:
+    """
+    Ersetzt die prozessweite Cache-Instanz durch eine neu konfigurierte.
+
+    Args:
+        **options: Argumente für `ResponseCache` (max_entries, directory, ttl, max_disk_bytes).
+
+    Returns:
+        ResponseCache: Die neue Instanz.
+    """
+    global _cache
+    _cache = ResponseCache(**options)
+    return _cache
+
+
+@contextmanager
+def bypass() -> Iterator[None]:
+    """
+    Umgeht den Cache für alle LLM-Anfragen im aktuellen Kontext.
+
+    Frische Antworten werden dennoch gespeichert, sodass spätere Anfragen
+    das neueste Ergebnis erhalten.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_bypassed() -> bool:
+    """Gibt an, ob der Cache im aktuellen Kontext umgangen wird."""
+    return _bypass.get()
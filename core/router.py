@@ -0,0 +1,332 @@
+"""
+core/router.py
+
+Dieses Modul verteilt LLM-Anfragen auf einen Pool konfigurierter Endpunkte
+(z. B. alle `APIKey`-Einträge eines Users).
+
+  - Auswahl nach geringster Zahl offener Anfragen ("least_outstanding") oder
+    gewichtet nach gemessener Latenz ("latency").
+  - Pro Endpunkt ein Circuit Breaker: Nach `failure_threshold` Fehlern in Folge
+    wird der Endpunkt für `reset_timeout` Sekunden gesperrt und danach mit einer
+    einzelnen Probe-Anfrage wieder getestet.
+  - Automatisches Failover: Schlägt eine Anfrage fehl, wird sie am nächsten
+    verfügbaren Endpunkt wiederholt. Antworten über `slow_threshold` Sekunden
+    zählen für den Circuit Breaker als Fehler.
+
+Der Gesundheitszustand eines Endpunkts (gleiche API-URL und Modell) wird
+prozessweit geteilt, sodass er über einzelne Requests hinweg erhalten bleibt.
+Aktiviert wird das Routing über `use(router)`; `core.request_handler` leitet
+dann jede Anfrage im aktuellen Kontext über den Router.
+"""
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+_current: contextvars.ContextVar = contextvars.ContextVar("llm_router", default=None)
+_lock = threading.Lock()
+
+# Glättungsfaktor für den gleitenden Latenz-Mittelwert
+_EWMA_ALPHA = 0.3
+
+
+class NoEndpointAvailable(RuntimeError):
+    """Wird geworfen, wenn alle Endpunkte gesperrt oder bereits fehlgeschlagen sind."""
+
+
+class Endpoint:
+    """
+    Ein LLM-Endpunkt mit Last- und Gesundheitszustand.
+
+    Attributes:
+        api_url (str): Die API-URL.
+        api_key (str): Der zu verwendende API-Schlüssel.
+        model (str): Modellname für diesen Endpunkt (leer = Modell der Anfrage).
+        outstanding (int): Anzahl gerade laufender Anfragen.
+        latency (Optional[float]): Gleitender Mittelwert der Antwortzeit in Sekunden.
+        failures (int): Fehler in Folge seit der letzten erfolgreichen Anfrage.
+        opened_at (Optional[float]): Zeitpunkt, zu dem der Circuit Breaker geöffnet wurde.
+        probing (bool): Ob gerade eine Probe-Anfrage im halb offenen Zustand läuft.
+    """
+
+    def __init__(self, api_url: str, api_key: str = "", model: str = ""):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def state(self, reset_timeout: float, now: Optional[float] = None) -> str:
+        """Liefert den Zustand des Circuit Breakers: "closed", "open" oder "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if (now or time.monotonic()) - self.opened_at >= reset_timeout:
+            return "half_open"
+        return "open"
+
+    def as_dict(self, reset_timeout: float) -> Dict[str, Any]:
+        """Liefert den Zustand des Endpunkts für Statusausgaben (ohne API-Schlüssel)."""
+        return {
+            "api_url": self.api_url,
+            "model": self.model,
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "failures": self.failures,
+            "state": self.state(reset_timeout),
+        }
+
+
+_endpoints: Dict[Tuple[str, str], Endpoint] = {}
+
+
+def get_endpoint(api_url: str, api_key: str = "", model: str = "") -> Endpoint:
+    """
+    Gibt den prozessweit geteilten Endpunkt für API-URL und Modell zurück.
+
+    Der API-Schlüssel wird bei jedem Aufruf aktualisiert.
+    """
+    key = (api_url, model or "")
+    with _lock:
+        endpoint = _endpoints.get(key)
+        if endpoint is None:
+            endpoint = _endpoints[key] = Endpoint(api_url, api_key, model or "")
+        endpoint.api_key = api_key
+        return endpoint
+
+
+def reset() -> None:
+    """Verwirft den Zustand aller Endpunkte (z. B. für Tests)."""
+    with _lock:
+        _endpoints.clear()
+
+
+class Router:
+    """
+    Wählt für jede Anfrage einen Endpunkt aus und wiederholt fehlgeschlagene
+    Anfragen an anderen Endpunkten.
+
+    Attributes:
+        endpoints (List[Endpoint]): Der Endpunkt-Pool.
+        strategy (str): "least_outstanding" oder "latency".
+        failure_threshold (int): Fehler in Folge, nach denen ein Endpunkt gesperrt wird.
+        reset_timeout (float): Sperrdauer in Sekunden bis zur nächsten Probe-Anfrage.
+        slow_threshold (Optional[float]): Antwortzeit in Sekunden, ab der eine Anfrage als Fehler zählt.
+    """
+
+    STRATEGIES = ("least_outstanding", "latency")
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        slow_threshold: Optional[float] = None,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unbekannte Routing-Strategie: {strategy}")
+        self.endpoints = list(endpoints)
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_threshold = slow_threshold
+        self._random = random.Random()
+
+    def _acquire(self, exclude: List[Endpoint]) -> Endpoint:
+        """
+        Wählt einen verfügbaren Endpunkt und zählt die Anfrage als offen.
+
+        Raises:
+            NoEndpointAvailable: Wenn kein Endpunkt verfügbar ist.
+        """
+        now = time.monotonic()
+        with _lock:
+            candidates, probes = [], []
+            for ep in self.endpoints:
+                if ep in exclude:
+                    continue
+                state = ep.state(self.reset_timeout, now)
+                if state == "closed":
+                    candidates.append(ep)
+                elif state == "half_open" and not ep.probing:
+                    probes.append(ep)
+            if not candidates and not probes:
+                raise NoEndpointAvailable("Kein LLM-Endpunkt verfügbar.")
+            if probes:
+                # Gesperrte Endpunkte bekommen nach Ablauf der Sperre eine einzelne Probe
+                chosen = probes[0]
+                chosen.probing = True
+            elif self.strategy == "latency":
+                chosen = self._by_latency(candidates)
+            else:
+                chosen = min(
+                    candidates,
+                    key=lambda ep: (ep.outstanding, ep.latency if ep.latency is not None else 0.0),
+                )
+            chosen.outstanding += 1
+            return chosen
+
+    def _by_latency(self, candidates: List[Endpoint]) -> Endpoint:
+        """Zufällige Auswahl, gewichtet mit Kehrwert von Latenz und Last."""
+        known = [ep.latency for ep in candidates if ep.latency]
+        # Unbekannte Endpunkte werden wie der schnellste behandelt, damit sie gemessen werden
+        fastest = min(known) if known else 1.0
+        weights = [
+            1.0 / ((ep.latency or fastest) * (ep.outstanding + 1)) for ep in candidates
+        ]
+        return self._random.choices(candidates, weights=weights)[0]
+
+    def _release(self, endpoint: Endpoint, elapsed: float, error: bool) -> None:
+        """Verbucht das Ergebnis einer Anfrage im Zustand des Endpunkts."""
+        failed = error or (self.slow_threshold is not None and elapsed > self.slow_threshold)
+        with _lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+            if not error:
+                endpoint.latency = elapsed if endpoint.latency is None else (
+                    _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * endpoint.latency
+                )
+            if failed:
+                endpoint.failures += 1
+                if endpoint.opened_at is not None or endpoint.failures >= self.failure_threshold:
+                    endpoint.opened_at = time.monotonic()
+            else:
+                endpoint.failures = 0
+                endpoint.opened_at = None
+
+    def call(self, fn: Callable[[Endpoint], Any]) -> Any:
+        """
+        Führt `fn(endpoint)` am gewählten Endpunkt aus, bei Fehlern am nächsten.
+
+        Innerhalb von `fn` ist das Routing deaktiviert, sodass der eigentliche
+        LLM-Aufruf direkt an den übergebenen Endpunkt geht.
+
+        Returns:
+            Any: Das Ergebnis des ersten erfolgreichen Aufrufs.
+
+        Raises:
+            Exception: Der Fehler des letzten Versuchs, wenn alle Endpunkte scheitern.
+            NoEndpointAvailable: Wenn von vornherein kein Endpunkt verfügbar ist.
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                endpoint = self._acquire(tried)
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.append(endpoint)
+            start = time.monotonic()
+            token = _current.set(None)
+            try:
+                result = fn(endpoint)
+            except Exception as e:
+                self._release(endpoint, time.monotonic() - start, error=True)
+                last_error = e
+                continue
+            finally:
+                _current.reset(token)
+            self._release(endpoint, time.monotonic() - start, error=False)
+            return result
+
+    async def call_async(self, fn: Callable[[Endpoint], Awaitable[Any]]) -> Any:
+        """Asynchrone Variante von `call` für Koroutinen-Funktionen."""
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                endpoint = self._acquire(tried)
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.append(endpoint)
+            start = time.monotonic()
+            token = _current.set(None)
+            try:
+                result = await fn(endpoint)
+            except Exception as e:
+                self._release(endpoint, time.monotonic() - start, error=True)
+                last_error = e
+                continue
+            finally:
+                _current.reset(token)
+            self._release(endpoint, time.monotonic() - start, error=False)
+            return result
+
+    def stream(self, fn: Callable[[Endpoint], Iterator[str]]) -> Iterator[str]:
+        """
+        Streaming-Variante von `call`.
+
+        Ein Failover ist nur möglich, solange noch kein Textstück geliefert wurde;
+        spätere Fehler werden verbucht und weitergereicht.
+
+        Returns:
+            Any: Der Rückgabewert des Streams (der maßgebliche Gesamttext).
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                endpoint = self._acquire(tried)
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.append(endpoint)
+            start = time.monotonic()
+            started = False
+            token = _current.set(None)
+            try:
+                stream = fn(endpoint)
+            finally:
+                _current.reset(token)
+            try:
+                while True:
+                    token = _current.set(None)
+                    try:
+                        chunk = next(stream)
+                    finally:
+                        _current.reset(token)
+                    started = True
+                    yield chunk
+            except StopIteration as stop:
+                self._release(endpoint, time.monotonic() - start, error=False)
+                return stop.value
+            except Exception as e:
+                self._release(endpoint, time.monotonic() - start, error=True)
+                if started:
+                    raise
+                last_error = e
+            except BaseException:
+                # Abbruch durch den Aufrufer (z. B. GeneratorExit) ist kein Endpunkt-Fehler
+                self._release(endpoint, time.monotonic() - start, error=False)
+                raise
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Liefert den Zustand aller Endpunkte des Pools."""
+        with _lock:
+            return [ep.as_dict(self.reset_timeout) for ep in self.endpoints]
+
+
+@contextmanager
+def use(router: Router) -> Iterator[Router]:
+    """Leitet alle LLM-Anfragen im aktuellen Kontext über `router`."""
+    token = _current.set(router)
+    try:
+        yield router
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[Router]:
+    """Gibt den im aktuellen Kontext aktiven Router zurück (oder None)."""
+    return _current.get()
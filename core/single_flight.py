@@ -0,0 +1,292 @@
+"""
+core/single_flight.py
+
+Dieses Modul fasst gleichzeitige, identische LLM-Aufrufe zu einem einzigen
+Upstream-Aufruf zusammen ("single flight").
+
+Schlüssel ist der Cache-Schlüssel aus `core.response_cache.make_key`, also das
+Tripel (api_url, model, prompt). Der erste Aufrufer führt die Anfrage aus; alle
+Aufrufer, die währenddessen mit demselben Schlüssel eintreffen, warten und
+erhalten dasselbe Ergebnis bzw. denselben Fehler.
+
+  - Innerhalb eines Prozesses geschieht das über ein Event pro laufendem Aufruf.
+  - Über Prozessgrenzen hinweg (mehrere Worker einer Flask-Instanz) kann mit
+    `configure(path=...)` eine SQLite-Datei angegeben werden: Der ausführende
+    Prozess beansprucht eine Zeile pro Schlüssel, andere Prozesse warten, bis
+    sie als erledigt markiert ist, und lesen das Ergebnis daraus. Bleibt eine
+    Zeile länger als `lease` Sekunden im Zustand "running", gilt ihr Besitzer
+    als abgestürzt und sie wird übernommen.
+
+Ergebnisse werden nur an gleichzeitig wartende Aufrufer weitergegeben; ein
+späterer Aufruf startet einen neuen Flug (dafür ist der Antwort-Cache zuständig).
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "path": None,
+    "lease": 300.0,
+    "poll_interval": 0.05,
+}
+
+
+class _Flight:
+    """Ein laufender Aufruf innerhalb dieses Prozesses."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SQLiteFlightStore:
+    """
+    Prozessübergreifende Koordination über eine SQLite-Datei.
+
+    Attributes:
+        path (Path): Die Datenbankdatei.
+        lease (float): Sekunden, nach denen ein laufender Eintrag als verwaist gilt.
+    """
+
+    def __init__(self, path: str, lease: float = 300.0):
+        self.path = Path(path)
+        self.lease = lease
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS flights ("
+                " key TEXT PRIMARY KEY, owner TEXT, started REAL, state TEXT, result TEXT)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def claim(self, key: str, owner: str) -> bool:
+        """
+        Beansprucht einen Schlüssel atomar.
+
+        Returns:
+            bool: True, wenn dieser Aufrufer den Upstream-Aufruf ausführen soll.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT state, started FROM flights WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] == "running" and row[1] >= now - self.lease:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO flights (key, owner, started, state, result)"
+                " VALUES (?, ?, ?, 'running', NULL)",
+                (key, owner, now),
+            )
+            # Abgeschlossene Einträge werden nur kurz für wartende Prozesse benötigt
+            conn.execute(
+                "DELETE FROM flights WHERE state != 'running' AND started < ?",
+                (now - self.lease,),
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def finish(self, key: str, owner: str, result: Optional[str]) -> None:
+        """Markiert einen eigenen Eintrag als erledigt (mit Ergebnis) oder fehlgeschlagen (None)."""
+        state = "failed" if result is None else "done"
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE flights SET state = ?, result = ? WHERE key = ? AND owner = ?",
+                (state, result, key, owner),
+            )
+        finally:
+            conn.close()
+
+    def poll(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Liest den Zustand eines Eintrags.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: (Zustand, Ergebnis); Zustand ist None,
+                wenn kein Eintrag existiert, und "stale", wenn sein Besitzer als abgestürzt gilt.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT state, result, started FROM flights WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None, None
+        state, result, started = row
+        if state == "running" and started < time.time() - self.lease:
+            return "stale", None
+        return state, result
+
+
+_flights: Dict[str, _Flight] = {}
+_lock = threading.Lock()
+_store: Optional[SQLiteFlightStore] = None
+_stats = {"leaders": 0, "shared": 0}
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Konfiguration an.
+
+    Unterstützte Optionen:
+      - path (Optional[str]): SQLite-Datei für die prozessübergreifende Koordination;
+        None = nur innerhalb des Prozesses.
+      - lease (float): Sekunden, nach denen ein laufender Eintrag als verwaist gilt.
+      - poll_interval (float): Abstand, in dem wartende Prozesse den Eintrag prüfen.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    global _store
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+    with _lock:
+        _store = SQLiteFlightStore(_config["path"], _config["lease"]) if _config["path"] else None
+        _stats.update(leaders=0, shared=0)
+
+
+def stats() -> Dict[str, int]:
+    """Liefert die Anzahl ausgeführter und geteilter Aufrufe seit der letzten Konfiguration."""
+    with _lock:
+        return dict(_stats, in_flight=len(_flights))
+
+
+def _join(key: str) -> Tuple[_Flight, bool]:
+    """Tritt einem laufenden Aufruf bei oder startet einen neuen; liefert (Flug, ist_Leader)."""
+    with _lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            _stats["shared"] += 1
+            return flight, False
+        flight = _flights[key] = _Flight()
+        _stats["leaders"] += 1
+        return flight, True
+
+
+def _land(key: str, flight: _Flight) -> None:
+    with _lock:
+        _flights.pop(key, None)
+    flight.event.set()
+
+
+def do(key: str, fn: Callable[[], str]) -> str:
+    """
+    Führt `fn` aus oder wartet auf den gleichzeitig laufenden Aufruf mit demselben Schlüssel.
+
+    Args:
+        key (str): Schlüssel des Aufrufs (siehe `response_cache.make_key`).
+        fn (Callable[[], str]): Der eigentliche Upstream-Aufruf.
+
+    Returns:
+        str: Das (ggf. geteilte) Ergebnis.
+
+    Raises:
+        Exception: Der Fehler des ausführenden Aufrufs.
+    """
+    flight, leader = _join(key)
+    if not leader:
+        flight.event.wait()
+        return flight.outcome()
+    try:
+        flight.result = _run_across_processes(key, fn)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        _land(key, flight)
+
+
+async def do_async(key: str, fn: Callable[[], Awaitable[str]]) -> str:
+    """Asynchrone Variante von `do`; wartende Aufrufer blockieren die Event-Loop nicht."""
+    flight, leader = _join(key)
+    if not leader:
+        while not flight.event.is_set():
+            await asyncio.sleep(_config["poll_interval"])
+        return flight.outcome()
+    try:
+        store, owner = _store, uuid.uuid4().hex
+        while store is not None and not store.claim(key, owner):
+            state, result = await _wait_async(store, key)
+            if state == "done":
+                flight.result = result
+                return result
+        try:
+            flight.result = await fn()
+        except BaseException:
+            if store is not None:
+                store.finish(key, owner, None)
+            raise
+        if store is not None:
+            store.finish(key, owner, flight.result)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        _land(key, flight)
+
+
+def _run_across_processes(key: str, fn: Callable[[], str]) -> str:
+    """Koordiniert den Aufruf über die SQLite-Datei, falls konfiguriert."""
+    store, owner = _store, uuid.uuid4().hex
+    if store is None:
+        return fn()
+    while not store.claim(key, owner):
+        state, result = _wait(store, key)
+        if state == "done":
+            return result
+        # Fehlgeschlagen, verwaist oder verschwunden: selbst versuchen
+    try:
+        result = fn()
+    except BaseException:
+        store.finish(key, owner, None)
+        raise
+    store.finish(key, owner, result)
+    return result
+
+
+def _wait(store: SQLiteFlightStore, key: str) -> Tuple[Optional[str], Optional[str]]:
+    """Wartet, bis ein fremder Eintrag nicht mehr läuft."""
+    while True:
+        state, result = store.poll(key)
+        if state != "running":
+            return state, result
+        time.sleep(_config["poll_interval"])
+
+
+async def _wait_async(store: SQLiteFlightStore, key: str) -> Tuple[Optional[str], Optional[str]]:
+    while True:
+        state, result = store.poll(key)
+        if state != "running":
+            return state, result
+        await asyncio.sleep(_config["poll_interval"])
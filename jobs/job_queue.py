@@ -0,0 +1,256 @@
+"""
+jobs/job_queue.py
+
+Dieses Modul stellt eine persistente Job-Queue für lang laufende Generierungen bereit.
+Jobs werden in der Tabelle `Job` (siehe `models.py`) abgelegt und von einem lokalen
+Worker-Pool ausgeführt, sodass HTTP-Requests sofort mit einer Job-ID antworten können.
+
+Mehrere App-Prozesse können sich dieselbe Datenbank teilen: Ein Job wird per
+atomarem `UPDATE ... WHERE status='queued'` genau einmal beansprucht, und laufende
+Jobs melden regelmäßig einen Heartbeat, damit `recover()` nur verwaiste Jobs
+anderer, nicht mehr lebender Prozesse als fehlgeschlagen markiert.
+
+Abbruch ist kooperativ: Handler erhalten eine Funktion `check_cancelled`, die
+`JobCancelled` wirft, sobald ein Abbruch angefordert wurde.
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Set
+
+from flask import Flask
+from sqlalchemy import update
+from models import db, Job
+
+# Signatur eines Handlers: handler(params, check_cancelled) -> Ergebnis-Dictionary
+JobHandler = Callable[[Dict[str, Any], Callable[[], None]], Dict[str, Any]]
+
+
+class JobCancelled(Exception):
+    """Wird von `check_cancelled` geworfen, wenn ein Job abgebrochen werden soll."""
+
+
+class JobQueue:
+    """
+    Führt registrierte Job-Arten in einem Thread-Pool aus und persistiert deren Status.
+
+    Der Worker-Pool und der Heartbeat-Thread werden erst beim ersten eingereihten
+    Job gestartet, sodass eine App ohne Jobs keine Threads belegt.
+
+    Attributes:
+        app (Flask): Die Anwendung, deren App-Kontext und Datenbank genutzt werden.
+        max_workers (int): Anzahl paralleler Worker-Threads.
+        heartbeat_interval (float): Abstand der Heartbeats laufender Jobs in Sekunden.
+        owner (str): Kennung dieses Queue-Prozesses, wird an beanspruchten Jobs vermerkt.
+    """
+
+    def __init__(self, app: Flask, max_workers: int = 2, heartbeat_interval: float = 10.0):
+        self.app = app
+        self.max_workers = max_workers
+        self.heartbeat_interval = heartbeat_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        Registriert einen Handler für eine Job-Art.
+
+        Args:
+            kind (str): Name der Job-Art, z. B. "plan".
+            handler (JobHandler): Funktion, die den Job ausführt und ein JSON-serialisierbares
+                Ergebnis-Dictionary liefert.
+        """
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: Dict[str, Any], user_id: int) -> str:
+        """
+        Legt einen neuen Job an und reiht ihn in den Worker-Pool ein.
+
+        Args:
+            kind (str): Registrierte Job-Art.
+            params (Dict[str, Any]): JSON-serialisierbare Parameter für den Handler.
+            user_id (int): ID des einreichenden Users.
+
+        Returns:
+            str: Die ID des neuen Jobs.
+
+        Raises:
+            ValueError: Wenn für `kind` kein Handler registriert ist.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unbekannte Job-Art: {kind}")
+        job_id = uuid.uuid4().hex
+        job = Job(id=job_id, kind=kind, status="queued", params=json.dumps(params), user_id=user_id)
+        db.session.add(job)
+        db.session.commit()
+        self._enqueue(job_id)
+        return job_id
+
+    def _enqueue(self, job_id: str) -> None:
+        """Übergibt einen Job an den (bei Bedarf gestarteten) Worker-Pool."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+                threading.Thread(
+                    target=self._heartbeat_loop, name="job-heartbeat", daemon=True
+                ).start()
+            executor = self._executor
+        executor.submit(self._run, job_id)
+
+    def get(self, job_id: str, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Liefert Status und ggf. Ergebnis eines Jobs.
+
+        Args:
+            job_id (str): Die Job-ID.
+            user_id (Optional[int]): Wenn gesetzt, werden nur Jobs dieses Users gefunden.
+
+        Returns:
+            Optional[Dict[str, Any]]: Job-Daten oder None, wenn kein passender Job existiert.
+        """
+        job = self._load(job_id, user_id)
+        if job is None:
+            return None
+        return {
+            "job_id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "created_at": job.created_at.isoformat(),
+            "updated_at": job.updated_at.isoformat(),
+        }
+
+    def cancel(self, job_id: str, user_id: Optional[int] = None) -> Optional[str]:
+        """
+        Bricht einen Job ab.
+
+        Wartende Jobs werden atomar auf "cancelled" gesetzt und später vom Worker
+        übersprungen; bei laufenden Jobs wird ein Abbruch angefordert, den der
+        Handler beim nächsten `check_cancelled` bemerkt.
+
+        Returns:
+            Optional[str]: Der Status nach dem Abbruchversuch oder None, wenn der Job unbekannt ist.
+        """
+        if self._load(job_id, user_id) is None:
+            return None
+        if not self._transition(job_id, "queued", "cancelled"):
+            db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running")
+                .values(cancel_requested=True)
+            )
+            db.session.commit()
+        return self._load(job_id, user_id).status
+
+    def recover(self, lease_timeout: float = 60.0) -> None:
+        """
+        Stellt den Zustand nach einem Neustart wieder her.
+
+        Laufende Jobs, deren letzter Heartbeat älter als `lease_timeout` ist, gehören
+        keinem lebenden Prozess mehr und werden als fehlgeschlagen markiert. Wartende
+        Jobs werden eingereiht; führt ein anderer Prozess sie bereits aus, verhindert
+        die atomare Beanspruchung eine doppelte Ausführung.
+
+        Args:
+            lease_timeout (float): Zeit in Sekunden, nach der ein Job ohne Heartbeat als verwaist gilt.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_timeout)
+        db.session.execute(
+            update(Job)
+            .where(Job.status == "running", Job.heartbeat_at < cutoff)
+            .values(status="failed", error="Durch Neustart unterbrochen.",
+                    updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        for (job_id,) in db.session.query(Job.id).filter_by(status="queued").all():
+            self._enqueue(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Beendet Worker-Pool und Heartbeat-Thread."""
+        self._stopped.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _load(self, job_id: str, user_id: Optional[int]) -> Optional[Job]:
+        db.session.expire_all()
+        job = db.session.get(Job, job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def _transition(self, job_id: str, from_status: str, to_status: str, **values: Any) -> bool:
+        """
+        Setzt den Status atomar, sofern der Job noch `from_status` hat.
+
+        Returns:
+            bool: True, wenn genau dieser Aufruf den Übergang durchgeführt hat.
+        """
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == from_status)
+            .values(status=to_status, updated_at=now, **values)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _heartbeat_loop(self) -> None:
+        """Aktualisiert regelmäßig `heartbeat_at` aller Jobs, die dieser Prozess ausführt."""
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            with self.app.app_context():
+                db.session.execute(
+                    update(Job)
+                    .where(Job.id.in_(running), Job.owner == self.owner)
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.session.commit()
+                db.session.remove()
+
+    def _run(self, job_id: str) -> None:
+        """Beansprucht einen Job atomar, führt ihn aus und persistiert Ergebnis oder Fehler."""
+        with self.app.app_context():
+            if not self._transition(
+                job_id, "queued", "running", owner=self.owner, heartbeat_at=datetime.utcnow()
+            ):
+                return
+            with self._lock:
+                self._running.add(job_id)
+            job = self._load(job_id, None)
+            kind, params = job.kind, json.loads(job.params)
+
+            def check_cancelled() -> None:
+                if self._load(job_id, None).cancel_requested:
+                    raise JobCancelled()
+
+            try:
+                result = self._handlers[kind](params, check_cancelled)
+                check_cancelled()
+            except JobCancelled:
+                self._transition(job_id, "running", "cancelled")
+            except Exception as e:
+                self._transition(job_id, "running", "failed", error=str(e))
+            else:
+                self._transition(
+                    job_id, "running", "done", result=json.dumps(result, ensure_ascii=False)
+                )
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+                db.session.remove()
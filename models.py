@@ -5,8 +5,11 @@ Dieses Modul definiert die ORM-Modelle für die Anwendung:
 
 - User: Repräsentiert einen Benutzerdatensatz mit Authentifizierung und zugehörigen API-Schlüsseln.
 - APIKey: Speichert die API-Zugangsdaten eines Users für verschiedene AI-Services.
+- Job: Persistenter Eintrag eines Hintergrund-Jobs (Plan-, Ticket-, Test- oder Code-Generierung).
 """
 
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -68,3 +71,35 @@ class APIKey(db.Model):
     api_key_value = db.Column(db.String(500), nullable=False)
     model = db.Column(db.String(100), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+
+class Job(db.Model):
+    """
+    ORM-Modell für einen Hintergrund-Job der Job-Queue (`jobs.job_queue`).
+
+    Attributes:
+        id (str): Eindeutige Job-ID (UUID als Hex-String).
+        kind (str): Art des Jobs ("plan", "tickets", "tests" oder "code").
+        status (str): "queued", "running", "done", "failed" oder "cancelled".
+        params (str): JSON-kodierte Parameter des Jobs (ohne API-Schlüssel).
+        result (str): JSON-kodiertes Ergebnis nach erfolgreichem Abschluss.
+        error (str): Fehlermeldung, falls der Job fehlgeschlagen ist.
+        cancel_requested (bool): Wird gesetzt, wenn ein laufender Job abgebrochen werden soll.
+        owner (str): Kennung des Queue-Prozesses, der den Job ausführt.
+        heartbeat_at (datetime): Letztes Lebenszeichen des ausführenden Prozesses (UTC).
+        created_at (datetime): Zeitpunkt der Einreichung (UTC).
+        updated_at (datetime): Zeitpunkt der letzten Statusänderung (UTC).
+        user_id (int): Fremdschlüssel zu dem einreichenden User.
+    """
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    params = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    owner = db.Column(db.String(64), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -4,7 +4,111 @@ Tickets, in denen Datei-Pfad, Beschreibung und Anforderungen definiert sind.
 """
 
 from pathlib import Path
-from core.request_handler import send_llm_request
+from typing import Dict, Iterator, Optional
+
+from core import context_budget, metrics
+from core.prompt_templates import CODE_FILE_NOTE, CODE_PATCH_NOTE, CODE_REPAIR_NOTE
+from core.request_handler import send_llm_request, async_send_llm_request, stream_llm_request
+
+
+def _dependency_context(ticket: dict, dependencies: Optional[Dict[str, str]], model: str) -> str:
+    """
+    Formatiert bereits generierten Code von Abhängigkeiten (Dateipfad -> Code) für den Prompt.
+
+    Übersteigt er das Budget `dependency_tokens` (`core.context_budget`), werden
+    die für das Ticket weniger relevanten Dateien auf ihre Signaturen reduziert.
+    """
+    if dependencies:
+        dependencies, saved = context_budget.fit_dependencies(
+            dependencies,
+            context_budget.budget("dependency_tokens", model),
+            model,
+            context_budget.ticket_query(ticket),
+        )
+        if saved:
+            metrics.inc(
+                "context_tokens_saved_total", saved, stage="context.dependencies", model=model
+            )
+    if not dependencies:
+        return ""
+    context = "\n\nBereits implementierte Abhängigkeiten:"
+    for dep_path, code in dependencies.items():
+        context += f"\n\nDatei: {dep_path}\n```\n{code}\n```"
+    return context
+
+
+def _ticket_description(ticket: dict) -> str:
+    return f"{ticket.get('title') or ''}\n{ticket['beschreibung']}\nAnforderungen:\n{ticket['anforderungen']}"
+
+
+def _fence_language(file_path: str) -> str:
+    return "java" if Path(file_path).suffix.lower() == ".java" else "python"
+
+
+@metrics.timed("prompt.code")
+def _build_prompt(
+    ticket: dict,
+    dependencies: Optional[Dict[str, str]] = None,
+    model: str = "",
+    existing_code: Optional[str] = None,
+) -> str:
+    """
+    Baut den Code-Prompt; die Zielsprache ergibt sich aus der Dateiendung.
+
+    Bereits generierter Code von Abhängigkeiten wird angehängt, damit Importe und
+    Schnittstellen zueinander passen. Mit `existing_code` wird die bestehende
+    Datei über `CODE_FILE_NOTE` als Kontext mitgegeben und vollständig neu angefordert.
+    """
+    file_path = ticket["file_path"]
+    if existing_code is not None:
+        prompt = CODE_FILE_NOTE.format(
+            file_path=file_path,
+            file_ext=_fence_language(file_path),
+            existing_code=existing_code,
+            ticket_description=_ticket_description(ticket),
+        )
+        return prompt + _dependency_context(ticket, dependencies, model)
+    ext = Path(file_path).suffix.lower()
+    lang = "Java" if ext == ".java" else "Python"
+    prompt = (
+        f"Implementiere folgendes Ticket in {lang}:\n"
+        f"Datei: {file_path}\n"
+        f"Beschreibung: {ticket['beschreibung']}\n"
+        f"Anforderungen:\n{ticket['anforderungen']}"
+    )
+    return prompt + _dependency_context(ticket, dependencies, model)
+
+
+@metrics.timed("prompt.code_patch")
+def _build_patch_prompt(
+    ticket: dict, existing_code: str, dependencies: Optional[Dict[str, str]] = None, model: str = ""
+) -> str:
+    """Baut den Prompt des Patch-Modus (`CODE_PATCH_NOTE`) für eine bestehende Datei."""
+    file_path = ticket["file_path"]
+    prompt = CODE_PATCH_NOTE.format(
+        file_path=file_path,
+        file_ext=_fence_language(file_path),
+        existing_code=existing_code,
+        ticket_description=_ticket_description(ticket),
+    )
+    return prompt + _dependency_context(ticket, dependencies, model)
+
+
+@metrics.timed("prompt.code_repair")
+def _build_repair_prompt(
+    ticket: dict, previous: str, errors: str, dependencies: Optional[Dict[str, str]] = None,
+    model: str = ""
+) -> str:
+    """Baut den Prompt (`CODE_REPAIR_NOTE`), der eine Antwort mit Syntaxfehlern korrigieren lässt."""
+    file_path = ticket["file_path"]
+    prompt = CODE_REPAIR_NOTE.format(
+        file_path=file_path,
+        file_ext=_fence_language(file_path),
+        errors=errors,
+        previous=previous,
+        ticket_description=_ticket_description(ticket),
+    )
+    return prompt + _dependency_context(ticket, dependencies, model)
 
 
 def generate_code_for_ticket(
@@ -12,7 +116,9 @@ def generate_code_for_ticket(
     api_key: str,
     project_folder: str,
     ticket: dict,
-    model: str
+    model: str,
+    dependencies: Optional[Dict[str, str]] = None,
+    existing_code: Optional[str] = None
 ) -> str:
     """
     Generiert vollständigen Code für ein einzelnes Ticket.
@@ -29,6 +135,10 @@ def generate_code_for_ticket(
             - "beschreibung" (str): Textuelle Beschreibung des Tickets.
             - "anforderungen" (str): Technische Anforderungen oder Randbedingungen.
         model (str): Name des zu verwendenden Modells (z. B. "gpt-4").
+        dependencies (Optional[Dict[str, str]]): Code bereits generierter Abhängigkeiten
+            (Dateipfad -> Code), der dem Prompt als Kontext beigefügt wird.
+        existing_code (Optional[str]): Bisheriger Inhalt der Datei; wird über
+            `CODE_FILE_NOTE` als Kontext mitgegeben (z. B. wenn ein Patch fehlschlug).
 
     Returns:
         str: Der vom LLM generierte Dateiinhalt als String.
@@ -37,18 +147,129 @@ def generate_code_for_ticket(
         TypeError: Wenn `'file_path'` im Ticket fehlt oder None ist.
         requests.HTTPError: Bei HTTP-Fehlern im Request.
     """
-    # Pfad und Dateiendung bestimmen
-    file_path = ticket["file_path"]
-    ext = Path(file_path).suffix.lower()
-    lang = "Java" if ext == ".java" else "Python"
-
-    # Prompt zusammenbauen
-    prompt = (
-        f"Implementiere folgendes Ticket in {lang}:\n"
-        f"Datei: {file_path}\n"
-        f"Beschreibung: {ticket['beschreibung']}\n"
-        f"Anforderungen:\n{ticket['anforderungen']}"
-    )
+    # Prompt zusammenbauen (Sprache aus Dateiendung)
+    prompt = _build_prompt(ticket, dependencies, model, existing_code)
 
     # LLM-Aufruf
     return send_llm_request(api_url, api_key, prompt, model)
+
+
+async def async_generate_code_for_ticket(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str,
+    dependencies: Optional[Dict[str, str]] = None,
+    existing_code: Optional[str] = None
+) -> str:
+    """
+    Asynchrone Variante von `generate_code_for_ticket` auf Basis von `async_send_llm_request`.
+
+    Returns:
+        str: Der vom LLM generierte Dateiinhalt als String.
+    """
+    prompt = _build_prompt(ticket, dependencies, model, existing_code)
+    return await async_send_llm_request(api_url, api_key, prompt, model)
+
+
+def generate_code_patch(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str,
+    existing_code: str,
+    dependencies: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Fordert für eine bestehende Datei nur die Änderungen an (Patch-Modus).
+
+    Das LLM erhält über `CODE_PATCH_NOTE` den aktuellen Inhalt der Datei und
+    antwortet mit Suchen/Ersetzen-Blöcken oder einem Unified Diff, die mit
+    `storage.code_storage.save_code_patch` angewendet werden.
+
+    Args:
+        existing_code (str): Der aktuelle Inhalt der Datei unter `src/`.
+        Übrige Argumente wie bei `generate_code_for_ticket`.
+
+    Returns:
+        str: Die Roh-Antwort mit den Änderungen.
+    """
+    prompt = _build_patch_prompt(ticket, existing_code, dependencies, model)
+    return send_llm_request(api_url, api_key, prompt, model)
+
+
+async def async_generate_code_patch(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str,
+    existing_code: str,
+    dependencies: Optional[Dict[str, str]] = None
+) -> str:
+    """Asynchrone Variante von `generate_code_patch`."""
+    prompt = _build_patch_prompt(ticket, existing_code, dependencies, model)
+    return await async_send_llm_request(api_url, api_key, prompt, model)
+
+
+def repair_code(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str,
+    previous: str,
+    errors: str,
+    dependencies: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Fordert eine Antwort erneut an, deren Code die Prüfung von
+    `planner.code_validator` nicht bestanden hat.
+
+    Args:
+        previous (str): Die bisherige Roh-Antwort des LLM.
+        errors (str): Die Fehlermeldungen (`code_validator.format_errors`).
+        Übrige Argumente wie bei `generate_code_for_ticket`.
+
+    Returns:
+        str: Die korrigierte Roh-Antwort.
+    """
+    prompt = _build_repair_prompt(ticket, previous, errors, dependencies, model)
+    return send_llm_request(api_url, api_key, prompt, model)
+
+
+async def async_repair_code(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str,
+    previous: str,
+    errors: str,
+    dependencies: Optional[Dict[str, str]] = None
+) -> str:
+    """Asynchrone Variante von `repair_code`."""
+    prompt = _build_repair_prompt(ticket, previous, errors, dependencies, model)
+    return await async_send_llm_request(api_url, api_key, prompt, model)
+
+
+def stream_code_for_ticket(
+    api_url: str,
+    api_key: str,
+    project_folder: str,
+    ticket: dict,
+    model: str
+) -> Iterator[str]:
+    """
+    Streaming-Variante von `generate_code_for_ticket`.
+
+    Yields:
+        str: Textstücke des generierten Codes, sobald sie vom LLM eintreffen.
+
+    Returns:
+        str: Der vollständige, maßgebliche Text (siehe `stream_llm_request`).
+    """
+    prompt = _build_prompt(ticket, model=model)
+    return (yield from stream_llm_request(api_url, api_key, prompt, model))
@@ -0,0 +1,216 @@
+"""
+Dieses Modul prüft generierten Code direkt nach der Generierung auf Syntaxfehler,
+bevor er gespeichert wird.
+
+  - `.py`-Dateien werden mit `ast` geparst.
+  - `.java`-Dateien werden standardmäßig nur strukturell geprüft (Klammern,
+    Zeichenketten und Kommentare müssen geschlossen sein). Ein vollständiger
+    Checker (z. B. über `javac`) lässt sich mit `register_checker` einhängen.
+  - Andere Endungen werden nicht geprüft.
+
+Mit `processes > 0` laufen die Prüfungen in einem gemeinsamen Prozess-Pool, sodass
+die parallelen Tickets von `/generate_all` nicht am GIL hängen. Checker, die
+sich nicht an andere Prozesse übergeben lassen (z. B. Lambdas), laufen im
+aufrufenden Thread.
+
+Findet die Prüfung Fehler, fordert der Aufrufer (`web_app._run_code`) die Datei
+mit der Fehlermeldung bis zu `max_attempts` Mal neu an (`planner.code_generator.repair_code`).
+"""
+
+import ast
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from core import metrics
+
+# Checker: (Dateipfad, Code) -> Fehlermeldung oder None
+Checker = Callable[[str, str], Optional[str]]
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "enabled": True,
+    "max_attempts": 2,
+    "processes": 0,
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Konfiguration an.
+
+    Unterstützte Optionen:
+      - enabled (bool): False speichert generierten Code wieder ungeprüft.
+      - max_attempts (int): Wie oft eine fehlerhafte Datei höchstens neu
+        angefordert wird (0 = nur prüfen und melden).
+      - processes (int): Größe des Prozess-Pools; 0 prüft im aufrufenden Thread.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+    if "processes" in options:
+        shutdown()
+
+
+def enabled() -> bool:
+    """Ob generierter Code vor dem Speichern geprüft wird."""
+    return bool(_config["enabled"])
+
+
+def max_attempts() -> int:
+    """Höchstzahl der Reparaturversuche je Datei."""
+    return max(0, int(_config["max_attempts"]))
+
+
+def check_python(file_path: str, code: str) -> Optional[str]:
+    """Parst Python-Code mit `ast` und liefert den ersten Syntaxfehler."""
+    try:
+        ast.parse(code, filename=file_path)
+    except SyntaxError as e:
+        return f"Zeile {e.lineno}: {e.msg}"
+    except ValueError as e:  # z. B. Null-Bytes im Quelltext
+        return str(e)
+    return None
+
+
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+
+def check_java(file_path: str, code: str) -> Optional[str]:
+    """
+    Prüft Java-Code strukturell: Klammern müssen passen, Zeichenketten,
+    Zeichenliterale, Text-Blöcke und Kommentare müssen geschlossen sein.
+    """
+    stack = []
+    i, line, n = 0, 1, len(code)
+    while i < n:
+        c = code[i]
+        if c == "\n":
+            line += 1
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            if end < 0:
+                return f"Zeile {line}: Kommentar nicht geschlossen"
+            line += code.count("\n", i, end)
+            i = end + 2
+            continue
+        elif code.startswith('"""', i):
+            end = code.find('"""', i + 3)
+            while end > 0 and code[end - 1] == "\\":
+                end = code.find('"""', end + 1)
+            if end < 0:
+                return f"Zeile {line}: Text-Block nicht geschlossen"
+            line += code.count("\n", i, end)
+            i = end + 3
+            continue
+        elif c in "\"'":
+            j = i + 1
+            while j < n and code[j] != c and code[j] != "\n":
+                j += 2 if code[j] == "\\" else 1
+            if j >= n or code[j] != c:
+                kind = "Zeichenkette" if c == '"' else "Zeichenliteral"
+                return f"Zeile {line}: {kind} nicht geschlossen"
+            i = j + 1
+            continue
+        elif c in "([{":
+            stack.append((c, line))
+        elif c in _PAIRS:
+            if not stack or stack[-1][0] != _PAIRS[c]:
+                return f"Zeile {line}: Unerwartetes '{c}'"
+            stack.pop()
+        i += 1
+    if stack:
+        bracket, opened = stack[-1]
+        return f"Zeile {opened}: '{bracket}' wird nicht geschlossen"
+    return None
+
+
+# Dateiendung -> (Checker, ob er an einen anderen Prozess übergeben werden kann)
+_checkers: Dict[str, Tuple[Checker, bool]] = {
+    ".py": (check_python, True),
+    ".java": (check_java, True),
+}
+
+
+def register_checker(suffix: str, checker: Optional[Checker]) -> None:
+    """
+    Setzt den Checker für eine Dateiendung (z. B. ".java"); None entfernt ihn.
+
+    Ein Checker erhält Dateipfad und Code und liefert eine Fehlermeldung oder None.
+    """
+    suffix = suffix.lower()
+    if checker is None:
+        _checkers.pop(suffix, None)
+        return
+    try:
+        pickle.dumps(checker)
+        portable = True
+    except Exception:
+        portable = False
+    _checkers[suffix] = (checker, portable)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_config["processes"])
+        return _pool
+
+
+def shutdown() -> None:
+    """Beendet den Prozess-Pool; er wird bei Bedarf neu gestartet."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+@metrics.timed("validate.code")
+def validate_files(files: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Prüft (Pfad, Code)-Paare mit dem Checker ihrer Dateiendung.
+
+    Returns:
+        Dict[str, str]: Pfad -> Fehlermeldung, nur für fehlerhafte Dateien.
+    """
+    if not enabled():
+        return {}
+    use_pool = _config["processes"] > 0
+    pending, errors = {}, {}
+    for path, code in files:
+        checker, portable = _checkers.get(Path(path).suffix.lower(), (None, False))
+        if checker is None:
+            continue
+        if use_pool and portable:
+            pending[path] = _get_pool().submit(checker, path, code)
+        else:
+            error = checker(path, code)
+            if error:
+                errors[path] = error
+    for path, future in pending.items():
+        error = future.result()
+        if error:
+            errors[path] = error
+    if errors:
+        metrics.inc("code_validation_errors_total", len(errors), stage="validate.code")
+    return errors
+
+
+def format_errors(errors: Dict[str, str]) -> str:
+    """Formatiert die Fehler aus `validate_files` für den Reparatur-Prompt."""
+    return "\n".join(f"{path}: {error}" for path, error in errors.items())
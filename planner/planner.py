@@ -3,7 +3,20 @@ Dieses Modul bietet Funktionen zur Generierung von Projektplänen
 auf Basis einer textuellen Projektbeschreibung.
 """
 
-from core.request_handler import send_llm_request
+from typing import Iterator
+
+from core import metrics
+from core.request_handler import send_llm_request, async_send_llm_request, stream_llm_request
+
+
+@metrics.timed("prompt.plan")
+def _build_prompt(project_desc: str) -> str:
+    """Baut den Planungs-Prompt für eine Projektbeschreibung."""
+    return (
+        "Erstelle eine detaillierte, schrittweise Projektplanung für folgendes Projekt:\n"
+        f"{project_desc}\n"
+        "Nutze klare Überschriften und nummerierte Schritte."
+    )
 
 
 def generate_project_plan(
@@ -29,9 +42,40 @@ def generate_project_plan(
     Raises:
         requests.HTTPError: Bei HTTP-Fehlern im Request.
     """
-    prompt = (
-        "Erstelle eine detaillierte, schrittweise Projektplanung für folgendes Projekt:\n"
-        f"{project_desc}\n"
-        "Nutze klare Überschriften und nummerierte Schritte."
-    )
+    prompt = _build_prompt(project_desc)
     return send_llm_request(api_url, api_key, prompt, model)
+
+
+async def async_generate_project_plan(
+    api_url: str,
+    api_key: str,
+    project_desc: str,
+    model: str
+) -> str:
+    """
+    Asynchrone Variante von `generate_project_plan` auf Basis von `async_send_llm_request`.
+
+    Returns:
+        str: Der generierte Projektplan als Text.
+    """
+    prompt = _build_prompt(project_desc)
+    return await async_send_llm_request(api_url, api_key, prompt, model)
+
+
+def stream_project_plan(
+    api_url: str,
+    api_key: str,
+    project_desc: str,
+    model: str
+) -> Iterator[str]:
+    """
+    Streaming-Variante von `generate_project_plan`.
+
+    Yields:
+        str: Textstücke des Projektplans, sobald sie vom LLM eintreffen.
+
+    Returns:
+        str: Der vollständige, maßgebliche Text (siehe `stream_llm_request`).
+    """
+    prompt = _build_prompt(project_desc)
+    return (yield from stream_llm_request(api_url, api_key, prompt, model))
@@ -0,0 +1,150 @@
+"""
+Dieses Modul plant die Reihenfolge der Code-Generierung über einen
+Abhängigkeitsgraphen (DAG) zwischen Tickets.
+
+Kanten entstehen, wenn
+  - Beschreibung oder Anforderungen eines Tickets die Datei eines anderen
+    Tickets nennen (z. B. "nutzt models.py"), oder
+  - bereits generierter Code unter `<project_folder>/src/` ein Modul bzw. eine
+    Klasse eines anderen Tickets importiert.
+
+Tickets ohne gegenseitige Abhängigkeiten werden in Wellen zusammengefasst, die
+parallel abgearbeitet werden können; der Code fertiger Abhängigkeiten kann in
+die Prompts späterer Wellen einfließen.
+"""
+
+import re
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional, Set
+
+_PY_IMPORT = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w., ]+))", re.MULTILINE)
+_JAVA_IMPORT = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)\s*;", re.MULTILINE)
+
+
+def _module_names(file_path: str) -> Set[str]:
+    """
+    Liefert die Namen, unter denen eine Ticket-Datei importiert werden kann.
+
+    Für `src/pkg/mod.py` sind das z. B. "src.pkg.mod", "pkg.mod" und "mod";
+    für Java-Dateien der Klassenname.
+    """
+    path = PurePosixPath(file_path.replace("\\", "/"))
+    if path.suffix.lower() == ".java":
+        return {path.stem}
+    parts = list(path.with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return {".".join(parts[i:]) for i in range(len(parts))}
+
+
+def _imports(code: str, file_path: str) -> Set[str]:
+    """Extrahiert importierte Modul- bzw. Klassennamen aus Quellcode."""
+    if file_path.lower().endswith(".java"):
+        return {name.rsplit(".", 1)[-1] for name in _JAVA_IMPORT.findall(code)}
+    names = set()
+    for from_name, import_list in _PY_IMPORT.findall(code):
+        if from_name:
+            names.add(from_name.lstrip("."))
+        else:
+            names.update(n.split(" as ")[0].strip() for n in import_list.split(","))
+    return {n for n in names if n}
+
+
+def _ticket_text(ticket: dict) -> str:
+    """Verbindet Beschreibung und Anforderungen eines Tickets zu einem Suchtext."""
+    anforderungen = ticket.get("anforderungen") or ""
+    if isinstance(anforderungen, list):
+        anforderungen = "\n".join(str(a) for a in anforderungen)
+    return f"{ticket.get('beschreibung') or ''}\n{anforderungen}"
+
+
+def find_dependencies(
+    tickets: list,
+    project_folder: Optional[str] = None,
+    read_source: Optional[Callable[[str], str]] = None,
+) -> Dict[int, Set[int]]:
+    """
+    Ermittelt für jedes Ticket die Indizes der Tickets, von denen es abhängt.
+
+    Args:
+        tickets (list): Ticket-Dictionaries mit mindestens `file_path`; andere
+            Einträge werden als Tickets ohne Abhängigkeiten behandelt.
+        project_folder (Optional[str]): Projektordner; wenn gesetzt, werden Imports
+            aus bereits generierten Dateien unter `src/` ausgewertet.
+        read_source (Optional[Callable[[str], str]]): Liest den Code zu einem
+            Ticket-Pfad statt aus `<project_folder>/src/` (z. B. über ein
+            Storage-Backend); wirft OSError, wenn es die Datei nicht gibt.
+
+    Returns:
+        Dict[int, Set[int]]: Abbildung Ticket-Index -> Indizes seiner Abhängigkeiten.
+    """
+    paths = {
+        i: t["file_path"] for i, t in enumerate(tickets)
+        if isinstance(t, dict) and isinstance(t.get("file_path"), str) and t["file_path"]
+    }
+    modules = {i: _module_names(p) for i, p in paths.items()}
+    patterns = {
+        i: re.compile(r"(?<![\w.-])(?:%s)(?![\w])" % "|".join(
+            re.escape(name) for name in {p, PurePosixPath(p).name}
+        ))
+        for i, p in paths.items()
+    }
+
+    deps: Dict[int, Set[int]] = {i: set() for i in range(len(tickets))}
+    for i, path in paths.items():
+        text = _ticket_text(tickets[i])
+        deps[i].update(j for j, pattern in patterns.items() if j != i and pattern.search(text))
+
+        if read_source or project_folder:
+            try:
+                if read_source:
+                    code = read_source(path)
+                else:
+                    code = (Path(project_folder) / "src" / path).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError, ValueError):
+                continue
+            for name in _imports(code, path):
+                deps[i].update(
+                    j for j, names in modules.items()
+                    if j != i and any(name == n or name.startswith(n + ".") for n in names)
+                )
+    return deps
+
+
+def build_waves(count: int, deps: Dict[int, Set[int]]) -> List[List[int]]:
+    """
+    Teilt Tickets topologisch in Wellen ein (Kahn-Algorithmus, ebenenweise).
+
+    Jede Welle enthält nur Tickets, deren Abhängigkeiten in früheren Wellen liegen.
+    Tickets in einem Zyklus lassen sich nicht ordnen und bilden gemeinsam die letzte Welle.
+
+    Args:
+        count (int): Anzahl der Tickets.
+        deps (Dict[int, Set[int]]): Ergebnis von `find_dependencies`.
+
+    Returns:
+        List[List[int]]: Wellen von Ticket-Indizes in aufsteigender Reihenfolge.
+    """
+    remaining = {i: set(deps.get(i, ())) & set(range(count)) for i in range(count)}
+    waves = []
+    while remaining:
+        wave = sorted(i for i, d in remaining.items() if not d)
+        if not wave:
+            waves.append(sorted(remaining))
+            break
+        waves.append(wave)
+        for i in wave:
+            del remaining[i]
+        for d in remaining.values():
+            d.difference_update(wave)
+    return waves
+
+
+def schedule(tickets: list, project_folder: Optional[str] = None) -> List[List[int]]:
+    """
+    Kombiniert `find_dependencies` und `build_waves`.
+
+    Returns:
+        List[List[int]]: Wellen von Ticket-Indizes.
+    """
+    return build_waves(len(tickets), find_dependencies(tickets, project_folder))
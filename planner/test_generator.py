@@ -4,7 +4,23 @@ für Code-Dateien basierend auf Ticket-Informationen.
 """
 
 from pathlib import Path
-from core.request_handler import send_llm_request
+from core import metrics
+from core.request_handler import send_llm_request, async_send_llm_request
+
+
+@metrics.timed("prompt.tests")
+def _build_prompt(ticket: dict) -> str:
+    """Baut den Test-Prompt aus Dateipfad, Titel, Beschreibung und Anforderungen des Tickets."""
+    file_path = ticket["file_path"]
+    name = Path(file_path).stem
+    return (
+        "Erstelle Unit-Tests für das Ticket.\n"
+        f"Datei: {file_path}\n"
+        f"Title: {ticket['title']}\n"
+        f"Beschreibung: {ticket['beschreibung']}\n"
+        f"Anforderungen:\n{ticket['anforderungen']}\n"
+        f"Speichere die Tests in test_{name}.py"
+    )
 
 
 def generate_tests(
@@ -36,16 +52,21 @@ def generate_tests(
         KeyError: Wenn erwartete Felder im Ticket fehlen.
         requests.HTTPError: Bei HTTP-Fehlern im Request.
     """
-    file_path = ticket["file_path"]
-    name = Path(file_path).stem
+    prompt = _build_prompt(ticket)
+    return send_llm_request(api_url, api_key, prompt, model)
 
-    prompt = (
-        "Erstelle Unit-Tests für das Ticket.\n"
-        f"Datei: {file_path}\n"
-        f"Title: {ticket['title']}\n"
-        f"Beschreibung: {ticket['beschreibung']}\n"
-        f"Anforderungen:\n{ticket['anforderungen']}\n"
-        f"Speichere die Tests in test_{name}.py"
-    )
 
-    return send_llm_request(api_url, api_key, prompt, model)
+async def async_generate_tests(
+    api_url: str,
+    api_key: str,
+    ticket: dict,
+    model: str
+) -> str:
+    """
+    Asynchrone Variante von `generate_tests` auf Basis von `async_send_llm_request`.
+
+    Returns:
+        str: Der generierte Testcode als String.
+    """
+    prompt = _build_prompt(ticket)
+    return await async_send_llm_request(api_url, api_key, prompt, model)
@@ -3,8 +3,30 @@ Dieses Modul bietet Funktionen zum Erzeugen von Tickets
 aus einem textuellen Projektplan mithilfe eines LLM.
 """
 
-import json
-from core.request_handler import send_llm_request
+from typing import Iterator
+
+from core import context_budget, metrics
+from core.request_handler import send_llm_request, async_send_llm_request, stream_llm_request
+from planner.ticket_parser import TicketStreamParser, parse_tickets
+
+
+@metrics.timed("prompt.tickets")
+def _build_prompt(plan_text: str, model: str = "") -> str:
+    """
+    Baut den Ticket-Prompt für einen Projektplan.
+
+    Übersteigt der Plan das Budget `plan_tokens` (`core.context_budget`), werden
+    spätere Abschnitte auf ihre Überschrift gekürzt bzw. weggelassen.
+    """
+    fitted = context_budget.fit_plan(plan_text, context_budget.budget("plan_tokens", model), model)
+    if fitted.saved:
+        metrics.inc("context_tokens_saved_total", fitted.saved, stage="context.plan", model=model)
+        plan_text = fitted.text
+    return (
+        f"Basierend auf diesem Projektplan:\n{plan_text}\n"
+        "Bitte liefere **nur** ein reines JSON-Array von Tickets, "
+        "jedes mit den Feldern title, beschreibung, anforderungen und file_path."
+    )
 
 
 def generate_tickets(
@@ -34,23 +56,87 @@ def generate_tickets(
                     oder das Parsen des JSON fehlschlägt.
         requests.HTTPError: Bei HTTP-Fehlern im Request.
     """
-    prompt = (
-        f"Basierend auf diesem Projektplan:\n{plan_text}\n"
-        "Bitte liefere **nur** ein reines JSON-Array von Tickets, "
-        "jedes mit den Feldern title, beschreibung, anforderungen und file_path."
-    )
-
+    prompt = _build_prompt(plan_text, model)
     raw = send_llm_request(api_url, api_key, prompt, model)
-    raw_str = raw.strip()
-    start = raw_str.find('[')
-    end = raw_str.rfind(']') + 1
-    if start == -1 or end == 0:
-        raise ValueError(f"Kein JSON-Array gefunden in Antwort. Roh-Antwort:\n{raw_str}")
-
-    json_str = raw_str[start:end]
-    try:
-        tickets = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Fehler beim Parsen: {e}\nExtrahiertes JSON:\n{json_str}")
+    return parse_tickets(raw)
+
 
+async def async_generate_tickets(
+    api_url: str,
+    api_key: str,
+    plan_text: str,
+    model: str
+) -> list:
+    """
+    Asynchrone Variante von `generate_tickets` auf Basis von `async_send_llm_request`.
+
+    Returns:
+        list: Die geparsten Ticket-Dictionaries.
+
+    Raises:
+        ValueError: Wenn kein gültiges JSON-Array in der Antwort gefunden wird.
+    """
+    prompt = _build_prompt(plan_text, model)
+    raw = await async_send_llm_request(api_url, api_key, prompt, model)
+    return parse_tickets(raw)
+
+
+def stream_tickets(
+    api_url: str,
+    api_key: str,
+    plan_text: str,
+    model: str
+) -> Iterator[str]:
+    """
+    Streaming-Variante von `generate_tickets`, die die Roh-Antwort stückweise liefert.
+
+    Der zusammengesetzte Text kann anschließend mit `parse_tickets` ausgewertet werden.
+
+    Yields:
+        str: Textstücke der Roh-Antwort, sobald sie vom LLM eintreffen.
+
+    Returns:
+        str: Der vollständige, maßgebliche Text (siehe `stream_llm_request`).
+    """
+    prompt = _build_prompt(plan_text, model)
+    return (yield from stream_llm_request(api_url, api_key, prompt, model))
+
+
+def stream_parsed_tickets(
+    api_url: str,
+    api_key: str,
+    plan_text: str,
+    model: str
+) -> Iterator[dict]:
+    """
+    Streaming-Variante von `generate_tickets`, die jedes Ticket liefert, sobald es
+    in der gestreamten Antwort vollständig ist.
+
+    So kann die Weiterverarbeitung des ersten Tickets beginnen, während das LLM
+    noch die folgenden erzeugt. Weicht der maßgebliche Endtext vom gestreamten
+    Text ab, werden fehlende Tickets aus dem Endtext nachgeliefert.
+
+    Yields:
+        dict: Die Tickets in der Reihenfolge der Antwort.
+
+    Returns:
+        list: Die vollständige Ticket-Liste (wie `parse_tickets` auf dem Endtext).
+
+    Raises:
+        ValueError: Wenn kein gültiges JSON-Array in der Antwort gefunden wird.
+    """
+    parser = TicketStreamParser()
+    stream = stream_tickets(api_url, api_key, plan_text, model)
+    count = 0
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as stop:
+            text = stop.value
+            break
+        for ticket in parser.feed(chunk):
+            count += 1
+            yield ticket
+    tickets = parse_tickets(text)
+    yield from tickets[count:]
     return tickets
@@ -0,0 +1,201 @@
+"""
+Dieses Modul stellt einen inkrementellen Parser für das Ticket-JSON-Array der
+LLM-Antwort bereit.
+
+Statt auf die vollständige Antwort zu warten und das Array mit einem einzigen
+`json.loads` zu parsen, wird der Text zeichenweise gelesen (Klammertiefe,
+Strings, Escapes). Jedes Element des Arrays wird geliefert, sobald es
+vollständig ist. Ein fehlerhaftes Element verwirft nicht mehr das gesamte
+Array: Es wird übersprungen, und gültige Objekte darin bzw. dahinter werden
+nach Möglichkeit wiederhergestellt.
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Optional
+
+from core import metrics
+
+_decoder = json.JSONDecoder()
+
+
+def _recover(text: str) -> List[Any]:
+    """
+    Sucht in einem nicht parsebaren Abschnitt nach vollständigen JSON-Objekten.
+
+    Ab jeder öffnenden geschweiften Klammer wird ein Objekt dekodiert; nach einem
+    Treffer wird hinter dem Objekt weitergesucht.
+    """
+    found = []
+    pos = text.find("{", 1)
+    while pos != -1:
+        try:
+            obj, end = _decoder.raw_decode(text, pos)
+        except ValueError:
+            pos = text.find("{", pos + 1)
+            continue
+        if isinstance(obj, dict):
+            found.append(obj)
+        pos = text.find("{", end)
+    return found
+
+
+class TicketStreamParser:
+    """
+    Inkrementeller Parser für das erste JSON-Array einer (gestreamten) Antwort.
+
+    Text vor dem Array (Einleitung, Code-Fence) und danach wird ignoriert.
+
+    Attributes:
+        found (bool): Ob der Anfang eines Arrays gesehen wurde.
+        done (bool): Ob das Array geschlossen wurde.
+        errors (List[str]): Fehlermeldungen zu übersprungenen Elementen.
+    """
+
+    def __init__(self):
+        self.found = False
+        self.done = False
+        self.errors: List[str] = []
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Verarbeitet ein weiteres Textstück.
+
+        Args:
+            chunk (str): Der neu eingetroffene Text.
+
+        Returns:
+            List[Any]: Alle Elemente, die durch dieses Stück vollständig geworden sind.
+        """
+        if self.done or not chunk:
+            return []
+        if not self.found:
+            start = chunk.find("[")
+            if start == -1:
+                return []
+            self.found = True
+            self._depth = 1
+            chunk = chunk[start + 1:]
+
+        self._buf += chunk
+        items: List[Any] = []
+        buf = self._buf
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                continue
+            if c.isspace():
+                continue
+            if self._depth == 1:
+                if c in ",]":
+                    self._finish(i, items)
+                    if c == "]":
+                        self.done = True
+                        break
+                    continue
+                if self._start is None:
+                    self._start = i
+            if c == '"':
+                self._in_string = True
+            elif c in "[{":
+                self._depth += 1
+            elif c in "]}":
+                self._depth -= 1
+                if self._depth == 1:
+                    # Objekt oder Array abgeschlossen: sofort liefern, nicht erst beim Komma
+                    self._finish(i + 1, items)
+
+        # Verarbeiteten Text verwerfen, nur das laufende Element behalten
+        cut = len(buf) if self._start is None else self._start
+        self._buf = buf[cut:]
+        self._pos = len(buf) - cut
+        if self._start is not None:
+            self._start -= cut
+        return items
+
+    def _finish(self, end: int, items: List[Any]) -> None:
+        """Parst das Element von `_start` bis `end` und hängt es bzw. Wiederhergestelltes an."""
+        if self._start is None:
+            return
+        text = self._buf[self._start:end].strip()
+        self._start = None
+        try:
+            items.append(json.loads(text))
+        except json.JSONDecodeError as e:
+            self.errors.append(f"{e}: {text[:200]}")
+            items.extend(_recover(text))
+
+    def close(self) -> List[Any]:
+        """
+        Schließt den Parser ab, z. B. wenn der Stream ohne schließende Klammer endet.
+
+        Returns:
+            List[Any]: Aus dem unvollständigen Rest wiederhergestellte Elemente.
+        """
+        if self.done or not self.found or self._start is None:
+            return []
+        text = self._buf[self._start:].strip()
+        self._start = None
+        self.done = True
+        self.errors.append(f"Unvollständiges Element am Ende: {text[:200]}")
+        try:
+            obj, _ = _decoder.raw_decode(text)
+            return [obj]
+        except ValueError:
+            return _recover(" " + text)
+
+
+def iter_tickets(chunks: Iterable[str], parser: Optional[TicketStreamParser] = None) -> Iterator[Any]:
+    """
+    Liefert Tickets aus einem Strom von Textstücken, sobald sie vollständig sind.
+
+    Args:
+        chunks (Iterable[str]): Die Textstücke der LLM-Antwort.
+        parser (Optional[TicketStreamParser]): Optional ein eigener Parser, um nach
+            dem Durchlauf `errors` auszuwerten.
+
+    Yields:
+        Any: Die Elemente des Arrays (in der Regel Ticket-Dictionaries).
+    """
+    parser = parser or TicketStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            break
+    yield from parser.close()
+
+
+@metrics.timed("tickets.parse")
+def parse_tickets(raw: str) -> list:
+    """
+    Extrahiert das JSON-Array der Tickets aus der Roh-Antwort des LLM.
+
+    Fehlerhafte Elemente werden übersprungen, solange mindestens ein Ticket
+    gelesen werden kann.
+
+    Raises:
+        ValueError: Wenn kein JSON-Array gefunden wird oder kein Element parsebar ist.
+    """
+    raw_str = raw.strip()
+    start = raw_str.find('[')
+    end = raw_str.rfind(']') + 1
+    if start == -1 or end == 0:
+        raise ValueError(f"Kein JSON-Array gefunden in Antwort. Roh-Antwort:\n{raw_str}")
+
+    parser = TicketStreamParser()
+    tickets = list(iter_tickets([raw_str], parser))
+    if parser.errors and not tickets:
+        json_str = raw_str[start:end]
+        raise ValueError(f"Fehler beim Parsen: {parser.errors[0]}\nExtrahiertes JSON:\n{json_str}")
+    return tickets
@@ -1,18 +1,103 @@
 import os
 import json
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+from core import http_client
+
+# Status codes after which GitLab has not created the issue and a retry is safe;
+# 502/504 are left out because the issue may already exist behind the proxy
+_RETRY_STATUS = (429, 503)
+
+
+class _RateLimiter:
+    """Pause shared by all workers once GitLab signals a rate limit."""
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self._resume_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.time() + seconds)
+
+
+def _retry_after(response, attempt: int, backoff_factor: float) -> float:
+    """Seconds to wait before retrying, from ``Retry-After``/``RateLimit-Reset`` or backoff."""
+    value = response.headers.get("Retry-After")
+    if value:
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    reset = response.headers.get("RateLimit-Reset")
+    if reset and reset.strip().isdigit():
+        return max(0.0, float(reset) - time.time())
+    return backoff_factor * (2 ** attempt)
 
 
 def create_issue(
-    title: str, description: str, gitlab_url: str, project_id: str, token: str
+    title: str,
+    description: str,
+    gitlab_url: str,
+    project_id: str,
+    token: str,
+    max_retries: int = 5,
+    backoff_factor: float = 1.0,
+    limiter: _RateLimiter | None = None,
 ) -> dict:
-    """Create a single GitLab issue via the API."""
+    """Create a single GitLab issue via the API.
+
+    Rate-limited (429) and unavailable (503) responses are retried up to
+    ``max_retries`` times, honouring ``Retry-After`` and ``RateLimit-Reset``.
+    When ``RateLimit-Remaining`` drops to zero, ``limiter`` pauses all workers
+    until the window resets.
+    """
     api = f"{gitlab_url}/api/v4/projects/{project_id}/issues"
     headers = {"PRIVATE-TOKEN": token}
     payload = {"title": title, "description": description}
-    response = requests.post(api, headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()
+    limiter = limiter or _RateLimiter()
+    for attempt in range(max_retries + 1):
+        limiter.wait()
+        response = http_client.post(api, headers=headers, json=payload)
+        if response.status_code in _RETRY_STATUS and attempt < max_retries:
+            limiter.pause(_retry_after(response, attempt, backoff_factor))
+            continue
+        response.raise_for_status()
+        if response.headers.get("RateLimit-Remaining") == "0":
+            limiter.pause(_retry_after(response, attempt, 0.0))
+        return response.json()
+
+
+def ticket_key(ticket: dict) -> str:
+    """Stable checkpoint key of a ticket: its ``file_path``, falling back to the title."""
+    return ticket.get("file_path") or ticket.get("title", "Untitled")
+
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_checkpoint(path: str, checkpoint: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
 
 
 def create_issues_from_tickets(
@@ -20,11 +105,24 @@ def create_issues_from_tickets(
     gitlab_url: str | None = None,
     project_id: str | None = None,
     token: str | None = None,
+    max_workers: int = 4,
+    checkpoint_file: str | None = None,
 ) -> list:
     """Create GitLab issues for each ticket in ``tickets_file``.
 
     Parameters fall back to environment variables if not provided.
-    Returns a list with the created issue JSON objects.
+    Issues are created by a pool of ``max_workers`` threads sharing the pooled
+    session of ``core.http_client``. Every created issue is recorded in a
+    checkpoint file (default: ``gitlab_issues.json`` next to ``tickets_file``)
+    mapping the ticket key to the issue IID, so a re-run skips tickets that
+    already have an issue and resumes after a failure.
+
+    Returns a list with the issue JSON objects in ticket order; for tickets
+    skipped via the checkpoint, the recorded entry with ``"skipped": True``.
+
+    Raises:
+        RuntimeError: If some issues could not be created; the successful ones
+            are kept in the checkpoint.
     """
     with open(tickets_file, encoding="utf-8") as f:
         tickets = json.load(f)
@@ -36,14 +134,44 @@ def create_issues_from_tickets(
     if not project or not tok:
         raise ValueError("GitLab project ID und Token erforderlich")
 
-    issues = []
-    for ticket in tickets:
+    checkpoint_file = checkpoint_file or os.path.join(
+        os.path.dirname(os.path.abspath(tickets_file)), "gitlab_issues.json"
+    )
+    checkpoint = _load_checkpoint(checkpoint_file)
+    # Checkpoints of another GitLab project must not suppress issue creation
+    done = checkpoint.setdefault(f"{url}#{project}", {})
+    lock = threading.Lock()
+    limiter = _RateLimiter()
+
+    def export(ticket: dict):
+        key = ticket_key(ticket)
+        with lock:
+            if key in done:
+                return dict(done[key], skipped=True)
         title = ticket.get("title", "Untitled")
         desc = ticket.get("beschreibung", "")
         reqs = ticket.get("anforderungen", "")
         body = f"{desc}\n\n{reqs}" if reqs else desc
-        issue = create_issue(title, body, url, project, tok)
-        issues.append(issue)
+        issue = create_issue(title, body, url, project, tok, limiter=limiter)
+        with lock:
+            done[key] = {"iid": issue.get("iid"), "web_url": issue.get("web_url"), "title": title}
+            _save_checkpoint(checkpoint_file, checkpoint)
+        return issue
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(export, ticket) for ticket in tickets]
+    issues, errors = [], []
+    for ticket, future in zip(tickets, futures):
+        try:
+            issues.append(future.result())
+        except Exception as e:
+            name = ticket_key(ticket) if isinstance(ticket, dict) else repr(ticket)
+            errors.append(f"{name}: {e}")
+    if errors:
+        raise RuntimeError(
+            f"{len(errors)} von {len(tickets)} Issues fehlgeschlagen "
+            f"(erneuter Aufruf setzt fort):\n" + "\n".join(errors)
+        )
     return issues
 
 
@@ -69,8 +197,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--token", dest="token", default=os.getenv("GITLAB_TOKEN"), help="GitLab token"
     )
+    parser.add_argument(
+        "--workers", dest="workers", type=int, default=4, help="Concurrent requests"
+    )
+    parser.add_argument(
+        "--checkpoint", dest="checkpoint", default=None, help="Checkpoint file path"
+    )
     args = parser.parse_args()
 
     create_issues_from_tickets(
-        args.tickets_file, args.gitlab_url, args.project_id, args.token
+        args.tickets_file, args.gitlab_url, args.project_id, args.token,
+        max_workers=args.workers, checkpoint_file=args.checkpoint,
     )
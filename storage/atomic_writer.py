@@ -0,0 +1,216 @@
+"""
+Dieses Modul ist die gemeinsame Schreibschicht der `storage/*`-Saver.
+
+  - Jede Datei wird zuerst in eine temporäre Datei im selben Verzeichnis
+    geschrieben und dann per `os.replace` atomar umbenannt. Leser sehen so
+    immer entweder den alten oder den vollständigen neuen Inhalt, nie eine
+    halb geschriebene Datei.
+  - Schreibvorgänge auf denselben Pfad werden über Locks serialisiert;
+    gleichzeitige Writer überschreiben sich vollständig statt sich zu vermischen.
+  - Mit `group_commit()` werden viele kleine Dateien gesammelt festgeschrieben:
+    Innerhalb des Blocks landen die Inhalte nur in temporären Dateien; beim
+    Verlassen werden alle gemeinsam mit `fsync` gesichert, umbenannt und die
+    betroffenen Verzeichnisse einmal synchronisiert (z. B. am Ende einer Welle
+    von `/generate_all`). Die neuen Inhalte sind erst danach sichtbar.
+
+Ohne Gruppe wird jede Datei einzeln synchronisiert, sofern `fsync` aktiv ist.
+"""
+
+import itertools
+import os
+import stat
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from core import metrics
+from storage import tree_index
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "fsync": True,
+    "group_commit": True,
+}
+
+# Feste Anzahl Locks; Pfade werden per Hash zugeordnet, damit die Tabelle nicht wächst
+_path_locks = [threading.Lock() for _ in range(64)]
+_counter = itertools.count()
+_group: ContextVar[Optional["_Group"]] = ContextVar("atomic_writer_group", default=None)
+
+PathLike = Union[str, Path]
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Konfiguration an.
+
+    Unterstützte Optionen:
+      - fsync (bool): Dateien vor dem Umbenennen und danach ihr Verzeichnis
+        synchronisieren. False überlässt das Zurückschreiben dem Betriebssystem;
+        das Umbenennen bleibt atomar.
+      - group_commit (bool): False macht `group_commit()` wirkungslos, jede
+        Datei wird dann sofort geschrieben.
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    return _path_locks[hash(str(path)) % len(_path_locks)]
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Verzeichnisse lassen sich nicht auf allen Plattformen öffnen (z. B. Windows)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: Path, data: bytes, sync: bool) -> Path:
+    """Schreibt `data` in eine neue temporäre Datei neben `path` und übernimmt dessen Rechte."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{next(_counter)}.tmp")
+    # 0o666 statt mkstemp (0o600), damit die umask wie bei `write_text` greift
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+    except BaseException:
+        _unlink(tmp)
+        raise
+    return tmp
+
+
+def _unlink(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class _Group:
+    """Sammelt temporäre Dateien bis zum gemeinsamen Commit."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: Dict[Path, Path] = {}
+
+    def add(self, path: Path, tmp: Path) -> None:
+        with self.lock:
+            previous = self.pending.pop(path, None)
+            self.pending[path] = tmp
+        if previous is not None:
+            _unlink(previous)
+
+    def commit(self) -> None:
+        with self.lock:
+            pending = dict(self.pending)
+        if not pending:
+            return
+        sync = _config["fsync"]
+        with metrics.timer("storage.group_commit"):
+            if sync:
+                for tmp in pending.values():
+                    fd = os.open(tmp, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+            for path, tmp in pending.items():
+                with _lock_for(path):
+                    os.replace(tmp, path)
+                with self.lock:
+                    del self.pending[path]
+            if sync:
+                for directory in {path.parent for path in pending}:
+                    _fsync_dir(directory)
+        for path in pending:
+            tree_index.invalidate(str(path))
+
+    def discard(self) -> None:
+        """Entfernt die temporären Dateien, die nicht mehr festgeschrieben wurden."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for tmp in pending.values():
+            _unlink(tmp)
+
+
+def write_bytes(path: PathLike, data: bytes) -> str:
+    """
+    Schreibt `data` atomar nach `path`; das Verzeichnis muss existieren.
+
+    Innerhalb von `group_commit()` wird die Datei erst beim Commit sichtbar.
+
+    Returns:
+        str: Der Pfad der Datei als String.
+    """
+    path = Path(path)
+    group = _group.get()
+    if group is not None:
+        group.add(path, _write_temp(path, data, sync=False))
+        return str(path)
+
+    sync = _config["fsync"]
+    with _lock_for(path):
+        tmp = _write_temp(path, data, sync)
+        try:
+            os.replace(tmp, path)
+        except BaseException:
+            _unlink(tmp)
+            raise
+    if sync:
+        _fsync_dir(path.parent)
+    tree_index.invalidate(str(path))
+    return str(path)
+
+
+def write_text(path: PathLike, text: str, encoding: str = "utf-8") -> str:
+    """Schreibt Text atomar (ohne Umwandlung der Zeilenenden), siehe `write_bytes`."""
+    return write_bytes(path, text.encode(encoding))
+
+
+@contextmanager
+def group_commit() -> Iterator[None]:
+    """
+    Sammelt alle Schreibvorgänge im aktuellen Kontext und schreibt sie beim
+    Verlassen gemeinsam fest.
+
+    Worker-Threads nehmen teil, wenn sie den Kontext kopieren (`copy_context`),
+    wie es `/generate_all` und `core.async_runner` tun. Gruppen lassen sich
+    verschachteln; dann schreibt erst die äußerste fest. Bricht der Block mit
+    einer Ausnahme ab, werden die bis dahin vollständig geschriebenen Dateien
+    trotzdem festgeschrieben. Schlägt der Commit selbst fehl, werden die übrigen
+    temporären Dateien entfernt.
+    """
+    if not _config["group_commit"] or _group.get() is not None:
+        yield
+        return
+    group = _Group()
+    token = _group.set(group)
+    try:
+        yield
+    finally:
+        _group.reset(token)
+        try:
+            group.commit()
+        except BaseException:
+            group.discard()
+            raise
+
@@ -0,0 +1,403 @@
+"""
+Dieses Modul stellt austauschbare Storage-Backends für Projektdateien bereit.
+
+Alle Saver (`save_code`, `save_tests`, `save_plan`, `save_tickets`,
+`save_manifest`), das Anlegen neuer Projekte sowie die Routen `/structure` und
+`/file_content` greifen über `get_backend()` auf Projektdateien zu. Eine Datei
+wird über den Projektordner und einen relativen Pfad (z. B. "src/app/main.py")
+adressiert; der Projektordner dient bei den Nicht-Dateisystem-Backends nur als
+Schlüssel.
+
+  - "filesystem": Das bisherige Verzeichnis pro Projekt (atomare Writes über
+    `storage.atomic_writer`, Auflistung über `storage.tree_index`).
+  - "sqlite": Alle Projekte als Blobs in einer einzigen SQLite-Datei.
+  - "objects": Inhaltsadressierter Objektspeicher (Blobs unter ihrem SHA-256,
+    je Datei eine Referenz). Die mitgelieferte Variante legt die Objekte in
+    einem lokalen Verzeichnis ab; für einen echten Objektspeicher werden nur
+    `_put`, `_get`, `_has` und `_keys` überschrieben.
+
+Leere Verzeichnisse gibt es nur im Dateisystem-Backend; in den anderen
+Backends existiert ein Verzeichnis, sobald eine Datei darin liegt.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from storage import atomic_writer, tree_index
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "backend": "filesystem",
+    "path": None,
+}
+
+_instance: Optional["StorageBackend"] = None
+_instance_lock = threading.Lock()
+
+# Temporäre Dateien von `storage.atomic_writer` (".<name>.<pid>.<n>.tmp")
+_TEMP_NAME = re.compile(r"^\..+\.\d+\.\d+\.tmp$")
+
+
+def _normalize(rel_path: str) -> str:
+    """
+    Normalisiert einen relativen Pfad auf die Form "a/b/c" ("" = Projektwurzel).
+
+    Raises:
+        ValueError: Wenn der Pfad aus dem Projektordner herausführt.
+    """
+    path = posixpath.normpath(str(rel_path).replace("\\", "/").strip("/") or ".")
+    if path == ".":
+        return ""
+    if path == ".." or path.startswith("../"):
+        raise ValueError(f"Pfad außerhalb des Projektordners: {rel_path}")
+    return path
+
+
+def _project_key(project_folder: str) -> str:
+    return Path(os.path.normpath(project_folder)).as_posix()
+
+
+def _page(rel_dir: str, dirs: List[str], files: List[str], offset: int, limit: Optional[int]) -> dict:
+    """Baut eine Verzeichnisauflistung im Format von `TreeIndex.list_dir`."""
+    end = len(files) if limit is None else offset + limit
+    return {
+        "path": rel_dir,
+        "dirs": dirs,
+        "files": files[offset:end],
+        "total_files": len(files),
+        "offset": offset,
+        "next_offset": end if end < len(files) else None,
+    }
+
+
+class StorageBackend:
+    """
+    Basisklasse eines Storage-Backends.
+
+    Unterklassen implementieren `write_bytes`, `read_bytes` und `paths`; die
+    Auflistungen (`list_dir`, `tree`) werden daraus abgeleitet.
+
+    Attributes:
+        name (str): Name des Backends, z. B. "sqlite".
+    """
+
+    name = ""
+
+    def locator(self, project_folder: str, rel_path: str) -> str:
+        """Liefert den Pfad, den die Saver für eine Datei zurückgeben."""
+        return str(Path(project_folder) / _normalize(rel_path))
+
+    def write_bytes(self, project_folder: str, rel_path: str, data: bytes) -> str:
+        """Speichert eine Datei und liefert ihren `locator`."""
+        raise NotImplementedError
+
+    def write_text(self, project_folder: str, rel_path: str, text: str) -> str:
+        """Speichert Text als UTF-8, siehe `write_bytes`."""
+        return self.write_bytes(project_folder, rel_path, text.encode("utf-8"))
+
+    def read_bytes(self, project_folder: str, rel_path: str) -> bytes:
+        """
+        Liest eine Datei.
+
+        Raises:
+            FileNotFoundError: Wenn die Datei nicht existiert.
+            ValueError: Bei Pfaden außerhalb des Projekts.
+        """
+        raise NotImplementedError
+
+    def read_text(self, project_folder: str, rel_path: str) -> str:
+        """Liest eine Datei als UTF-8-Text, siehe `read_bytes`."""
+        return self.read_bytes(project_folder, rel_path).decode("utf-8")
+
+    def paths(self, project_folder: str) -> List[str]:
+        """Liefert die relativen Pfade aller Dateien eines Projekts, sortiert."""
+        raise NotImplementedError
+
+    def exists(self, project_folder: str, rel_path: str = "") -> bool:
+        """Prüft, ob eine Datei bzw. ein Verzeichnis (leer = das Projekt) existiert."""
+        rel_path = _normalize(rel_path)
+        prefix = rel_path + "/" if rel_path else ""
+        return any(p == rel_path or p.startswith(prefix) for p in self.paths(project_folder))
+
+    def make_dirs(self, project_folder: str, rel_dirs: Iterable[str]) -> None:
+        """Legt Verzeichnisse an; ohne echte Verzeichnisse wirkungslos."""
+
+    def _children(self, project_folder: str, rel_dir: str) -> Optional[Tuple[List[str], List[str]]]:
+        prefix = rel_dir + "/" if rel_dir else ""
+        dirs, files, found = set(), [], False
+        for path in self.paths(project_folder):
+            if not path.startswith(prefix):
+                continue
+            found = True
+            head, sep, _ = path[len(prefix):].partition("/")
+            if sep:
+                dirs.add(head)
+            else:
+                files.append(head)
+        if not found and rel_dir:
+            return None
+        return sorted(dirs), sorted(files)
+
+    def list_dir(
+        self, project_folder: str, rel_dir: str = "", offset: int = 0, limit: Optional[int] = None
+    ) -> dict:
+        """
+        Listet ein einzelnes Verzeichnis, Dateien seitenweise (wie `TreeIndex.list_dir`).
+
+        Raises:
+            ValueError: Bei Pfaden außerhalb des Projekts.
+            FileNotFoundError: Wenn das Verzeichnis nicht existiert.
+        """
+        children = self._children(project_folder, _normalize(rel_dir))
+        if children is None:
+            raise FileNotFoundError(f"Verzeichnis nicht gefunden: {rel_dir}")
+        return _page(rel_dir, children[0], children[1], offset, limit)
+
+    def tree(self, project_folder: str) -> dict:
+        """Baut den verschachtelten Baum des Projekts (Ordner -> dict, Datei -> None)."""
+        root: dict = {}
+        for path in self.paths(project_folder):
+            *parents, name = path.split("/")
+            node = root
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[name] = None
+        return root
+
+
+class FilesystemBackend(StorageBackend):
+    """Projekte als Verzeichnisse auf der lokalen Platte (bisheriges Verhalten)."""
+
+    name = "filesystem"
+
+    def _resolve(self, project_folder: str, rel_path: str) -> Path:
+        return Path(project_folder) / _normalize(rel_path)
+
+    def write_bytes(self, project_folder: str, rel_path: str, data: bytes) -> str:
+        path = self._resolve(project_folder, rel_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return atomic_writer.write_bytes(path, data)
+
+    def read_bytes(self, project_folder: str, rel_path: str) -> bytes:
+        return self._resolve(project_folder, rel_path).read_bytes()
+
+    def paths(self, project_folder: str) -> List[str]:
+        root = Path(project_folder)
+        return sorted(
+            p.relative_to(root).as_posix() for p in root.rglob("*")
+            if p.is_file() and not _TEMP_NAME.match(p.name)
+        )
+
+    def exists(self, project_folder: str, rel_path: str = "") -> bool:
+        return self._resolve(project_folder, rel_path).exists()
+
+    def make_dirs(self, project_folder: str, rel_dirs: Iterable[str]) -> None:
+        for rel_dir in rel_dirs:
+            self._resolve(project_folder, rel_dir).mkdir(parents=True, exist_ok=True)
+
+    def list_dir(
+        self, project_folder: str, rel_dir: str = "", offset: int = 0, limit: Optional[int] = None
+    ) -> dict:
+        return tree_index.get_index(project_folder).list_dir(rel_dir, offset, limit)
+
+    def tree(self, project_folder: str) -> dict:
+        if not os.path.isdir(project_folder):
+            return {}
+        return tree_index.get_index(project_folder).tree()
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Alle Projekte in einer SQLite-Datei (Tabelle `files`, Schlüssel Projekt + Pfad).
+
+    Jeder Thread erhält eine eigene Verbindung; WAL erlaubt gleichzeitiges Lesen
+    während eines Schreibvorgangs.
+
+    Attributes:
+        path (str): Pfad der Datenbankdatei.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " project TEXT NOT NULL, path TEXT NOT NULL, data BLOB NOT NULL,"
+                " updated REAL NOT NULL, PRIMARY KEY (project, path))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Schließt alle offenen Verbindungen."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def write_bytes(self, project_folder: str, rel_path: str, data: bytes) -> str:
+        rel_path = _normalize(rel_path)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (project, path, data, updated) VALUES (?, ?, ?, ?)",
+                (_project_key(project_folder), rel_path, data, time.time()),
+            )
+        return self.locator(project_folder, rel_path)
+
+    def read_bytes(self, project_folder: str, rel_path: str) -> bytes:
+        row = self._conn().execute(
+            "SELECT data FROM files WHERE project = ? AND path = ?",
+            (_project_key(project_folder), _normalize(rel_path)),
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Datei nicht gefunden: {rel_path}")
+        return bytes(row[0])
+
+    def paths(self, project_folder: str) -> List[str]:
+        rows = self._conn().execute(
+            "SELECT path FROM files WHERE project = ? ORDER BY path",
+            (_project_key(project_folder),),
+        )
+        return [row[0] for row in rows]
+
+
+class ObjectStoreBackend(StorageBackend):
+    """
+    Inhaltsadressierter Objektspeicher.
+
+    Schlüssel:
+      - `objects/<ab>/<sha256>`: der Dateiinhalt; gleiche Inhalte werden nur einmal abgelegt.
+      - `refs/<sha256(Projekt)>/<Pfad, URL-kodiert>`: der Hash des aktuellen Inhalts.
+
+    Jede Datei hat eine eigene Referenz, sodass mehrere Knoten ohne gemeinsames
+    Read-Modify-Write schreiben können (der letzte Schreiber gewinnt je Datei).
+    Die lokale Variante schreibt über `storage.atomic_writer` in `root`.
+
+    Attributes:
+        root (Path): Wurzelverzeichnis des lokalen Objektspeichers.
+    """
+
+    name = "objects"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    # --- Primitive des Objektspeichers; für entfernte Speicher überschreiben ---
+
+    def _put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_writer.write_bytes(path, data)
+
+    def _get(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def _has(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def _keys(self, prefix: str) -> List[str]:
+        """Liefert die Schlüssel direkt unterhalb von `prefix` (ein Verzeichnis)."""
+        try:
+            names = os.listdir(self.root / prefix)
+        except FileNotFoundError:
+            return []
+        return [f"{prefix}/{name}" for name in names if not _TEMP_NAME.match(name)]
+
+    # --- Abbildung der Projektdateien ---
+
+    def _ref_prefix(self, project_folder: str) -> str:
+        return "refs/" + hashlib.sha256(_project_key(project_folder).encode("utf-8")).hexdigest()
+
+    def _ref_key(self, project_folder: str, rel_path: str) -> str:
+        return f"{self._ref_prefix(project_folder)}/{quote(_normalize(rel_path), safe='')}"
+
+    def write_bytes(self, project_folder: str, rel_path: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        object_key = f"objects/{digest[:2]}/{digest}"
+        if not self._has(object_key):
+            self._put(object_key, data)
+        self._put(self._ref_key(project_folder, rel_path), digest.encode("ascii"))
+        return self.locator(project_folder, rel_path)
+
+    def read_bytes(self, project_folder: str, rel_path: str) -> bytes:
+        try:
+            digest = self._get(self._ref_key(project_folder, rel_path)).decode("ascii")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Datei nicht gefunden: {rel_path}") from None
+        return self._get(f"objects/{digest[:2]}/{digest}")
+
+    def paths(self, project_folder: str) -> List[str]:
+        prefix = self._ref_prefix(project_folder)
+        return sorted(unquote(key[len(prefix) + 1:]) for key in self._keys(prefix))
+
+
+_backend_types = {
+    "filesystem": FilesystemBackend,
+    "sqlite": SQLiteBackend,
+    "objects": ObjectStoreBackend,
+}
+
+
+def configure(**options: Any) -> None:
+    """
+    Wählt das Storage-Backend.
+
+    Unterstützte Optionen:
+      - backend (str | StorageBackend): "filesystem" (Standard), "sqlite",
+        "objects" oder eine eigene Instanz.
+      - path (Optional[str]): Datenbankdatei ("sqlite") bzw. Wurzelverzeichnis
+        ("objects").
+
+    Raises:
+        ValueError: Bei unbekannten Optionen oder Backends oder fehlendem `path`.
+    """
+    global _instance
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    config = dict(_config, **options)
+    backend = config["backend"]
+    if isinstance(backend, StorageBackend):
+        instance = backend
+    elif backend not in _backend_types:
+        raise ValueError(f"Unbekanntes Storage-Backend: {backend}")
+    elif backend == "filesystem":
+        instance = FilesystemBackend()
+    elif not config["path"]:
+        raise ValueError(f"Storage-Backend {backend} benötigt die Option path.")
+    else:
+        instance = _backend_types[backend](config["path"])
+    with _instance_lock:
+        _config.update(options)
+        _instance = instance
+
+
+def get_backend() -> StorageBackend:
+    """Liefert das konfigurierte Storage-Backend (standardmäßig das Dateisystem)."""
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = FilesystemBackend()
+        return _instance
@@ -0,0 +1,182 @@
+"""
+Dieses Modul stellt einen inhaltsadressierten Blob-Speicher pro Projekt bereit
+(`<project_folder>/logs/blobs/`).
+
+Jeder Inhalt wird unter seinem SHA-256-Hash zlib-komprimiert genau einmal
+abgelegt (`<ab>/<hash>`). Darauf bauen auf:
+
+  - `storage.saver`: Eingabe und Antwort eines Log-Datensatzes werden ab
+    `min_size` Bytes als Referenz `{"blob": "<hash>"}` gespeichert; ein bei
+    jedem Aufruf erneut gesendeter Plan liegt so nur einmal auf der Platte.
+    `query_responses` löst die Referenzen wieder auf.
+  - `storage.code_storage` und `storage.test_storage` (über `write_artifact`):
+    Jede erzeugte Fassung landet (beim Dateisystem-Backend) im Blob-Speicher;
+    die Arbeitsdatei wird nur geschrieben, wenn sich ihr Inhalt geändert hat.
+    Der Hash entspricht dem `src_hash` im Build-Manifest (`storage.manifest_storage`).
+
+Blobs sind unveränderlich und werden ohne Gruppen-Commit und ohne `fsync`
+geschrieben, also mit derselben Haltbarkeit wie das Log, das sie referenziert.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple, Union
+
+from core import metrics
+from storage import backends
+
+# Standardkonfiguration, über `configure()` anpassbar
+_config: Dict[str, Any] = {
+    "enabled": True,
+    "min_size": 256,
+    "level": 6,
+}
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+_counter = itertools.count()
+
+Ref = Union[str, Dict[str, str]]
+
+
+def configure(**options: Any) -> None:
+    """
+    Passt die Konfiguration an.
+
+    Unterstützte Optionen:
+      - enabled (bool): False schreibt Log-Datensätze wieder vollständig und
+        Artefakte ohne Blob-Kopie.
+      - min_size (int): Ab dieser Größe in Bytes wird ein Log-Feld als Blob abgelegt.
+      - level (int): zlib-Kompressionsstufe (0-9).
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_config)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _config.update(options)
+
+
+class BlobStore:
+    """
+    Inhaltsadressierte, komprimierte Blobs eines Verzeichnisses.
+
+    Attributes:
+        directory (Path): Wurzel der Blobs.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        if not _DIGEST.match(digest):
+            raise ValueError(f"Ungültiger Blob-Hash: {digest}")
+        return self.directory / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        """Speichert `data`, falls noch nicht vorhanden, und liefert den Hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = digest in self._known
+        path = self._path(digest)
+        if known or path.exists():
+            metrics.inc("storage_dedup_total", stage="storage.blob_put")
+        else:
+            compressed = zlib.compress(data, _config["level"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{digest}.{os.getpid()}.{next(_counter)}.tmp")
+            try:
+                tmp.write_bytes(compressed)
+                os.replace(tmp, path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            metrics.record_write("storage.blob_put", compressed)
+        with self._lock:
+            self._known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Liest einen Blob.
+
+        Raises:
+            FileNotFoundError: Wenn es den Blob nicht gibt.
+            ValueError: Bei einem ungültigen Hash.
+        """
+        return zlib.decompress(self._path(digest).read_bytes())
+
+    def ref(self, text: str) -> Ref:
+        """Liefert kurze Texte unverändert, längere als Referenz `{"blob": hash}`."""
+        data = text.encode("utf-8")
+        if not _config["enabled"] or len(data) < _config["min_size"]:
+            return text
+        return {"blob": self.put(data)}
+
+    def resolve(self, value: Any) -> Any:
+        """Löst eine Referenz aus `ref` wieder zum Text auf; andere Werte bleiben unverändert."""
+        if isinstance(value, dict) and isinstance(value.get("blob"), str):
+            return self.get(value["blob"]).decode("utf-8")
+        return value
+
+
+_stores: Dict[Path, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: str) -> BlobStore:
+    """Gibt den prozessweit geteilten Blob-Speicher eines Verzeichnisses zurück."""
+    key = Path(directory).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BlobStore(str(key))
+        return store
+
+
+def project_store(project_folder: str) -> BlobStore:
+    """Blob-Speicher eines Projekts unter `<project_folder>/logs/blobs/`."""
+    return get_store(str(Path(project_folder) / "logs" / "blobs"))
+
+
+def write_artifact(project_folder: str, rel_path: str, text: str) -> Tuple[str, bool]:
+    """
+    Schreibt ein generiertes Artefakt über den Blob-Speicher.
+
+    Die Fassung wird als Blob abgelegt (nur beim Dateisystem-Backend, siehe
+    `storage.backends`); die Arbeitsdatei wird nur geschrieben, wenn ihr
+    bisheriger Inhalt einen anderen Hash hat.
+
+    Args:
+        project_folder (str): Wurzelverzeichnis des Projekts.
+        rel_path (str): Pfad relativ zum Projekt, z. B. "src/app/main.py".
+        text (str): Der neue Dateiinhalt.
+
+    Returns:
+        Tuple[str, bool]: Pfad der Datei und ob sie geschrieben wurde.
+    """
+    data = text.encode("utf-8")
+    backend = backends.get_backend()
+    if not _config["enabled"]:
+        return backend.write_bytes(project_folder, rel_path, data), True
+
+    if backend.name == "filesystem":
+        digest = project_store(project_folder).put(data)
+    else:
+        # Ohne lokales Projektverzeichnis nur der Vergleich, keine Blob-Kopie
+        digest = hashlib.sha256(data).hexdigest()
+    try:
+        current = hashlib.sha256(backend.read_bytes(project_folder, rel_path)).hexdigest()
+    except (OSError, ValueError):
+        current = None
+    if current == digest:
+        metrics.inc("storage_dedup_total", stage="storage.write_artifact")
+        return backend.locator(project_folder, rel_path), False
+    return backend.write_bytes(project_folder, rel_path, data), True
@@ -1,12 +1,20 @@
 """
 Dieses Modul stellt Funktionen zum Speichern von generiertem Code auf dem Dateisystem bereit.
-Es extrahiert Code aus Markdown-Fences und legt die Quelldateien unter `<project_folder>/src/` ab.
+Es extrahiert Code aus Markdown-Fences (`storage.fence_parser`) und legt die Quelldateien
+unter `<project_folder>/src/` ab. Nennt ein Fence einen Dateinamen (z. B. "```python src/util.py"),
+landet sein Block in dieser Datei statt in der des Tickets.
 """
 
-import re
-from pathlib import Path
+import posixpath
+from typing import Dict, List, Optional, Tuple
 
+from core import metrics
+from storage import backends, blob_store
+from storage.fence_parser import Piece, parse_fences
+from storage.patcher import PatchError, apply_patch
 
+
+@metrics.timed("storage.extract_code")
 def _extract_code(markdown: str) -> str:
     """
     Extrahiert reinen Code aus einem Markdown-String, indem alle Code-Fences entfernt werden.
@@ -17,17 +25,110 @@ def _extract_code(markdown: str) -> str:
     Returns:
         str: Der extrahierte Code ohne Markdown-Fences, mit einheitlichen Zeilenenden (`\n`).
     """
-    fence = re.compile(r"```[^\n]*\n([\s\S]*?)```", re.MULTILINE)
-    blocks = fence.findall(markdown)
-    code = "\n".join(blocks) if blocks else markdown
-    return code.replace("\r\n", "\n")
+    found, pieces = parse_fences(markdown)
+    if not found:
+        return markdown.replace("\r\n", "\n")
+    return "\n".join(code for _, code in pieces)
+
+
+def _fence_target(name: Optional[str], file_path: str) -> Optional[str]:
+    """
+    Ordnet den Dateinamen eines Fences einem Pfad unter `src/` zu.
+
+    Returns:
+        Optional[str]: None für die Datei des Tickets (auch ohne oder mit
+            ungültigem Namen), sonst der normalisierte Pfad der anderen Datei.
+    """
+    if not name:
+        return None
+    path = posixpath.normpath(name.replace("\\", "/"))
+    if path.startswith("src/"):
+        path = path[4:]
+    if path.startswith(("/", "../")) or path in (".", ".."):
+        return None
+    target = posixpath.normpath(file_path.replace("\\", "/"))
+    if path == target or ("/" not in path and path == posixpath.basename(target)):
+        return None
+    return path
+
+
+@metrics.timed("storage.extract_code")
+def split_code_files(code_md: str, file_path: str) -> List[Tuple[str, str]]:
+    """
+    Verteilt die Code-Blöcke einer Antwort auf Dateien.
+
+    Blöcke ohne Dateinamen in der Info-Zeichenkette (siehe `storage.fence_parser`)
+    gehören zur Datei des Tickets; benannte Blöcke zu ihrer eigenen Datei.
+    Mehrere Blöcke derselben Datei werden wie bei `_extract_code` verbunden.
+    Enthält die Antwort keinen Block für die Ticket-Datei, wird wie bisher der
+    gesamte Code dort abgelegt.
+
+    Args:
+        code_md (str): Die LLM-Antwort.
+        file_path (str): Pfad der Ticket-Datei relativ zu `src/`.
+
+    Returns:
+        List[Tuple[str, str]]: (Pfad relativ zu `src/`, Code), die Ticket-Datei zuerst.
+    """
+    found, pieces = parse_fences(code_md)
+    if not found:
+        return [(file_path, code_md.replace("\r\n", "\n"))]
+    files: Dict[Optional[str], List[str]] = {None: []}
+    for name, code in pieces:
+        files.setdefault(_fence_target(name, file_path), []).append(code)
+    if not files[None]:
+        return [(file_path, "\n".join(code for _, code in pieces))]
+    return [(path or file_path, "\n".join(codes)) for path, codes in files.items()]
+
+
+@metrics.timed("storage.save_code")
+def save_code_files(project_folder: str, file_path: str, code_md: str) -> Dict[str, str]:
+    """
+    Speichert alle Dateien einer Antwort (siehe `split_code_files`) unter
+    `<project_folder>/src/`.
+
+    Geschrieben wird über den Blob-Speicher (`storage.blob_store.write_artifact`)
+    in das konfigurierte Storage-Backend; ist der Inhalt unverändert, bleibt die
+    Datei unangetastet.
+
+    Returns:
+        Dict[str, str]: Pfad relativ zu `src/` -> vollständiger Pfad der Datei.
+    """
+    saved = {}
+    for path, code in split_code_files(code_md, file_path):
+        saved[path], written = blob_store.write_artifact(project_folder, f"src/{path}", code)
+        if written:
+            metrics.record_write("storage.save_code", code)
+    return saved
+
+
+def save_code_piece(project_folder: str, file_path: str, piece: Piece) -> Optional[Tuple[str, str]]:
+    """
+    Speichert einen einzelnen, bereits abgeschlossenen Block eines Streams
+    (`FenceStreamParser`), sofern er eine andere Datei als die des Tickets benennt.
+
+    So liegen weitere Dateien schon vor, während die Antwort noch generiert
+    wird; das abschließende `save_code` schreibt sie nur bei geändertem Inhalt neu.
+
+    Returns:
+        Optional[Tuple[str, str]]: (Pfad relativ zu `src/`, vollständiger Pfad)
+            oder None für Blöcke der Ticket-Datei.
+    """
+    path = _fence_target(piece[0], file_path)
+    if path is None:
+        return None
+    saved, written = blob_store.write_artifact(project_folder, f"src/{path}", piece[1])
+    if written:
+        metrics.record_write("storage.save_code", piece[1])
+    return path, saved
 
 
 def save_code(project_folder: str, file_path: str, code_md: str) -> str:
     """
     Speichert extrahierten Code aus Markdown in einer Datei unter `<project_folder>/src/<file_path>`.
 
-    Dabei wird die Verzeichnisstruktur angelegt, falls sie noch nicht existiert.
+    Benennt die Antwort in ihren Fences weitere Dateien, werden diese ebenfalls
+    gespeichert (`save_code_files`).
 
     Args:
         project_folder (str): Wurzelverzeichnis des Projekts.
@@ -37,8 +138,35 @@ def save_code(project_folder: str, file_path: str, code_md: str) -> str:
     Returns:
         str: Der vollständige Pfad der geschriebenen Datei als String.
     """
-    p = Path(project_folder) / "src" / file_path
-    p.parent.mkdir(parents=True, exist_ok=True)
-    code = _extract_code(code_md)
-    p.write_text(code, encoding="utf-8")
-    return str(p)
+    return save_code_files(project_folder, file_path, code_md)[file_path]
+
+
+@metrics.timed("storage.save_code_patch")
+def save_code_patch(project_folder: str, file_path: str, patch_md: str) -> str:
+    """
+    Wendet Änderungen (Suchen/Ersetzen-Blöcke oder Unified Diff, siehe
+    `storage.patcher`) auf die bestehende Datei `<project_folder>/src/<file_path>` an.
+
+    Gelesen und geschrieben wird über das Storage-Backend (`storage.backends`);
+    schlägt der Patch fehl, bleibt die Datei unverändert.
+
+    Args:
+        project_folder (str): Wurzelverzeichnis des Projekts.
+        file_path (str): Relativer Pfad (innerhalb von `src/`) zur Zieldatei.
+        patch_md (str): Die LLM-Antwort mit den Änderungen.
+
+    Returns:
+        str: Der vollständige Pfad der geänderten Datei als String.
+
+    Raises:
+        PatchError: Wenn die Datei fehlt oder der Patch nicht eindeutig anwendbar ist.
+    """
+    backend = backends.get_backend()
+    try:
+        original = backend.read_text(project_folder, f"src/{file_path}")
+    except (OSError, UnicodeDecodeError) as e:
+        raise PatchError(f"Datei kann nicht gepatcht werden: {e}") from e
+    code = apply_patch(original, patch_md, file_path)
+    saved = backend.write_text(project_folder, f"src/{file_path}", code)
+    metrics.record_write("storage.save_code_patch", code)
+    return saved
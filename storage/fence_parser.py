@@ -0,0 +1,136 @@
+"""
+Dieses Modul stellt einen inkrementellen Parser für Markdown-Code-Fences in
+LLM-Antworten bereit.
+
+Der Text wird in einem Durchlauf zeilenweise gelesen; Textstücke eines Streams
+können direkt mit `feed` übergeben werden. Jeder Code-Block wird als
+(Pfad, Code) geliefert, sobald sein schließender Fence eintrifft, sodass Dateien
+schon während der Generierung geschrieben werden können.
+
+  - Fences aus mindestens drei Backticks oder Tilden; ein Block endet erst an
+    einer Zeile mit demselben Zeichen in mindestens gleicher Länge. Ein Block
+    mit vier Backticks kann so Blöcke mit drei Backticks enthalten.
+  - Die Info-Zeichenkette liefert Sprache und optional einen Dateinamen, z. B.
+    "```python src/app.py", "```python:app.py", '```py title="app.py"' oder
+    "```app.py".
+  - Ein nicht geschlossener Block (abgebrochene Antwort) wird beim `close`
+    bis zum Ende geliefert.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# (Dateiname aus der Info-Zeichenkette oder None, Code mit abschließendem Zeilenumbruch)
+Piece = Tuple[Optional[str], str]
+
+_OPEN = re.compile(r"^[ \t]*(`{3,}|~{3,})[ \t]*(.*?)[ \t]*$")
+_PATH_KEY = re.compile(r"^(?:title|file|filename|path|name)=", re.IGNORECASE)
+_PATH = re.compile(r"^[\w.\-/]*\.[A-Za-z][A-Za-z0-9]*$")
+
+
+def _looks_like_path(token: str) -> bool:
+    return bool(token) and ("/" in token or bool(_PATH.match(token)))
+
+
+def parse_info(info: str) -> Tuple[str, Optional[str]]:
+    """
+    Zerlegt die Info-Zeichenkette eines Fences in Sprache und Dateinamen.
+
+    Returns:
+        Tuple[str, Optional[str]]: Sprache ("" wenn keine) und Dateiname oder None.
+    """
+    language, path = "", None
+    for i, token in enumerate(info.split()):
+        token = token.strip("\"'")
+        if _PATH_KEY.match(token):
+            path = path or token.split("=", 1)[1].strip("\"'") or None
+        elif i == 0 and ":" in token:
+            language, _, rest = token.partition(":")
+            if _looks_like_path(rest):
+                path = rest
+        elif path is None and _looks_like_path(token):
+            path = token
+        elif i == 0:
+            language = token
+    return language, path
+
+
+class FenceStreamParser:
+    """
+    Inkrementeller Parser für die Code-Blöcke einer (gestreamten) Antwort.
+
+    Attributes:
+        found (bool): Ob mindestens ein öffnender Fence gesehen wurde.
+        unterminated (bool): Ob der letzte Block erst durch `close` beendet wurde.
+    """
+
+    def __init__(self):
+        self.found = False
+        self.unterminated = False
+        self._partial = ""
+        self._fence: Optional[str] = None
+        self._path: Optional[str] = None
+        self._lines: List[str] = []
+
+    def feed(self, chunk: str) -> List[Piece]:
+        """
+        Verarbeitet ein weiteres Textstück.
+
+        Returns:
+            List[Piece]: Alle Blöcke, die durch dieses Stück abgeschlossen wurden.
+        """
+        if not chunk:
+            return []
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        pieces: List[Piece] = []
+        for line in lines:
+            self._line(line, pieces)
+        return pieces
+
+    def close(self) -> List[Piece]:
+        """Verarbeitet den Rest und liefert einen noch offenen Block."""
+        pieces: List[Piece] = []
+        if self._partial:
+            self._line(self._partial, pieces)
+            self._partial = ""
+        if self._fence is not None:
+            self.unterminated = True
+            pieces.append(self._finish())
+        return pieces
+
+    def _line(self, line: str, pieces: List[Piece]) -> None:
+        line = line[:-1] if line.endswith("\r") else line
+        if self._fence is None:
+            match = _OPEN.match(line)
+            # Backtick-Fences dürfen in der Info-Zeichenkette keine Backticks enthalten
+            if match and not (match.group(1)[0] == "`" and "`" in match.group(2)):
+                self.found = True
+                self._fence = match.group(1)
+                self._path = parse_info(match.group(2))[1]
+            return
+        stripped = line.strip()
+        fence = self._fence
+        if len(stripped) >= len(fence) and stripped == fence[0] * len(stripped):
+            pieces.append(self._finish())
+        else:
+            self._lines.append(line)
+
+    def _finish(self) -> Piece:
+        code = "\n".join(self._lines) + "\n" if self._lines else ""
+        piece = (self._path, code)
+        self._fence, self._path, self._lines = None, None, []
+        return piece
+
+
+def parse_fences(text: str) -> Tuple[bool, List[Piece]]:
+    """
+    Liest alle Code-Blöcke eines vollständigen Textes.
+
+    Returns:
+        Tuple[bool, List[Piece]]: Ob ein Fence vorkam, und die Blöcke in Reihenfolge.
+    """
+    parser = FenceStreamParser()
+    pieces = parser.feed(text)
+    pieces += parser.close()
+    return parser.found, pieces
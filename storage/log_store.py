@@ -0,0 +1,271 @@
+"""
+Dieses Modul stellt einen append-only Log-Speicher für LLM-Aufrufe bereit.
+
+Statt einer JSON-Datei pro Aufruf werden alle Datensätze eines Verzeichnisses
+zeilenweise (JSON Lines) in `responses.jsonl` bzw. – mit Kompression –
+`responses.jsonl.gz` angehängt.
+
+  - Schreiben ist gepuffert: `append` legt den Datensatz nur in einen Puffer;
+    ein Hintergrund-Thread schreibt ihn gesammelt mit einem einzigen `write`
+    pro Batch (Größe `batch_size` oder spätestens nach `flush_interval` Sekunden).
+  - Jeder Datensatz erhält eine eindeutige, monoton steigende ID
+    (`<Nanosekunden>-<PID>`), sodass auch gleichzeitige Aufrufe nichts verlieren.
+  - `query` liefert Datensätze nach Zeitraum und Ticket; für unkomprimierte
+    Logs wird dafür ein In-Memory-Index mit Datei-Offsets inkrementell gepflegt.
+"""
+
+import atexit
+import bisect
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core import metrics
+from storage import tree_index
+
+# Standardwerte für neue Stores, über `configure()` anpassbar
+_defaults: Dict[str, Any] = {
+    "compress": False,
+    "batch_size": 100,
+    "flush_interval": 1.0,
+}
+
+TimeBound = Union[None, float, datetime]
+
+
+def _epoch(value: TimeBound) -> Optional[float]:
+    """Wandelt eine Zeitangabe (Epoch-Sekunden oder datetime) in Epoch-Sekunden um."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+
+class LogStore:
+    """
+    Append-only JSON-Lines-Log eines Verzeichnisses.
+
+    Attributes:
+        path (Path): Die Log-Datei.
+        compress (bool): Ob Batches als gzip-Member angehängt werden.
+        batch_size (int): Anzahl gepufferter Datensätze, ab der sofort geschrieben wird.
+        flush_interval (float): Maximale Verweildauer eines Datensatzes im Puffer in Sekunden.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compress: bool = False,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path = Path(directory) / ("responses.jsonl.gz" if compress else "responses.jsonl")
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._last_ns = 0
+        # Index für unkomprimierte Logs: sortiert nach (created, id) -> Byte-Offset der Zeile
+        self._index: List[Tuple[float, str, Optional[str], int]] = []
+        self._indexed_bytes = 0
+        self._flusher = threading.Thread(target=self._flush_loop, name="log-store", daemon=True)
+        self._flusher.start()
+
+    def _next_id(self) -> str:
+        """Erzeugt eine prozessweit monoton steigende, prozessübergreifend eindeutige ID."""
+        ns = max(time.time_ns(), self._last_ns + 1)
+        self._last_ns = ns
+        return f"{ns:020d}-{os.getpid()}"
+
+    def append(
+        self, user_input: Union[str, dict], response: Union[str, dict], ticket: Optional[str] = None
+    ) -> str:
+        """
+        Reiht einen Datensatz zum Schreiben ein.
+
+        Args:
+            user_input (Union[str, dict]): Der an die LLM gesendete Text oder eine
+                Blob-Referenz (`storage.blob_store`).
+            response (Union[str, dict]): Die zurückgegebene LLM-Antwort bzw. ihre Referenz.
+            ticket (Optional[str]): Zugehöriges Ticket (Dateipfad), falls vorhanden.
+
+        Returns:
+            str: Die ID des Datensatzes.
+        """
+        with self._lock:
+            record_id = self._next_id()
+            created = int(record_id[:20]) / 1e9
+            self._buffer.append({
+                "id": record_id,
+                "created": created,
+                "timestamp": datetime.fromtimestamp(created).strftime("%Y%m%d_%H%M%S_%f"),
+                "ticket": ticket,
+                "input": user_input,
+                "response": response,
+            })
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return record_id
+
+    def flush(self) -> None:
+        """Schreibt alle gepufferten Datensätze als einen Batch an das Ende der Datei."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+            if self.compress:
+                data = gzip.compress(data)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # O_APPEND: ein write pro Batch, auch bei mehreren Prozessen ohne Überschreiben
+            with metrics.timer("storage.log_flush"):
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+            metrics.record_write("storage.log_flush", data)
+        tree_index.invalidate(str(self.path))
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """Schreibt verbleibende Datensätze und beendet den Hintergrund-Thread."""
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+
+    def _refresh_index(self) -> None:
+        """Liest neu angehängte Zeilen (auch anderer Prozesse) in den Index ein."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._indexed_bytes)
+                offset = self._indexed_bytes
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # unvollständiger Batch eines anderen Prozesses
+                    try:
+                        r = json.loads(line)
+                        bisect.insort(self._index, (r["created"], r["id"], r.get("ticket"), offset))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    offset += len(line)
+                self._indexed_bytes = offset
+        except OSError:
+            pass
+
+    def query(
+        self,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        ticket: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Liefert Datensätze in zeitlicher Reihenfolge.
+
+        Gepufferte Datensätze werden vorher geschrieben. Unkomprimierte Logs werden
+        über den Offset-Index gelesen, komprimierte vollständig durchsucht.
+
+        Args:
+            start (TimeBound): Untere Zeitgrenze (inklusive), Epoch-Sekunden oder datetime.
+            end (TimeBound): Obere Zeitgrenze (exklusive).
+            ticket (Optional[str]): Nur Datensätze dieses Tickets.
+            limit (Optional[int]): Maximale Anzahl Datensätze.
+
+        Returns:
+            List[dict]: Die passenden Datensätze.
+        """
+        self.flush()
+        lo, hi = _epoch(start), _epoch(end)
+
+        if self.compress:
+            try:
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    records = [json.loads(line) for line in f if line.strip()]
+            except OSError:
+                return []
+            records.sort(key=lambda r: (r["created"], r["id"]))
+            hits = [
+                r for r in records
+                if (lo is None or r["created"] >= lo) and (hi is None or r["created"] < hi)
+                and (ticket is None or r.get("ticket") == ticket)
+            ]
+            return hits[:limit] if limit is not None else hits
+
+        with self._write_lock:
+            self._refresh_index()
+            first = 0 if lo is None else bisect.bisect_left(self._index, (lo,))
+            last = len(self._index) if hi is None else bisect.bisect_left(self._index, (hi,))
+            offsets = [
+                entry[3] for entry in self._index[first:last]
+                if ticket is None or entry[2] == ticket
+            ]
+        if limit is not None:
+            offsets = offsets[:limit]
+        records = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                records.append(json.loads(f.readline()))
+        return records
+
+
+_stores: Dict[Path, LogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def configure(**options: Any) -> None:
+    """
+    Setzt die Standardoptionen für neu angelegte Stores (compress, batch_size, flush_interval).
+
+    Raises:
+        ValueError: Wenn eine unbekannte Option übergeben wird.
+    """
+    unknown = set(options) - set(_defaults)
+    if unknown:
+        raise ValueError(f"Unbekannte Option(en): {', '.join(sorted(unknown))}")
+    _defaults.update(options)
+
+
+def get_store(directory: str) -> LogStore:
+    """Gibt den prozessweit geteilten Store eines Log-Verzeichnisses zurück."""
+    key = Path(directory).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and store.compress != _defaults["compress"]:
+            store.close()
+            store = None
+        if store is None:
+            store = _stores[key] = LogStore(str(key), **_defaults)
+        return store
+
+
+@atexit.register
+def flush_all() -> None:
+    """Schreibt die Puffer aller Stores; wird auch beim Beenden des Prozesses aufgerufen."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        try:
+            store.flush()
+        except OSError:
+            pass
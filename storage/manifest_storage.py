@@ -0,0 +1,125 @@
+"""
+Dieses Modul verwaltet das Build-Manifest eines Projekts unter
+`<project_folder>/tickets/manifest.json`.
+
+Für jede generierte Datei wird ein Fingerabdruck der Prompt-Eingaben des Tickets
+sowie ein Hash der erzeugten Datei unter `src/` abgelegt. Bei einer erneuten
+Generierung im Modus "regenerate" können so Tickets übersprungen werden, deren
+Eingaben unverändert sind und deren Ausgabedatei nicht angefasst wurde.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from core import metrics
+from storage import backends
+
+MANIFEST_VERSION = 1
+
+
+MANIFEST_PATH = "tickets/manifest.json"
+
+
+def ticket_fingerprint(ticket: dict, model: str, dependencies: Optional[Dict[str, str]] = None) -> str:
+    """
+    Berechnet einen Fingerabdruck über alle Eingaben, die in den Code-Prompt einfließen.
+
+    Args:
+        ticket (dict): Das Ticket (title, beschreibung, anforderungen, file_path).
+        model (str): Der verwendete Modellname.
+        dependencies (Optional[Dict[str, str]]): Code der Abhängigkeiten (Dateipfad -> Code).
+
+    Returns:
+        str: Hex-kodierter SHA-256-Hash.
+    """
+    inputs = {
+        "title": ticket.get("title"),
+        "beschreibung": ticket.get("beschreibung"),
+        "anforderungen": ticket.get("anforderungen"),
+        "file_path": ticket.get("file_path"),
+        "model": model or "",
+        "dependencies": {
+            path: hashlib.sha256(code.encode("utf-8")).hexdigest()
+            for path, code in (dependencies or {}).items()
+        },
+    }
+    raw = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """Liefert den SHA-256-Hash einer Datei oder None, wenn sie nicht lesbar ist."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _src_hash(project_folder: str, file_path: str) -> Optional[str]:
+    """Wie `file_hash` für `src/<file_path>`, gelesen über das Storage-Backend."""
+    try:
+        data = backends.get_backend().read_bytes(project_folder, f"src/{file_path}")
+    except (OSError, ValueError):
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest(project_folder: str) -> dict:
+    """
+    Lädt das Manifest eines Projekts.
+
+    Fehlt die Datei oder ist sie unlesbar bzw. aus einer anderen Version, wird
+    ein leeres Manifest geliefert – dann werden einfach alle Tickets neu erzeugt.
+
+    Returns:
+        dict: Manifest mit den Schlüsseln `version` und `tickets`.
+    """
+    try:
+        manifest = json.loads(backends.get_backend().read_text(project_folder, MANIFEST_PATH))
+    except (OSError, ValueError):
+        manifest = None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "tickets": {}}
+    manifest.setdefault("tickets", {})
+    return manifest
+
+
+@metrics.timed("storage.save_manifest")
+def save_manifest(project_folder: str, manifest: dict) -> str:
+    """
+    Speichert das Manifest unter `<project_folder>/tickets/manifest.json`.
+
+    Returns:
+        str: Der Pfad zur gespeicherten Datei als String.
+    """
+    data = json.dumps(manifest, ensure_ascii=False, indent=2)
+    saved = backends.get_backend().write_text(project_folder, MANIFEST_PATH, data)
+    metrics.record_write("storage.save_manifest", data)
+    return saved
+
+
+def is_up_to_date(manifest: dict, project_folder: str, ticket: dict, fingerprint: str) -> bool:
+    """
+    Prüft, ob ein Ticket übersprungen werden kann.
+
+    Das ist der Fall, wenn der Fingerabdruck mit dem Manifest übereinstimmt und die
+    Datei unter `src/` noch genau dem zuletzt generierten Stand entspricht.
+    """
+    entry = manifest["tickets"].get(ticket.get("file_path"))
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    current = _src_hash(project_folder, ticket["file_path"])
+    return current is not None and current == entry.get("src_hash")
+
+
+def record_ticket(manifest: dict, project_folder: str, ticket: dict, fingerprint: str) -> None:
+    """Vermerkt Fingerabdruck und Datei-Hash eines frisch generierten Tickets im Manifest."""
+    file_path = ticket["file_path"]
+    manifest["tickets"][file_path] = {
+        "fingerprint": fingerprint,
+        "src_hash": _src_hash(project_folder, file_path),
+        "updated": datetime.now().strftime("%Y%m%d_%H%M%S"),
+    }
@@ -0,0 +1,172 @@
+"""
+Dieses Modul wendet Änderungen aus einer LLM-Antwort auf eine bestehende Datei an.
+
+Unterstützt werden zwei Formate:
+  - Suchen/Ersetzen-Blöcke
+
+        <<<<<<< SEARCH
+        alte Zeilen
+        =======
+        neue Zeilen
+        >>>>>>> REPLACE
+
+  - Unified Diffs mit `@@ -a,b +c,d @@`-Hunks.
+
+Jede Änderung muss eindeutig zu einer Stelle der Datei passen (bei Diffs wird
+die Zeilenangabe des Hunks zur Auflösung mehrdeutiger Stellen genutzt).
+Passt eine Änderung nicht, wird `PatchError` geworfen und die Datei bleibt
+unverändert; der Aufrufer kann dann auf eine vollständige Neugenerierung
+ausweichen.
+"""
+
+import ast
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+_SEARCH_REPLACE = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$",
+    re.MULTILINE | re.DOTALL,
+)
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# (Suchtext, Ersetzung, Zeilenhinweis oder None)
+Edit = Tuple[str, str, Optional[int]]
+
+
+class PatchError(ValueError):
+    """Wird geworfen, wenn eine Änderung nicht eindeutig angewendet werden kann."""
+
+
+def _strip_newline(text: str) -> str:
+    return text[:-1] if text.endswith("\n") else text
+
+
+def parse_search_replace(text: str) -> List[Edit]:
+    """Liest alle Suchen/Ersetzen-Blöcke einer Antwort."""
+    return [
+        (_strip_newline(search), _strip_newline(replace), None)
+        for search, replace in _SEARCH_REPLACE.findall(text)
+    ]
+
+
+def parse_unified_diff(text: str) -> List[Edit]:
+    """
+    Liest die Hunks eines Unified Diffs als Suchen/Ersetzen-Paare.
+
+    Dateiköpfe (`---`/`+++`) und Markdown-Fences werden übersprungen; ein Hunk
+    endet an der ersten Zeile, die weder Kontext noch Änderung ist.
+    """
+    edits: List[Edit] = []
+    lines = text.split("\n")
+    current = None
+    for i, line in enumerate(lines):
+        match = _HUNK.match(line)
+        if match:
+            current = (int(match.group(1)), [], [])
+            edits.append(current)
+            continue
+        if current is None:
+            continue
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            current = None
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith(" ") or line == "":
+            current[1].append(line[1:])
+            current[2].append(line[1:])
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        else:
+            current = None
+    result = []
+    for start, old, new in edits:
+        # Leerzeilen am Hunk-Ende stammen meist vom Zeilenumbruch vor dem Fence
+        while old and new and old[-1] == "" and new[-1] == "":
+            old.pop()
+            new.pop()
+        result.append(("\n".join(old), "\n".join(new), start))
+    return result
+
+
+def _line_count(text: str) -> int:
+    return len(text.split("\n")) if text else 0
+
+
+def _find(lines: List[str], search: List[str]) -> List[int]:
+    n = len(search)
+    matches = [i for i in range(len(lines) - n + 1) if lines[i:i + n] == search]
+    if matches:
+        return matches
+    # Zweiter Versuch ohne abschließende Leerzeichen
+    search = [s.rstrip() for s in search]
+    stripped = [l.rstrip() for l in lines]
+    return [i for i in range(len(stripped) - n + 1) if stripped[i:i + n] == search]
+
+
+def _apply_edit(text: str, search: str, replace: str, hint: Optional[int]) -> str:
+    lines = text.split("\n")
+    if not search:
+        if hint is None:
+            if text.strip():
+                raise PatchError("Leerer SEARCH-Block in einer nicht leeren Datei.")
+            return replace
+        # Reines Einfügen eines Diff-Hunks hinter Zeile `hint`
+        at = min(max(hint, 0), len(lines))
+        return "\n".join(lines[:at] + replace.split("\n") + lines[at:])
+    search_lines = search.split("\n")
+    matches = _find(lines, search_lines)
+    if not matches:
+        raise PatchError(f"Stelle nicht gefunden:\n{search}")
+    if len(matches) > 1:
+        if hint is None:
+            raise PatchError(f"Stelle ist nicht eindeutig ({len(matches)} Treffer):\n{search}")
+        matches.sort(key=lambda i: abs(i + 1 - hint))
+    i = matches[0]
+    return "\n".join(lines[:i] + replace.split("\n") + lines[i + len(search_lines):])
+
+
+def apply_patch(original: str, patch_text: str, file_path: str = "") -> str:
+    """
+    Wendet Suchen/Ersetzen-Blöcke oder einen Unified Diff auf einen Text an.
+
+    Args:
+        original (str): Der bisherige Dateiinhalt.
+        patch_text (str): Die LLM-Antwort mit den Änderungen.
+        file_path (str): Dateipfad; für `.py`-Dateien wird das Ergebnis auf
+            Syntaxfehler geprüft.
+
+    Returns:
+        str: Der neue Dateiinhalt.
+
+    Raises:
+        PatchError: Wenn keine Änderungen gefunden werden, eine Änderung nicht
+            eindeutig passt oder der gepatchte Python-Code nicht parsebar ist.
+    """
+    original = original.replace("\r\n", "\n")
+    patch_text = patch_text.replace("\r\n", "\n")
+    edits = parse_search_replace(patch_text) or parse_unified_diff(patch_text)
+    if not edits:
+        raise PatchError("Keine Suchen/Ersetzen-Blöcke oder Diff-Hunks in der Antwort.")
+
+    text, offset = original, 0
+    for search, replace, hint in edits:
+        if hint is None:
+            text = _apply_edit(text, search, replace, None)
+            continue
+        # Zeilenangaben späterer Hunks um die bisherigen Änderungen verschieben
+        text = _apply_edit(text, search, replace, hint + offset)
+        offset += _line_count(replace) - _line_count(search)
+
+    if Path(file_path).suffix.lower() == ".py":
+        try:
+            ast.parse(original)
+        except SyntaxError:
+            return text  # War schon vorher ungültig; nicht dem Patch anlasten
+        try:
+            ast.parse(text)
+        except SyntaxError as e:
+            raise PatchError(f"Gepatchter Code ist syntaktisch ungültig: {e}") from e
+    return text
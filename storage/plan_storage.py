@@ -3,9 +3,11 @@ Dieses Modul bietet eine Funktion zum Speichern des Projektplans als Textdatei
 unter `<project_folder>/docs/plan.txt`.
 """
 
-from pathlib import Path
+from core import metrics
+from storage import backends
 
 
+@metrics.timed("storage.save_plan")
 def save_plan(project_folder: str, plan_text: str) -> str:
     """
     Speichert den Projektplan in einer Textdatei in `docs/plan.txt`.
@@ -17,7 +19,6 @@ def save_plan(project_folder: str, plan_text: str) -> str:
     Returns:
         str: Der Pfad zur erzeugten Plan-Datei als String.
     """
-    p = Path(project_folder) / "docs" / "plan.txt"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(plan_text, encoding="utf-8")
-    return str(p)
+    saved = backends.get_backend().write_text(project_folder, "docs/plan.txt", plan_text)
+    metrics.record_write("storage.save_plan", plan_text)
+    return saved
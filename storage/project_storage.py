@@ -8,6 +8,8 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+from storage import backends
+
 
 def _slugify(name: str) -> str:
     """
@@ -67,22 +69,21 @@ def create_project_structure(project_name: str, base_path: str = None) -> str:
     slug = _slugify(project_name)
     project_folder = root / f"{slug}_{timestamp}"
 
-    # Ordnerstruktur anlegen
-    for sub in ["docs", "src", "tests", "tickets", "logs"]:
-        (project_folder / sub).mkdir(parents=True, exist_ok=True)
+    backend = backends.get_backend()
+
+    # Ordnerstruktur anlegen (nur im Dateisystem-Backend als echte Verzeichnisse)
+    backend.make_dirs(str(project_folder), ["docs", "src", "tests", "tickets", "logs"])
 
     # README.md anlegen
-    readme = project_folder / "README.md"
-    readme.write_text(
-        f"# {project_name}\n\nErstellt am {timestamp}\n",
-        encoding="utf-8"
+    backend.write_text(
+        str(project_folder), "README.md",
+        f"# {project_name}\n\nErstellt am {timestamp}\n"
     )
 
     # pytest.ini anlegen
-    pytest_ini = project_folder / "pytest.ini"
-    pytest_ini.write_text(
-        "[pytest]\nminversion = 6.0\n",
-        encoding="utf-8"
+    backend.write_text(
+        str(project_folder), "pytest.ini",
+        "[pytest]\nminversion = 6.0\n"
     )
 
     return str(project_folder)
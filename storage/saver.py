@@ -1,43 +1,71 @@
 """
 Dieses Modul speichert alle Roh-Antworten (Inputs und Outputs) der LLM-Aufrufe
-mit Timestamp in JSON-Dateien unter `logs/` oder einem Fallback-Verzeichnis.
+mit Timestamp im append-only Log (`storage.log_store`) unter `logs/` oder
+einem Fallback-Verzeichnis.
 """
 
-import json
 import os
-from datetime import datetime
+import zlib
 from pathlib import Path
+from typing import Optional
 
+from storage import blob_store, log_store
 
-def save_response(project_folder: str, user_input: str, response: str) -> str:
+
+def _log_dir(project_folder: str) -> Path:
+    """Ermittelt das Log-Verzeichnis; ohne Projektordner `./antworten/`."""
+    if not project_folder or not project_folder.strip():
+        return Path(os.getcwd()) / "antworten"
+    return Path(project_folder) / "logs"
+
+
+def save_response(
+    project_folder: str, user_input: str, response: str, ticket: Optional[str] = None
+) -> str:
     """
     Speichert einen Datensatz mit Timestamp, dem Eingabetext und der LLM-Antwort.
 
-    Die Datei wird abgelegt unter:
-      `<project_folder>/logs/response_<YYYYMMDD_HHMMSS>.json`
-    Falls `project_folder` leer oder ungültig ist, in `./antworten/`.
+    Der Datensatz wird an `<project_folder>/logs/responses.jsonl` angehängt
+    (gepuffert, siehe `storage.log_store`). Falls `project_folder` leer oder
+    ungültig ist, in `./antworten/`. Längere Eingaben und Antworten werden nur
+    als Referenz auf den Blob-Speicher (`logs/blobs/`, siehe `storage.blob_store`)
+    abgelegt, sodass wiederholte Prompts nur einmal gespeichert werden.
 
     Args:
         project_folder (str): Wurzelverzeichnis des Projekts oder leer.
         user_input (str): Der an die LLM gesendete Text.
         response (str): Die zurückgegebene LLM-Antwort.
+        ticket (Optional[str]): Dateipfad des zugehörigen Tickets für spätere Abfragen.
 
     Returns:
-        str: Der Pfad zur gespeicherten JSON-Datei als String.
+        str: Die eindeutige ID des Datensatzes.
     """
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    payload = {
-        "timestamp": ts,
-        "input": user_input,
-        "response": response
-    }
+    directory = _log_dir(project_folder)
+    blobs = blob_store.get_store(str(directory / "blobs"))
+    return log_store.get_store(str(directory)).append(
+        blobs.ref(user_input), blobs.ref(response), ticket
+    )
 
-    if not project_folder or not project_folder.strip():
-        base_dir = Path(os.getcwd()) / "antworten"
-    else:
-        base_dir = Path(project_folder) / "logs"
-
-    base_dir.mkdir(parents=True, exist_ok=True)
-    file_path = base_dir / f"response_{ts}.json"
-    file_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    return str(file_path)
+
+def query_responses(project_folder: str, **filters) -> list:
+    """
+    Liest gespeicherte Datensätze eines Projekts.
+
+    Args:
+        project_folder (str): Wurzelverzeichnis des Projekts oder leer.
+        **filters: start, end, ticket und limit wie bei `LogStore.query`.
+
+    Returns:
+        list: Die passenden Datensätze in zeitlicher Reihenfolge; Blob-Referenzen
+              sind wieder durch den vollständigen Text ersetzt.
+    """
+    directory = _log_dir(project_folder)
+    blobs = blob_store.get_store(str(directory / "blobs"))
+    records = log_store.get_store(str(directory)).query(**filters)
+    for record in records:
+        for field in ("input", "response"):
+            try:
+                record[field] = blobs.resolve(record.get(field))
+            except (OSError, ValueError, zlib.error):
+                pass  # Blob fehlt oder ist beschädigt: Referenz bleibt stehen
+    return records
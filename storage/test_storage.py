@@ -5,7 +5,11 @@ im `tests/`-Ordner des Projekts.
 
 from pathlib import Path
 
+from core import metrics
+from storage import blob_store
 
+
+@metrics.timed("storage.save_tests")
 def save_tests(project_folder: str, file_path: str, tests_md: str) -> str:
     """
     Speichert Testcode (z. B. aus Markdown-Fences) als Datei `test_<modulname>.py`
@@ -20,7 +24,7 @@ def save_tests(project_folder: str, file_path: str, tests_md: str) -> str:
         str: Der Pfad zur erzeugten Testdatei als String.
     """
     name = Path(file_path).stem
-    p = Path(project_folder) / "tests" / f"test_{name}.py"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(tests_md, encoding="utf-8")
-    return str(p)
+    saved, written = blob_store.write_artifact(project_folder, f"tests/test_{name}.py", tests_md)
+    if written:
+        metrics.record_write("storage.save_tests", tests_md)
+    return saved
@@ -4,9 +4,12 @@ unter `<project_folder>/tickets/tickets.json`.
 """
 
 import json
-from pathlib import Path
 
+from core import metrics
+from storage import backends
 
+
+@metrics.timed("storage.save_tickets")
 def save_tickets(project_folder: str, tickets: list) -> str:
     """
     Speichert eine Liste von Ticket-Dictionaries im JSON-Format.
@@ -19,7 +22,7 @@ def save_tickets(project_folder: str, tickets: list) -> str:
     Returns:
         str: Der Pfad zur gespeicherten `tickets.json`-Datei als String.
     """
-    p = Path(project_folder) / "tickets" / "tickets.json"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(tickets, ensure_ascii=False, indent=2), encoding="utf-8")
-    return str(p)
+    data = json.dumps(tickets, ensure_ascii=False, indent=2)
+    saved = backends.get_backend().write_text(project_folder, "tickets/tickets.json", data)
+    metrics.record_write("storage.save_tickets", data)
+    return saved
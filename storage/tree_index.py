@@ -0,0 +1,169 @@
+"""
+Dieses Modul hält einen gecachten Verzeichnisindex pro Projektordner für die
+Route `/structure` vor.
+
+Statt bei jedem Aufruf den gesamten Baum per `os.walk` einzulesen, wird pro
+Verzeichnis die Liste der Unterordner und Dateien gemerkt. Ein Eintrag gilt als
+gültig, solange sich die Änderungszeit des Verzeichnisses nicht geändert hat und
+kein Storage-Writer (`save_code`, `save_tests`, `save_tickets`, `save_plan`,
+`save_response`) ihn über `invalidate()` verworfen hat.
+
+Neben dem vollständigen Baum unterstützt der Index das Auflisten einzelner
+Verzeichnisse mit Pagination, sodass große Ordner wie `logs/` nicht komplett
+serialisiert werden müssen.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# (Änderungszeit in ns, sortierte Unterordner, sortierte Dateien)
+_Listing = Tuple[int, List[str], List[str]]
+
+
+class TreeIndex:
+    """
+    Gecachter Verzeichnisindex für einen Projektordner.
+
+    Attributes:
+        root (Path): Der absolute Projektordner.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self._listings: Dict[str, _Listing] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, rel_dir: str) -> Path:
+        """
+        Wandelt einen relativen Verzeichnispfad in einen absoluten Pfad um.
+
+        Raises:
+            ValueError: Wenn der Pfad aus dem Projektordner herausführt.
+        """
+        path = (self.root / rel_dir).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ValueError(f"Pfad außerhalb des Projektordners: {rel_dir}")
+        return path
+
+    def _listing(self, rel_dir: str) -> Optional[_Listing]:
+        """Liefert die (ggf. neu eingelesene) Auflistung eines Verzeichnisses oder None."""
+        path = self._resolve(rel_dir)
+        key = path.relative_to(self.root).as_posix()
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(key, None)
+            return None
+        with self._lock:
+            cached = self._listings.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached
+
+        dirs, files = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    (dirs if entry.is_dir() else files).append(entry.name)
+        except OSError:
+            return None
+        listing = (mtime, sorted(dirs), sorted(files))
+        with self._lock:
+            self._listings[key] = listing
+        return listing
+
+    def invalidate(self, rel_dir: str = "") -> None:
+        """
+        Verwirft gecachte Auflistungen eines Verzeichnisses und aller Elternverzeichnisse.
+
+        Args:
+            rel_dir (str): Verzeichnis relativ zum Projektordner; leer = gesamter Index.
+        """
+        with self._lock:
+            if not rel_dir or rel_dir == ".":
+                self._listings.clear()
+                return
+            parts = Path(rel_dir).parts
+            for i in range(len(parts) + 1):
+                self._listings.pop(Path(*parts[:i]).as_posix() if i else ".", None)
+
+    def tree(self, rel_dir: str = "") -> dict:
+        """
+        Baut den verschachtelten Baum ab `rel_dir` (Ordner -> dict, Datei -> None).
+
+        Returns:
+            dict: Der Baum im Format der bisherigen `/structure`-Antwort.
+        """
+        listing = self._listing(rel_dir)
+        if listing is None:
+            return {}
+        _, dirs, files = listing
+        node = {d: self.tree(os.path.join(rel_dir, d)) for d in dirs}
+        node.update(dict.fromkeys(files))
+        return node
+
+    def list_dir(self, rel_dir: str = "", offset: int = 0, limit: Optional[int] = None) -> dict:
+        """
+        Listet ein einzelnes Verzeichnis für die schrittweise Expansion im Explorer.
+
+        Unterordner werden immer vollständig geliefert, Dateien seitenweise.
+
+        Args:
+            rel_dir (str): Verzeichnis relativ zum Projektordner.
+            offset (int): Index der ersten gelieferten Datei.
+            limit (Optional[int]): Maximale Anzahl Dateien; None = alle.
+
+        Returns:
+            dict: path, dirs, files, total_files, offset und next_offset (None am Ende).
+
+        Raises:
+            ValueError: Bei Pfaden außerhalb des Projekts.
+            FileNotFoundError: Wenn das Verzeichnis nicht existiert.
+        """
+        listing = self._listing(rel_dir)
+        if listing is None:
+            raise FileNotFoundError(f"Verzeichnis nicht gefunden: {rel_dir}")
+        _, dirs, files = listing
+        end = len(files) if limit is None else offset + limit
+        return {
+            "path": rel_dir,
+            "dirs": dirs,
+            "files": files[offset:end],
+            "total_files": len(files),
+            "offset": offset,
+            "next_offset": end if end < len(files) else None,
+        }
+
+
+_indexes: Dict[Path, TreeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(project_folder: str) -> TreeIndex:
+    """Gibt den (prozessweit geteilten) Index eines Projektordners zurück."""
+    root = Path(project_folder).resolve()
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = TreeIndex(str(root))
+        return index
+
+
+def invalidate(path: str) -> None:
+    """
+    Meldet eine geschriebene Datei, damit die Indizes betroffener Projekte sie anzeigen.
+
+    Wird von den Storage-Writern nach jedem Schreibvorgang aufgerufen; die
+    Änderungszeit allein ist auf Dateisystemen mit grober Auflösung nicht verlässlich.
+
+    Args:
+        path (str): Pfad der geschriebenen Datei.
+    """
+    target = Path(path).resolve()
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if index.root in target.parents:
+            index.invalidate(target.parent.relative_to(index.root).as_posix())
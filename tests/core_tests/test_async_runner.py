@@ -0,0 +1,35 @@
+import asyncio
+import contextvars
+import pytest
+from core import async_runner
+
+var = contextvars.ContextVar("var", default="default")
+
+
+def test_run_returns_result_on_persistent_loop():
+    async def loop_of():
+        return asyncio.get_running_loop()
+
+    assert async_runner.run(loop_of()) is async_runner.run(loop_of())
+
+def test_run_propagates_context_and_exceptions():
+    async def read():
+        return var.get()
+
+    async def fail():
+        raise ValueError("kaputt")
+
+    token = var.set("request")
+    try:
+        assert async_runner.run(read()) == "request"
+    finally:
+        var.reset(token)
+    with pytest.raises(ValueError, match="kaputt"):
+        async_runner.run(fail())
+
+def test_shutdown_allows_restart():
+    async def one():
+        return 1
+
+    async_runner.shutdown()
+    assert async_runner.run(one()) == 1
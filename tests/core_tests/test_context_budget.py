@@ -0,0 +1,106 @@
+import pytest
+from core import context_budget
+from core.context_budget import estimate_tokens, fit_dependencies, fit_plan, signatures
+
+
+@pytest.fixture(autouse=True)
+def no_budget():
+    context_budget.configure(plan_tokens=None, dependency_tokens=None, model_budgets={})
+    yield
+    context_budget.configure(plan_tokens=None, dependency_tokens=None, model_budgets={})
+
+
+PLAN = (
+    "# Projekt Shop\n"
+    "Ein kleiner Webshop.\n"
+    "## 1. Datenbank\n"
+    "Tabellen für User und Produkte in models.py anlegen.\n"
+    "## 2. API\n" + "REST-Endpunkte für Bestellungen. " * 30 + "\n"
+    "## 3. Frontend\n" + "Templates und Styles. " * 30 + "\n"
+)
+
+
+def test_estimate_depends_on_model_and_counts_long_words():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a b c") == 3
+    assert estimate_tokens("Donaudampfschifffahrt", "gpt-4") == 6
+    assert estimate_tokens("x" * 40, "gpt-4") < estimate_tokens("x" * 40, "unbekannt")
+
+
+def test_fit_plan_keeps_relevant_sections_and_marks_omissions():
+    fitted = fit_plan(PLAN, 60, "gpt-4", query="models.py User Datenbank")
+    assert fitted.text.startswith("# Projekt Shop\nEin kleiner Webshop.")
+    assert "Tabellen für User und Produkte in models.py anlegen." in fitted.text
+    assert "## 2. API […]" in fitted.text
+    assert "Bestellungen" not in fitted.text
+    assert fitted.tokens <= 60
+    assert fitted.saved == fitted.original_tokens - fitted.tokens > 0
+
+
+def test_fit_plan_without_budget_is_unchanged():
+    fitted = fit_plan(PLAN, None)
+    assert fitted.text == PLAN and fitted.saved == 0
+
+
+def test_python_signatures_drop_bodies():
+    code = (
+        "import os\n\n"
+        "class User:\n"
+        '    """Ein User.\n\n    Details."""\n'
+        "    def name(self, upper=False):\n"
+        "        return 'x'\n\n"
+        "def helper(a,\n"
+        "           b):\n"
+        "    return a + b\n"
+    )
+    assert signatures(code, "app/models.py") == (
+        "import os\n"
+        "class User:\n"
+        '    """Ein User."""\n'
+        "    def name(self, upper=False):\n"
+        "        ...\n"
+        "def helper(a,\n"
+        "           b):\n"
+        "    ..."
+    )
+
+
+def test_java_signatures_drop_bodies():
+    code = (
+        "package shop;\n"
+        "public class Cart {\n"
+        "    private int size;\n"
+        "    public Cart(int size) {\n"
+        "        this.size = size;\n"
+        "    }\n"
+        "    public int total() { return size; }\n"
+        "}\n"
+    )
+    assert signatures(code, "Cart.java") == (
+        "package shop;\n"
+        "public class Cart {\n"
+        "    public Cart(int size) { … }\n"
+        "    public int total() { … }"
+    )
+
+
+def test_fit_dependencies_prefers_full_code_of_relevant_files():
+    deps = {
+        "shop/models.py": "class User:\n    def name(self):\n        return 'u'\n",
+        "shop/util.py": "def pad(text):\n" + "    text = text + ' '\n" * 40 + "    return text\n",
+    }
+    fitted, saved = fit_dependencies(deps, 60, "gpt-4", query="User models")
+    assert list(fitted) == ["shop/models.py", "shop/util.py"]
+    assert fitted["shop/models.py"] == deps["shop/models.py"]
+    assert fitted["shop/util.py"] == "def pad(text):\n    ..."
+    assert saved > 0
+
+    assert fit_dependencies(deps, None) == (deps, 0)
+
+
+def test_model_budgets_override_defaults():
+    context_budget.configure(plan_tokens=100, model_budgets={"llama": {"plan_tokens": 10}})
+    assert context_budget.budget("plan_tokens", "llama3:8b") == 10
+    assert context_budget.budget("plan_tokens", "gpt-4") == 100
+    with pytest.raises(ValueError):
+        context_budget.configure(foo=1)
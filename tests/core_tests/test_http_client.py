@@ -0,0 +1,119 @@
+import pytest
+from core import http_client
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    defaults = http_client.get_config()
+    yield
+    http_client.configure(**defaults)
+
+
+def test_get_session_reuses_session_per_url():
+    s1 = http_client.get_session("https://a.example.com/mcp")
+    s2 = http_client.get_session("https://a.example.com/mcp")
+    s3 = http_client.get_session("https://b.example.com/mcp")
+    assert s1 is s2
+    assert s1 is not s3
+
+def test_session_uses_configured_pool_and_retries():
+    http_client.configure(pool_size=7, retries=2)
+    adapter = http_client.get_session("https://c.example.com").get_adapter("https://c.example.com")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.total == 2
+    assert 503 in adapter.max_retries.status_forcelist
+    # Lese-Fehler werden nicht wiederholt
+    assert adapter.max_retries.read == 0
+
+def test_post_status_retries_are_opt_in():
+    url = "https://g.example.com"
+    plain = http_client.get_session(url).get_adapter(url).max_retries
+    opted = http_client.get_session(url, retry_status=True).get_adapter(url).max_retries
+    # Ohne Opt-in wird POST nur bei Verbindungsfehlern wiederholt
+    assert not plain.is_retry("POST", 503)
+    assert plain.is_retry("GET", 503)
+    assert opted.is_retry("POST", 503)
+
+def test_configure_resets_sessions():
+    s1 = http_client.get_session("https://d.example.com")
+    http_client.configure(read_timeout=10.0)
+    assert http_client.get_session("https://d.example.com") is not s1
+
+def test_configure_rejects_unknown_option():
+    with pytest.raises(ValueError):
+        http_client.configure(foo=1)
+
+def test_post_applies_default_timeout(monkeypatch):
+    http_client.configure(connect_timeout=1.5, read_timeout=30.0)
+    session = http_client.get_session("https://e.example.com")
+    captured = {}
+
+    def fake_post(url, **kwargs):
+        captured.update(kwargs, url=url)
+        return "RESP"
+
+    monkeypatch.setattr(session, "post", fake_post)
+    assert http_client.post("https://e.example.com", json={"a": 1}) == "RESP"
+    assert captured["timeout"] == (1.5, 30.0)
+    assert captured["json"] == {"a": 1}
+
+def test_post_keeps_explicit_timeout(monkeypatch):
+    session = http_client.get_session("https://f.example.com")
+    captured = {}
+    monkeypatch.setattr(session, "post", lambda url, **kw: captured.update(kw))
+    http_client.post("https://f.example.com", timeout=3)
+    assert captured["timeout"] == 3
+
+def test_get_async_client_is_shared_per_loop_and_url():
+    import asyncio
+
+    async def run():
+        c1 = http_client.get_async_client("https://a.example.com")
+        c2 = http_client.get_async_client("https://a.example.com")
+        c3 = http_client.get_async_client("https://b.example.com")
+        same = (c1 is c2, c1 is c3)
+        await http_client.aclose_all()
+        return same, c1.is_closed
+
+    (shared, distinct), closed = asyncio.run(run())
+    assert shared is True
+    assert distinct is False
+    assert closed is True
+
+def test_get_async_client_requires_running_loop():
+    with pytest.raises(RuntimeError):
+        http_client.get_async_client("https://a.example.com")
+
+def test_configure_resets_async_clients():
+    import asyncio
+
+    async def run():
+        c1 = http_client.get_async_client("https://h.example.com")
+        http_client.configure(read_timeout=10.0)
+        c2 = http_client.get_async_client("https://h.example.com")
+        await c1.aclose()
+        await http_client.aclose_all()
+        return c1 is c2, c2.timeout.read
+
+    same, read_timeout = asyncio.run(run())
+    assert same is False
+    assert read_timeout == 10.0
+
+def test_async_post_retries_status_only_when_opted_in():
+    import asyncio
+    import httpx
+    http_client.configure(retries=2, backoff_factor=0)
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(503 if len(calls) < 3 else 200)
+
+    async def run(retry_status):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await http_client.async_post("https://i.example.com", retry_status, client)
+
+    assert asyncio.run(run(False)).status_code == 503
+    assert len(calls) == 1
+    assert asyncio.run(run(True)).status_code == 200
+    assert len(calls) == 3
@@ -0,0 +1,93 @@
+import json
+import logging
+import pytest
+from core import context_budget, metrics, response_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    metrics.configure(enabled=True, trace=False, trace_file=None)
+    yield
+    metrics.configure(enabled=True, trace=False, trace_file=None)
+    metrics.reset()
+
+
+def test_timer_records_histogram_gauge_and_errors():
+    with metrics.bind(route="plan"):
+        with metrics.timer("llm.http", model="m", api_url="http://x"):
+            pass
+        with pytest.raises(ValueError):
+            with metrics.timer("llm.http", model="m", api_url="http://x"):
+                raise ValueError("kaputt")
+
+    text = metrics.render()
+    labels = 'api_url="http://x",model="m",route="plan",stage="llm.http"'
+    assert f"projectcoder_stage_seconds_count{{{labels}}} 2" in text
+    assert f'projectcoder_stage_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"projectcoder_stage_errors_total{{{labels}}} 1" in text
+    assert f"projectcoder_stage_in_flight{{{labels}}} 0" in text
+    assert "# TYPE projectcoder_stage_seconds histogram" in text
+
+
+def test_label_values_are_escaped():
+    metrics.inc("llm_requests_total", model='a"b\\c')
+    assert 'model="a\\"b\\\\c"' in metrics.render()
+
+
+def test_disabled_records_nothing():
+    metrics.configure(enabled=False)
+    with metrics.timer("x"):
+        metrics.inc("llm_requests_total")
+    assert metrics.render() == "\n"
+
+
+def test_trace_file_gets_json_lines(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    metrics.configure(trace=True, trace_file=str(path))
+    with metrics.timer("storage.save_plan"):
+        pass
+    metrics.configure(trace=False, trace_file=None)
+    record = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    assert record["stage"] == "storage.save_plan"
+    assert record["error"] is None
+
+
+def test_unknown_option_is_rejected():
+    with pytest.raises(ValueError):
+        metrics.configure(foo=1)
+
+
+def test_llm_request_counts_bytes_tokens_and_cache_hits(monkeypatch):
+    from core.request_handler import send_llm_request
+
+    response_cache.configure()
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"result": {"content": [{"type": "text", "text": "antwort"}]}}
+
+    monkeypatch.setattr("core.http_client.post", lambda url, headers, json, **kw: Resp())
+    send_llm_request("http://mcp", "", "prompt", "m")
+    send_llm_request("http://mcp", "", "prompt", "m")
+    response_cache.configure()
+
+    text = metrics.render()
+    assert 'projectcoder_llm_requests_total{api_url="http://mcp",cache="miss",model="m"} 1' in text
+    assert 'projectcoder_llm_requests_total{api_url="http://mcp",cache="hit",model="m"} 1' in text
+    assert 'projectcoder_llm_prompt_bytes_total{api_url="http://mcp",model="m"} 6' in text
+    tokens = context_budget.estimate_tokens("antwort", "m")
+    assert f'projectcoder_llm_response_tokens_total{{api_url="http://mcp",model="m"}} {tokens}' in text
+    assert 'stage="llm.parse"' in text
+
+
+def test_storage_writes_are_counted(tmp_path):
+    from storage.code_storage import save_code
+
+    save_code(str(tmp_path), "a.py", "```python\nx = 1\n```")
+    text = metrics.render()
+    assert 'projectcoder_storage_bytes_written_total{stage="storage.save_code"} 6' in text
+    assert 'projectcoder_stage_seconds_count{stage="storage.extract_code"} 1' in text
@@ -0,0 +1,136 @@
+import json
+import pytest
+from core import providers, response_cache
+from core.request_handler import send_llm_request, stream_llm_request
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    response_cache.configure()
+    yield
+    response_cache.configure()
+    providers.configure(native=True)
+
+
+class FakeResponse:
+    def __init__(self, json_data=None, content_type="application/json", lines=()):
+        self._json = json_data
+        self.headers = {"Content-Type": content_type}
+        self._lines = list(lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._json
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self._lines)
+
+
+def capture_post(monkeypatch, response):
+    calls = {}
+
+    def fake_post(url, headers, json, **kwargs):
+        calls.update(url=url, headers=headers, json=json, **kwargs)
+        return response
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+    return calls
+
+
+@pytest.mark.parametrize("url, name", [
+    ("https://api.openai.com", "openai"),
+    ("https://generativelanguage.googleapis.com", "gemini"),
+    ("http://localhost:11434", "ollama"),
+    ("http://localhost:8000/mcp", "mcp"),
+    ("http://127.0.0.1:9000", "mcp"),
+])
+def test_get_backend_selects_native_api_or_mcp(url, name):
+    assert providers.get_backend(url).name == name
+
+
+def test_native_can_be_disabled():
+    providers.configure(native=False)
+    assert providers.get_backend("https://api.openai.com").name == "mcp"
+
+
+def test_openai_native_request(monkeypatch):
+    calls = capture_post(monkeypatch, FakeResponse(
+        {"choices": [{"message": {"content": "Hallo"}}]}))
+    assert send_llm_request("https://api.openai.com", "k", "Frage", "gpt-4o") == "Hallo"
+    assert calls["url"] == "https://api.openai.com/v1/chat/completions"
+    assert calls["headers"]["Authorization"] == "Bearer k"
+    assert calls["json"]["messages"] == [{"role": "user", "content": "Frage"}]
+    assert calls["json"]["model"] == "gpt-4o"
+
+
+def test_native_parse_error_raises(monkeypatch):
+    capture_post(monkeypatch, FakeResponse({"unexpected": True}))
+    with pytest.raises(ValueError, match="Unerwartete Antwort von openai"):
+        send_llm_request("https://api.openai.com", "k", "Frage", "gpt-4o")
+
+
+def test_openai_stream_reads_sse_deltas(monkeypatch):
+    events = [{"choices": [{"delta": {"content": "Hal"}}]},
+              {"choices": [{"delta": {"content": "lo"}}]}]
+    lines = [line for e in events for line in (f"data: {json.dumps(e)}", "")]
+    calls = capture_post(monkeypatch, FakeResponse(
+        content_type="text/event-stream", lines=lines + ["data: [DONE]", ""]))
+    assert list(stream_llm_request("https://api.openai.com", "k", "p", "m")) == ["Hal", "lo"]
+    assert calls["json"]["stream"] is True
+    # Der zusammengesetzte Text wird gecacht
+    assert send_llm_request("https://api.openai.com", "k", "p", "m") == "Hallo"
+
+
+def test_gemini_stream_endpoint_and_key_header(monkeypatch):
+    event = {"candidates": [{"content": {"parts": [{"text": "Hi"}]}}]}
+    calls = capture_post(monkeypatch, FakeResponse(
+        content_type="text/event-stream", lines=[f"data: {json.dumps(event)}", ""]))
+    assert list(stream_llm_request("https://generativelanguage.googleapis.com", "g", "p", "gemini-x")) == ["Hi"]
+    assert calls["url"] == (
+        "https://generativelanguage.googleapis.com/v1beta/models/gemini-x:streamGenerateContent?alt=sse"
+    )
+    assert calls["headers"]["x-goog-api-key"] == "g"
+    assert "Authorization" not in calls["headers"]
+
+
+def test_ollama_stream_reads_ndjson(monkeypatch):
+    lines = [json.dumps({"response": "a", "done": False}),
+             json.dumps({"response": "b", "done": True})]
+    calls = capture_post(monkeypatch, FakeResponse(content_type="application/x-ndjson", lines=lines))
+
+    def consume():
+        return (yield from stream_llm_request("http://localhost:11434", "", "p", "llama3"))
+
+    gen, chunks = consume(), []
+    try:
+        while True:
+            chunks.append(next(gen))
+    except StopIteration as stop:
+        assert stop.value == "ab"
+    assert chunks == ["a", "b"]
+    assert calls["url"] == "http://localhost:11434/api/generate"
+    assert calls["json"] == {"model": "llama3", "prompt": "p", "stream": True}
+
+
+def test_register_backend_overrides_selection(monkeypatch):
+    class Echo(providers.ProviderBackend):
+        name = "echo"
+
+        def payload(self, user_input, model, stream=False):
+            return {"text": user_input}
+
+        def parse(self, data):
+            return data["text"].upper()
+
+    monkeypatch.setitem(providers._backends, "openai", Echo())
+    calls = capture_post(monkeypatch, FakeResponse({"text": "ok"}))
+    assert send_llm_request("https://api.openai.com", "", "ok", "m") == "OK"
+    assert calls["json"] == {"text": "ok"}
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import pytest
+from core import rate_limiter
+from core.rate_limiter import FairSemaphore, RateLimiter, RateLimitExceeded, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    bucket.take(); bucket.take()
+    assert bucket.wait_time() == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert bucket.wait_time() == 0
+
+
+def test_admit_rejects_with_retry_after_per_user(clock):
+    limiter = RateLimiter(user_rate=1, user_burst=2)
+    limiter.admit(1, "u")
+    limiter.admit(1, "u")
+    with pytest.raises(RateLimitExceeded) as ei:
+        limiter.admit(1, "u")
+    assert ei.value.retry_after == pytest.approx(1.0)
+    limiter.admit(2, "u")  # andere User sind nicht betroffen
+
+
+def test_admit_limits_per_endpoint(clock):
+    limiter = RateLimiter(endpoint_rate=1)
+    limiter.admit(1, "a")
+    limiter.admit(1, "b")
+    with pytest.raises(RateLimitExceeded):
+        limiter.admit(2, "a")
+
+
+def test_fair_semaphore_serves_users_round_robin():
+    sem = FairSemaphore(1)
+    assert sem.acquire("holder")
+    waiters = [(u, sem.enqueue(u)) for u in ("A", "A", "A", "B", "C")]
+    order = []
+    for _ in waiters:
+        sem.release()
+        order += [(u, w) for u, w in waiters if w.is_set() and (u, w) not in order]
+    assert [u for u, _ in order] == ["A", "B", "C", "A", "A"]
+
+
+def test_slot_limits_concurrency_and_times_out():
+    limiter = RateLimiter(endpoint_concurrency=1, queue_timeout=0.05)
+    with limiter.slot("u", user_id=1):
+        with pytest.raises(RateLimitExceeded):
+            with limiter.slot("u", user_id=2):
+                pass
+    with limiter.slot("u", user_id=2):
+        pass
+
+
+def test_slot_blocks_until_released():
+    limiter = RateLimiter(user_concurrency=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with limiter.slot("u", user_id=1):
+            entered.set()
+            release.wait(1)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    entered.wait(1)
+    done = []
+
+    def second():
+        with limiter.slot("u", user_id=1):
+            done.append(1)
+
+    t2 = threading.Thread(target=second)
+    t2.start()
+    t2.join(0.05)
+    assert done == []
+    release.set()
+    t.join(1); t2.join(1)
+    assert done == [1]
+
+
+def test_slot_async_waits_without_blocking_loop():
+    limiter = RateLimiter(endpoint_concurrency=1)
+    active, peak = [0], [0]
+
+    async def call(i):
+        async with limiter.slot_async("u", user_id=i):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(4)))
+
+    asyncio.run(main())
+    assert peak[0] == 1
+
+
+def test_configure_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        rate_limiter.configure(unbekannt=1)
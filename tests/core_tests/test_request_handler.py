@@ -1,6 +1,14 @@
 import pytest
+import json
+from core import response_cache
 from core.request_handler import send_llm_request
 
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    response_cache.configure()
+    yield
+    response_cache.configure()
+
 class DummyResponse:
     def __init__(self, json_data, status_exception=None):
         self._json = json_data
@@ -15,11 +23,12 @@ class DummyResponse:
 
 def test_send_llm_request_with_api_key(monkeypatch):
     calls = {}
-    # Stub für requests.post
-    def fake_post(url, headers, json):
+    # Stub für http_client.post
+    def fake_post(url, headers, json, **kwargs):
         calls['url'] = url
         calls['headers'] = headers
         calls['json'] = json
+        calls['retry_status'] = kwargs.get('retry_status')
         # Simuliere eine MCP-Antwortstruktur
         return DummyResponse({
             "jsonrpc": "2.0",
@@ -32,8 +41,8 @@ def test_send_llm_request_with_api_key(monkeypatch):
             }
         })
 
-    # Patch requests.post in unserem Modul
-    monkeypatch.setattr("core.request_handler.requests.post", fake_post)
+    # Patch den gepoolten HTTP-Client
+    monkeypatch.setattr("core.http_client.post", fake_post)
 
     result = send_llm_request(
         api_url="https://mcp.example.com",
@@ -52,6 +61,9 @@ def test_send_llm_request_with_api_key(monkeypatch):
     assert calls['headers']["Authorization"] == "Bearer mein-test-key"
     assert calls['headers']["Content-Type"] == "application/json"
 
+    # LLM-Aufrufe dürfen 502/503/504 wiederholen
+    assert calls['retry_status'] is True
+
     # Payload entspricht build_payload für openai
     expected_payload = {
         "jsonrpc": "2.0",
@@ -67,8 +79,8 @@ def test_send_llm_request_with_api_key(monkeypatch):
 
 def test_send_llm_request_without_api_key(monkeypatch):
     calls = {}
-    # Stub für requests.post
-    def fake_post(url, headers, json):
+    # Stub für http_client.post
+    def fake_post(url, headers, json, **kwargs):
         calls['headers'] = headers
         return DummyResponse({
             "jsonrpc": "2.0",
@@ -81,7 +93,7 @@ def test_send_llm_request_without_api_key(monkeypatch):
             }
         })
 
-    monkeypatch.setattr("core.request_handler.requests.post", fake_post)
+    monkeypatch.setattr("core.http_client.post", fake_post)
 
     result = send_llm_request(
         api_url="https://mcp.example.com",
@@ -102,10 +114,10 @@ def test_send_llm_request_http_error(monkeypatch):
     class HTTPError(Exception):
         pass
 
-    def fake_post(url, headers, json):
+    def fake_post(url, headers, json, **kwargs):
         return DummyResponse({"irrelevant": True}, status_exception=HTTPError("404 Not Found"))
 
-    monkeypatch.setattr("core.request_handler.requests.post", fake_post)
+    monkeypatch.setattr("core.http_client.post", fake_post)
 
     with pytest.raises(Exception) as excinfo:
         send_llm_request(
@@ -115,3 +127,187 @@ def test_send_llm_request_http_error(monkeypatch):
             model="m"
         )
     assert "404 Not Found" in str(excinfo.value)
+
+def _mcp_json(text):
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {"content": [{"type": "text", "text": text}], "isError": False},
+    }
+
+def test_async_send_llm_request_uses_same_payload(monkeypatch):
+    import asyncio
+    import httpx
+    from core.request_handler import async_send_llm_request
+
+    calls = {}
+
+    def handler(request):
+        calls['url'] = str(request.url)
+        calls['auth'] = request.headers.get("Authorization")
+        calls['json'] = json.loads(request.content)
+        return httpx.Response(200, json=_mcp_json("Async-Antwort"))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await async_send_llm_request(
+                "https://mcp.example.com", "k", "Hallo", "m", client=client
+            )
+
+    assert asyncio.run(run()) == "Async-Antwort"
+    assert calls['url'] == "https://mcp.example.com"
+    assert calls['auth'] == "Bearer k"
+    assert calls['json']["method"] == "tools/call"
+    assert calls['json']["params"]["arguments"] == {"prompt": "Hallo", "model": "m"}
+
+def test_async_send_llm_request_http_error():
+    import asyncio
+    import httpx
+    from core.request_handler import async_send_llm_request
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(404))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await async_send_llm_request("https://mcp.example.com", "", "x", "m", client=client)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+def test_send_llm_request_uses_cache_and_bypass(monkeypatch):
+    calls = []
+
+    def fake_post(url, headers, json, **kwargs):
+        calls.append(json)
+        return DummyResponse(_mcp_json(f"Antwort {len(calls)}"))
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+
+    assert send_llm_request("https://mcp.example.com", "", "Prompt", "m") == "Antwort 1"
+    # Gleiches Triple -> Cache-Treffer, kein weiterer Request
+    assert send_llm_request("https://mcp.example.com", "anderer-key", "Prompt", "m") == "Antwort 1"
+    assert len(calls) == 1
+    # Anderes Modell -> Cache-Fehlgriff
+    assert send_llm_request("https://mcp.example.com", "", "Prompt", "m2") == "Antwort 2"
+
+    # Bypass per Flag und per Kontext; frische Antwort ersetzt den Cache-Eintrag
+    assert send_llm_request("https://mcp.example.com", "", "Prompt", "m", use_cache=False) == "Antwort 3"
+    with response_cache.bypass():
+        assert send_llm_request("https://mcp.example.com", "", "Prompt", "m") == "Antwort 4"
+    assert send_llm_request("https://mcp.example.com", "", "Prompt", "m") == "Antwort 4"
+    assert len(calls) == 4
+
+class DummyStreamResponse:
+    def __init__(self, content_type, lines=None, json_data=None):
+        self.headers = {"Content-Type": content_type}
+        self._lines = lines or []
+        self._json = json_data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self._lines)
+
+    def json(self):
+        return self._json
+
+def _sse_lines(*messages):
+    lines = []
+    for msg in messages:
+        lines += [f"data: {json.dumps(msg)}", ""]
+    return lines
+
+def test_stream_llm_request_yields_sse_deltas(monkeypatch):
+    from core.request_handler import stream_llm_request
+
+    captured = {}
+    lines = _sse_lines(
+        {"jsonrpc": "2.0", "method": "notifications/progress",
+         "params": {"progressToken": 1, "progress": 1, "message": "Hallo "}},
+        {"jsonrpc": "2.0", "method": "notifications/progress",
+         "params": {"progressToken": 1, "progress": 2, "message": "Welt"}},
+        _mcp_json("Hallo Welt!"),
+    )
+
+    def fake_post(url, headers, json, stream, **kwargs):
+        captured['headers'] = headers
+        captured['stream'] = stream
+        return DummyStreamResponse("text/event-stream", lines=lines)
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+    chunks = list(stream_llm_request("https://mcp.example.com", "", "p", "m"))
+
+    # Deltas sofort, vom Endergebnis nur der noch fehlende Rest
+    assert chunks == ["Hallo ", "Welt", "!"]
+    assert captured['stream'] is True
+    assert "text/event-stream" in captured['headers']["Accept"]
+    # Vollständige Antwort landet im Cache
+    assert send_llm_request("https://mcp.example.com", "", "p", "m") == "Hallo Welt!"
+
+def test_stream_llm_request_plain_json_yields_once(monkeypatch):
+    from core.request_handler import stream_llm_request
+
+    monkeypatch.setattr(
+        "core.http_client.post",
+        lambda url, headers, json, stream, **kw: DummyStreamResponse(
+            "application/json", json_data=_mcp_json("komplett")),
+    )
+    assert list(stream_llm_request("https://mcp.example.com", "", "q", "m")) == ["komplett"]
+
+def test_stream_llm_request_raises_on_jsonrpc_error(monkeypatch):
+    from core.request_handler import stream_llm_request
+
+    lines = _sse_lines({"jsonrpc": "2.0", "id": 1, "error": {"code": -1, "message": "kaputt"}})
+    monkeypatch.setattr(
+        "core.http_client.post",
+        lambda url, headers, json, stream, **kw: DummyStreamResponse("text/event-stream", lines=lines),
+    )
+    with pytest.raises(ValueError) as ei:
+        list(stream_llm_request("https://mcp.example.com", "", "r", "m"))
+    assert "kaputt" in str(ei.value)
+
+def test_stream_llm_request_without_result_raises_and_skips_cache(monkeypatch):
+    from core import response_cache
+    from core.request_handler import stream_llm_request
+
+    lines = _sse_lines({"jsonrpc": "2.0", "method": "notifications/progress",
+                        "params": {"progressToken": 1, "progress": 1, "message": "halb"}})
+    monkeypatch.setattr(
+        "core.http_client.post",
+        lambda url, headers, json, stream, **kw: DummyStreamResponse("text/event-stream", lines=lines),
+    )
+    with pytest.raises(ValueError, match="ohne Ergebnis"):
+        list(stream_llm_request("https://mcp.example.com", "", "s", "m"))
+    key = response_cache.make_key("https://mcp.example.com", "m", "s")
+    assert response_cache.get_cache().get(key) is None
+
+def test_stream_llm_request_returns_and_caches_authoritative_result(monkeypatch):
+    from core.request_handler import stream_llm_request
+
+    # Deltas weichen vom Endergebnis ab -> Ergebnis ist maßgeblich
+    lines = _sse_lines(
+        {"jsonrpc": "2.0", "method": "notifications/progress",
+         "params": {"progressToken": 1, "progress": 1, "message": "Entwurf"}},
+        _mcp_json("Endgültig"),
+    )
+    monkeypatch.setattr(
+        "core.http_client.post",
+        lambda url, headers, json, stream, **kw: DummyStreamResponse("text/event-stream", lines=lines),
+    )
+
+    def consume():
+        return (yield from stream_llm_request("https://mcp.example.com", "", "t", "m"))
+
+    gen = consume()
+    assert next(gen) == "Entwurf"
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value == "Endgültig"
+    assert send_llm_request("https://mcp.example.com", "", "t", "m") == "Endgültig"
@@ -0,0 +1,85 @@
+import os
+import time
+import pytest
+from core import response_cache
+from core.response_cache import ResponseCache, make_key
+
+
+def test_make_key_depends_on_url_model_and_prompt():
+    k = make_key("u", "m", "p")
+    assert k == make_key("u", "m", "p")
+    assert k != make_key("u2", "m", "p")
+    assert k != make_key("u", "m2", "p")
+    assert k != make_key("u", "m", "p2")
+    # None und leerer Modellname sind gleichwertig
+    assert make_key("u", None, "p") == make_key("u", "", "p")
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"      # a wird zuletzt benutzt
+    cache.put("c", "C")               # b fliegt raus
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_ttl_expires_entries(monkeypatch):
+    cache = ResponseCache(ttl=10)
+    now = time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now)
+    cache.put("k", "V")
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 11)
+    assert cache.get("k") is None
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ResponseCache(directory=str(tmp_path)).put("k", "Antwort")
+    cache = ResponseCache(directory=str(tmp_path))
+    assert cache.get("k") == "Antwort"
+    assert cache.stats()["disk_hits"] == 1
+    # danach aus dem Speicher
+    assert cache.get("k") == "Antwort"
+    assert cache.stats()["memory_hits"] == 1
+
+def test_disk_tier_evicts_oldest_beyond_size_limit(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path), max_disk_bytes=150)
+    cache.put("old", "x" * 60)
+    os.utime(tmp_path / "old.json", (1, 1))
+    cache.put("new", "y" * 60)
+    assert not (tmp_path / "old.json").exists()
+    assert (tmp_path / "new.json").exists()
+    assert cache.stats()["disk_bytes"] <= 150
+
+def test_clear_resets_everything(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.put("k", "v")
+    cache.clear()
+    assert cache.get("k") is None
+    assert list(tmp_path.glob("*.json")) == []
+    assert cache.stats()["disk_bytes"] == 0
+
+def test_bypass_is_scoped():
+    assert not response_cache.is_bypassed()
+    with response_cache.bypass():
+        assert response_cache.is_bypassed()
+    assert not response_cache.is_bypassed()
+
+def test_disk_index_avoids_directory_scans_on_put(tmp_path, monkeypatch):
+    cache = ResponseCache(directory=str(tmp_path))
+    monkeypatch.setattr(type(tmp_path), "glob", lambda *a, **k: pytest.fail("glob in put"))
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.stats()["disk_bytes"] == sum(p.stat().st_size for p in tmp_path.iterdir())
+
+def test_corrupt_or_incomplete_disk_entries_are_misses(tmp_path):
+    (tmp_path / "ohne_created.json").write_text('{"response": "x"}', encoding="utf-8")
+    (tmp_path / "kaputt.json").write_text("{nicht json", encoding="utf-8")
+    cache = ResponseCache(directory=str(tmp_path))
+    assert cache.get("ohne_created") is None
+    assert cache.get("kaputt") is None
+    assert list(tmp_path.glob("*.json")) == []
+    assert cache.stats()["disk_bytes"] == 0
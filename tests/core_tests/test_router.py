@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+from core import router
+from core.router import Endpoint, NoEndpointAvailable, Router
+
+
+@pytest.fixture(autouse=True)
+def fresh_endpoints():
+    router.reset()
+    yield
+    router.reset()
+
+
+def test_least_outstanding_spreads_concurrent_calls():
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    r = Router([a, b])
+    first = r._acquire([])
+    second = r._acquire([])
+    assert {first, second} == {a, b}
+
+
+def test_failover_to_next_endpoint():
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    r = Router([a, b])
+
+    def fn(ep):
+        if ep is a:
+            raise ConnectionError("a down")
+        return ep.api_url
+
+    assert r.call(fn) == "http://b"
+    assert a.failures == 1 and b.failures == 0
+    assert a.outstanding == 0 and b.outstanding == 0
+
+
+def test_circuit_opens_and_recovers_after_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    r = Router([a, b], failure_threshold=2, reset_timeout=30)
+    for _ in range(2):
+        r.call(lambda ep: (_ for _ in ()).throw(ValueError()) if ep is a else "ok")
+    assert a.state(30, now[0]) == "open"
+    assert [r.call(lambda ep: ep) for _ in range(3)] == [b, b, b]
+
+    now[0] += 31
+    assert r.call(lambda ep: ep) is a  # Probe nach Ablauf der Sperre
+    assert a.state(30, now[0]) == "closed"
+
+
+def test_all_failed_raises_last_error_and_empty_pool():
+    r = Router([Endpoint("http://a")])
+    with pytest.raises(KeyError):
+        r.call(lambda ep: {}["x"])
+    with pytest.raises(NoEndpointAvailable):
+        Router([]).call(lambda ep: None)
+
+
+def test_slow_responses_count_as_failures(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    a = Endpoint("http://a")
+    r = Router([a], failure_threshold=1, slow_threshold=5)
+
+    def slow(ep):
+        now[0] += 10
+        return "spät"
+
+    assert r.call(slow) == "spät"
+    assert a.state(r.reset_timeout, now[0]) == "open"
+    assert a.latency == 10
+
+
+def test_latency_strategy_prefers_fast_endpoint():
+    fast, slow = Endpoint("http://fast"), Endpoint("http://slow")
+    fast.latency, slow.latency = 0.1, 1.0
+    r = Router([fast, slow], strategy="latency")
+    r._random.seed(1)
+    picks = [r.call(lambda ep: ep) for _ in range(200)]
+    assert picks.count(fast) > picks.count(slow) * 3
+
+
+def test_stream_fails_over_before_first_chunk():
+    a, b = Endpoint("http://a"), Endpoint("http://b")
+    r = Router([a, b])
+
+    def fn(ep):
+        if ep is a:
+            raise ConnectionError()
+        yield "x"
+        return "x!"
+
+    def consume():
+        return (yield from r.stream(fn))
+
+    gen = consume()
+    assert next(gen) == "x"
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value == "x!"
+
+
+def test_request_handler_routes_through_active_router(monkeypatch):
+    from core import response_cache
+    from core.request_handler import send_llm_request, async_send_llm_request
+
+    response_cache.configure()
+    calls = []
+
+    class Resp:
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            if "down" in self.url:
+                raise ConnectionError(self.url)
+
+        def json(self):
+            return {"result": {"content": [{"type": "text", "text": self.url}]}}
+
+    def fake_post(url, headers, json, **kw):
+        calls.append((url, json["params"]["arguments"]["model"], headers.get("Authorization")))
+        return Resp(url)
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+    pool = Router([router.get_endpoint("http://down", "k1", ""),
+                   router.get_endpoint("http://up", "k2", "m2")])
+    with router.use(pool):
+        assert send_llm_request("http://down", "", "p", "m") == "http://up"
+    assert calls == [("http://down", "m", "Bearer k1"), ("http://up", "m2", "Bearer k2")]
+
+    async def fake_async_post(url, retry_status=False, client=None, **kw):
+        return Resp(url)
+
+    monkeypatch.setattr("core.http_client.async_post", fake_async_post)
+    with router.use(pool):
+        assert asyncio.run(async_send_llm_request("x", "", "q", "m", use_cache=False)) == "http://up"
+    response_cache.configure()
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+import pytest
+from core import response_cache, single_flight
+from core.single_flight import SQLiteFlightStore
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    response_cache.configure()
+    single_flight.configure(path=None)
+    yield
+    single_flight.configure(path=None)
+    response_cache.configure()
+
+
+def test_concurrent_identical_requests_share_one_call(monkeypatch):
+    from core.request_handler import send_llm_request
+
+    calls = []
+    gate = threading.Event()
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"result": {"content": [{"type": "text", "text": "geteilt"}]}}
+
+    def fake_post(url, headers, json, **kw):
+        calls.append(url)
+        gate.wait(1)
+        return Resp()
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            send_llm_request("http://mcp", "", "Plan", "m", use_cache=False)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join(1)
+    assert results == ["geteilt"] * 5
+    assert len(calls) == 1
+    assert single_flight.stats()["shared"] == 4
+
+
+def test_error_is_shared_and_next_call_starts_new_flight():
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(1)
+        raise ValueError("kaputt")
+
+    errors = []
+
+    def run(fn):
+        try:
+            single_flight.do("k", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=run, args=(failing,))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=run, args=(lambda: "nie",))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(1); follower.join(1)
+    assert errors == ["kaputt", "kaputt"]
+    assert single_flight.do("k", lambda: "neu") == "neu"
+
+
+def test_do_async_coalesces_coroutines():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "x"
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do_async("a", fetch) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["x", "x", "x"]
+    assert calls == [1]
+
+
+def test_sqlite_store_claims_once_and_takes_over_stale(tmp_path):
+    store = SQLiteFlightStore(str(tmp_path / "f.db"), lease=60)
+    assert store.claim("k", "a")
+    assert not store.claim("k", "b")
+    store.finish("k", "a", "ergebnis")
+    assert store.poll("k") == ("done", "ergebnis")
+    # Abgeschlossene Flüge werden nicht wiederverwendet
+    assert store.claim("k", "b")
+
+    stale = SQLiteFlightStore(str(tmp_path / "f.db"), lease=0)
+    assert stale.poll("k")[0] == "stale"
+    assert stale.claim("k", "c")
+
+
+def test_waits_for_flight_of_other_process(tmp_path):
+    path = str(tmp_path / "flights.db")
+    single_flight.configure(path=path, poll_interval=0.01)
+    other = SQLiteFlightStore(path)
+    assert other.claim("k", "anderer-prozess")
+    threading.Timer(0.05, other.finish, args=("k", "anderer-prozess", "von dort")).start()
+    assert single_flight.do("k", lambda: pytest.fail("darf nicht aufgerufen werden")) == "von dort"
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+import pytest
+from flask import Flask
+from models import db, User, Job
+from jobs.job_queue import JobQueue
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path/'jobs.db'}",
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+    })
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        user = User(username="alice", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+
+@pytest.fixture
+def queue(app):
+    q = JobQueue(app, max_workers=1)
+    yield q
+    q.shutdown()
+
+def wait_for(queue, job_id, statuses=("done", "failed", "cancelled"), timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} nicht fertig: {queue.get(job_id)}")
+
+def test_submit_runs_handler_and_persists_result(queue):
+    queue.register("echo", lambda params, check: {"echo": params["text"]})
+    job_id = queue.submit("echo", {"text": "hallo"}, user_id=1)
+    job = wait_for(queue, job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"echo": "hallo"}
+    assert json.loads(db.session.get(Job, job_id).params) == {"text": "hallo"}
+
+def test_failing_handler_marks_job_failed(queue):
+    def boom(params, check):
+        raise RuntimeError("LLM nicht erreichbar")
+    queue.register("boom", boom)
+    job = wait_for(queue, queue.submit("boom", {}, user_id=1))
+    assert job["status"] == "failed"
+    assert "LLM nicht erreichbar" in job["error"]
+
+def test_submit_unknown_kind_raises(queue):
+    with pytest.raises(ValueError):
+        queue.submit("nope", {}, user_id=1)
+
+def test_get_respects_owner(queue):
+    queue.register("echo", lambda params, check: {})
+    job_id = queue.submit("echo", {}, user_id=1)
+    assert queue.get(job_id, user_id=2) is None
+    assert queue.get(job_id, user_id=1)["job_id"] == job_id
+
+def test_cancel_queued_and_running_jobs(queue):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(params, check):
+        started.set()
+        release.wait(5)
+        check()
+        return {"never": "stored"}
+
+    queue.register("slow", slow)
+    running = queue.submit("slow", {}, user_id=1)
+    started.wait(5)
+    # Einziger Worker ist belegt -> zweiter Job wartet
+    waiting = queue.submit("slow", {}, user_id=1)
+
+    assert queue.cancel(waiting) == "cancelled"
+    assert queue.cancel(running) == "running"
+    release.set()
+
+    assert wait_for(queue, running)["status"] == "cancelled"
+    assert queue.get(running)["result"] is None
+    assert queue.get(waiting)["status"] == "cancelled"
+
+def test_recover_requeues_queued_and_fails_only_stale_running(app, queue):
+    from datetime import datetime, timedelta
+    now = datetime.utcnow()
+    db.session.add(Job(id="q1", kind="echo", status="queued", params="{}", user_id=1))
+    db.session.add(Job(id="r1", kind="echo", status="running", params="{}", user_id=1,
+                       owner="tot", heartbeat_at=now - timedelta(minutes=5)))
+    # Läuft in einem anderen, lebenden Prozess -> bleibt unangetastet
+    db.session.add(Job(id="r2", kind="echo", status="running", params="{}", user_id=1,
+                       owner="lebt", heartbeat_at=now))
+    db.session.commit()
+    queue.register("echo", lambda params, check: {"ok": True})
+
+    queue.recover()
+
+    assert wait_for(queue, "q1")["result"] == {"ok": True}
+    job = queue.get("r1")
+    assert job["status"] == "failed"
+    assert "Neustart" in job["error"]
+    assert queue.get("r2")["status"] == "running"
+
+def test_job_is_claimed_only_once_across_queues(app):
+    calls = []
+    queues = [JobQueue(app, max_workers=2) for _ in range(2)]
+    for q in queues:
+        q.register("count", lambda params, check: calls.append(1) or {})
+    db.session.add(Job(id="shared", kind="count", status="queued", params="{}", user_id=1))
+    db.session.commit()
+
+    # Beide "Prozesse" reihen denselben Job ein
+    for q in queues:
+        q.recover()
+    wait_for(queues[0], "shared")
+    for q in queues:
+        q.shutdown()
+    assert calls == [1]
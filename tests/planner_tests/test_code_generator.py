@@ -56,3 +56,81 @@ def test_generate_code_for_ticket_missing_file_path():
     ticket = {"file_path": None, "beschreibung": "X", "anforderungen": ["A"]}
     with pytest.raises(TypeError):
         generate_code_for_ticket("url", "key", "/tmp", ticket, "m")
+
+def test_async_generate_code_runs_concurrently(monkeypatch):
+    import asyncio
+    from planner.code_generator import async_generate_code_for_ticket
+
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_async_send(api_url, api_key, prompt, model):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return prompt.splitlines()[1]
+
+    monkeypatch.setattr("planner.code_generator.async_send_llm_request", fake_async_send)
+
+    async def run():
+        tickets = [make_ticket(f"m{i}.java") for i in range(5)]
+        return await asyncio.gather(*(
+            async_generate_code_for_ticket("u", "k", "/tmp", t, "m") for t in tickets
+        ))
+
+    results = asyncio.run(run())
+    assert results == [f"Datei: m{i}.java" for i in range(5)]
+    assert in_flight["max"] == 5
+
+def test_generate_code_for_ticket_includes_dependencies(monkeypatch):
+    captured = {}
+    monkeypatch.setattr("planner.code_generator.send_llm_request",
+                        lambda u, k, p, m: captured.setdefault("prompt", p))
+    generate_code_for_ticket("u", "k", "/tmp/proj", make_ticket("app/views.py"), "m",
+                             dependencies={"app/models.py": "class User: pass"})
+    assert "Bereits implementierte Abhängigkeiten" in captured["prompt"]
+    assert "Datei: app/models.py\n```\nclass User: pass\n```" in captured["prompt"]
+
+def test_dependencies_over_budget_are_reduced_to_signatures(monkeypatch):
+    from core import context_budget
+
+    captured = {}
+    monkeypatch.setattr("planner.code_generator.send_llm_request",
+                        lambda u, k, p, m: captured.setdefault("prompt", p))
+    body = "def helper(x):\n" + "    x += 1\n" * 50 + "    return x\n"
+    context_budget.configure(dependency_tokens=20)
+    try:
+        generate_code_for_ticket("u", "k", "/tmp/proj", make_ticket("app/views.py"), "gpt-4",
+                                 dependencies={"app/helpers.py": body})
+    finally:
+        context_budget.configure(dependency_tokens=None)
+    assert "Datei: app/helpers.py\n```\ndef helper(x):\n    ...\n```" in captured["prompt"]
+
+def test_generate_code_patch_sends_existing_file(monkeypatch):
+    from planner.code_generator import generate_code_patch
+    captured = {}
+    monkeypatch.setattr("planner.code_generator.send_llm_request",
+                        lambda u, k, prompt, m: captured.setdefault("prompt", prompt))
+
+    generate_code_patch("u", "k", "/tmp/proj", make_ticket("a.py"), "m", "x = 1\n")
+    assert "```python\nx = 1\n" in captured["prompt"]
+    assert "<<<<<<< SEARCH" in captured["prompt"]
+
+def test_existing_code_uses_code_file_note(monkeypatch):
+    captured = {}
+    monkeypatch.setattr("planner.code_generator.send_llm_request",
+                        lambda u, k, prompt, m: captured.setdefault("prompt", prompt))
+
+    generate_code_for_ticket("u", "k", "/tmp/proj", make_ticket("A.java"), "m", existing_code="class A {}")
+    assert "```java\nclass A {}\n```" in captured["prompt"]
+    assert "vollständige" in captured["prompt"]
+
+def test_repair_code_sends_errors_and_previous_answer(monkeypatch):
+    from planner.code_generator import repair_code
+    captured = {}
+    monkeypatch.setattr("planner.code_generator.send_llm_request",
+                        lambda u, k, prompt, m: captured.setdefault("prompt", prompt))
+
+    repair_code("u", "k", "/tmp/proj", make_ticket("a.py"), "m", "```python\nx = (\n```", "a.py: Zeile 1: x")
+    assert "a.py: Zeile 1: x" in captured["prompt"]
+    assert "```python\nx = (\n```" in captured["prompt"]
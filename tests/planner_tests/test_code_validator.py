@@ -0,0 +1,56 @@
+import pytest
+from planner import code_validator
+from planner.code_validator import check_java, check_python, format_errors, register_checker, validate_files
+
+
+@pytest.fixture(autouse=True)
+def default_config():
+    code_validator.configure(enabled=True, max_attempts=2, processes=0)
+    yield
+    code_validator.configure(enabled=True, max_attempts=2, processes=0)
+    register_checker(".java", check_java)
+
+
+def test_check_python_reports_line():
+    assert check_python("a.py", "x = 1\n") is None
+    assert check_python("a.py", "x = 1\ndef f(:\n    pass\n").startswith("Zeile 2:")
+
+
+@pytest.mark.parametrize("code,error", [
+    ("class A { void f() { g(\"}\"); } }", None),
+    ("class A { char c = '{'; /* } */ String s = \"\"\"\n)\n\"\"\"; }", None),
+    ("class A {\n  void f() {\n}", "Zeile 1: '{' wird nicht geschlossen"),
+    ("class A { void f() ) }", "Zeile 1: Unerwartetes ')'"),
+    ("class A { String s = \"abc; }", "Zeile 1: Zeichenkette nicht geschlossen"),
+    ("class A { } /* offen", "Zeile 1: Kommentar nicht geschlossen"),
+])
+def test_check_java(code, error):
+    assert check_java("A.java", code) == error
+
+
+def test_validate_files_uses_checker_per_suffix():
+    files = [("a.py", "x = (\n"), ("b.py", "y = 1\n"), ("A.java", "class A {"), ("notes.md", "(")]
+    errors = validate_files(files)
+    assert set(errors) == {"a.py", "A.java"}
+    assert format_errors({"a.py": "Zeile 1: x"}) == "a.py: Zeile 1: x"
+
+
+def test_register_checker_and_disable():
+    register_checker(".java", lambda path, code: "kaputt")
+    assert validate_files([("A.java", "class A {}")]) == {"A.java": "kaputt"}
+    register_checker(".java", None)
+    assert validate_files([("A.java", "class A {")]) == {}
+    code_validator.configure(enabled=False)
+    assert validate_files([("a.py", "(")]) == {}
+
+
+def test_validate_files_in_process_pool():
+    code_validator.configure(processes=2)
+    files = [(f"m{i}.py", "x = 1\n" if i % 2 else "def f(:\n") for i in range(6)]
+    errors = validate_files(files)
+    assert sorted(errors) == ["m0.py", "m2.py", "m4.py"]
+
+
+def test_unknown_option_raises():
+    with pytest.raises(ValueError):
+        code_validator.configure(foo=1)
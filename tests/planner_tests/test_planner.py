@@ -48,3 +48,19 @@ def test_generate_project_plan_missing_description(monkeypatch):
         model=None
     )
     assert result == "OK"
+
+def test_async_generate_project_plan_uses_same_prompt(monkeypatch):
+    import asyncio
+    from planner.planner import async_generate_project_plan
+
+    captured = {}
+
+    async def fake_async_send(api_url, api_key, prompt, model):
+        captured['prompt'] = prompt
+        return "ASYNC_PLAN"
+
+    monkeypatch.setattr("planner.planner.async_send_llm_request", fake_async_send)
+    result = asyncio.run(async_generate_project_plan("u", "k", "Mein Projekt", "m"))
+    assert result == "ASYNC_PLAN"
+    assert "Mein Projekt" in captured['prompt']
+    assert "nummerierte Schritte" in captured['prompt']
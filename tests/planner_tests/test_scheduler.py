@@ -0,0 +1,32 @@
+import pytest
+from planner.scheduler import find_dependencies, build_waves, schedule
+
+def ticket(path, beschreibung="", anforderungen=None):
+    return {"title": path, "file_path": path, "beschreibung": beschreibung,
+            "anforderungen": anforderungen or []}
+
+def test_text_references_create_edges():
+    tickets = [
+        ticket("app/models.py"),
+        ticket("app/views.py", "Rendert Daten aus models.py"),
+        ticket("app/cli.py", anforderungen=["Nutzt app/views.py"]),
+        ticket("app/other_models.py"),
+    ]
+    deps = find_dependencies(tickets)
+    assert deps == {0: set(), 1: {0}, 2: {1}, 3: set()}
+    assert build_waves(len(tickets), deps) == [[0, 3], [1], [2]]
+
+def test_imports_in_generated_code_create_edges(tmp_path):
+    tickets = [ticket("pkg/db.py"), ticket("pkg/service.py"), ticket("Main.java"), ticket("Util.java")]
+    src = tmp_path / "src"
+    (src / "pkg").mkdir(parents=True)
+    (src / "pkg" / "service.py").write_text("import os\nfrom pkg.db import connect\n", encoding="utf-8")
+    (src / "Main.java").write_text("import com.example.Util;\nclass Main {}\n", encoding="utf-8")
+    deps = find_dependencies(tickets, str(tmp_path))
+    assert deps[1] == {0}
+    assert deps[2] == {3}
+    assert schedule(tickets, str(tmp_path)) == [[0, 3], [1, 2]]
+
+def test_cycles_and_invalid_entries_end_up_in_last_wave():
+    tickets = [ticket("a.py", "braucht b.py"), ticket("b.py", "braucht a.py"), "kein Ticket", ticket("c.py")]
+    assert schedule(tickets) == [[2, 3], [0, 1]]
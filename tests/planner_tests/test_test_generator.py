@@ -52,3 +52,19 @@ def test_generate_tests_missing_file_path_key():
     ticket = {"title": "T", "beschreibung": "B", "anforderungen": ["R"]}
     with pytest.raises(KeyError):
         generate_tests("url", "key", ticket, "model")
+
+def test_async_generate_tests_uses_same_prompt(monkeypatch):
+    import asyncio
+    from planner.test_generator import async_generate_tests
+
+    captured = {}
+
+    async def fake_async_send(api_url, api_key, prompt, model):
+        captured['prompt'] = prompt
+        return "def test_x(): pass"
+
+    monkeypatch.setattr("planner.test_generator.async_send_llm_request", fake_async_send)
+    ticket = make_ticket("pkg/module.py")
+    result = asyncio.run(async_generate_tests("u", "k", ticket, "m"))
+    assert result == "def test_x(): pass"
+    assert "Speichere die Tests in test_module.py" in captured['prompt']
@@ -102,3 +102,49 @@ def test_passes_correct_parameters_to_llm(monkeypatch):
     assert captured['api_url'] == "my_url"
     assert captured['api_key'] == "my_key"
     assert captured['model']   == "my_model"
+
+def test_async_generate_tickets_parses_like_sync(monkeypatch):
+    import asyncio
+    from planner.ticket_generator import async_generate_tickets
+
+    async def fake_async_send(api_url, api_key, prompt, model):
+        return "```json\n[{\"title\":\"T1\"}]\n```"
+
+    monkeypatch.setattr("planner.ticket_generator.async_send_llm_request", fake_async_send)
+    assert asyncio.run(async_generate_tickets("u", "k", "plan", "m")) == [{"title": "T1"}]
+
+def test_stream_parsed_tickets_yields_before_stream_ends(monkeypatch):
+    from planner.ticket_generator import stream_parsed_tickets
+
+    seen = []
+
+    def fake_stream(api_url, api_key, prompt, model):
+        yield '[{"title":"T1"},'
+        seen.append("second chunk")
+        yield ' {"title":"T2"}]'
+        return '[{"title":"T1"}, {"title":"T2"}]'
+
+    monkeypatch.setattr("planner.ticket_generator.stream_llm_request", fake_stream)
+    gen = stream_parsed_tickets("u", "k", "plan", "m")
+    assert next(gen) == {"title": "T1"}
+    assert seen == []
+    assert list(gen) == [{"title": "T2"}]
+
+def test_plan_over_budget_is_trimmed(monkeypatch):
+    from core import context_budget
+
+    captured = {}
+    def fake_send(api_url, api_key, prompt, model):
+        captured["prompt"] = prompt
+        return '[{"title":"T","beschreibung":"B","anforderungen":[],"file_path":"f.py"}]'
+
+    monkeypatch.setattr("planner.ticket_generator.send_llm_request", fake_send)
+    plan = "# Plan\nIntro\n## 1. Schritt\n" + "viel Text " * 200 + "\n## 2. Schritt\nkurz"
+    context_budget.configure(plan_tokens=50)
+    try:
+        generate_tickets("u", "k", plan, "gpt-4")
+    finally:
+        context_budget.configure(plan_tokens=None)
+    assert "# Plan\nIntro" in captured["prompt"]
+    assert "## 1. Schritt […]" in captured["prompt"]
+    assert "viel Text" not in captured["prompt"]
@@ -0,0 +1,44 @@
+import pytest
+from planner.ticket_parser import TicketStreamParser, iter_tickets, parse_tickets
+
+
+def test_yields_each_ticket_as_soon_as_complete():
+    parser = TicketStreamParser()
+    assert parser.feed("Hier die Tickets:\n```json\n[{\"title\": \"T1\", ") == []
+    assert parser.feed("\"anforderungen\": [\"a]\", \"b\"]}") == [
+        {"title": "T1", "anforderungen": ["a]", "b"]}
+    ]
+    assert parser.feed(",\n {\"title\": \"T2 \\\"}\\\"\"}") == [{"title": "T2 \"}\""}]
+    assert parser.feed("\n]\n```") == []
+    assert parser.done and not parser.errors
+
+
+def test_chunking_does_not_change_result():
+    raw = '```json\n[{"title": "A", "x": {"y": [1, 2]}}, {"title": "B"}, 3, "s"]\n```'
+    expected = parse_tickets(raw)
+    assert expected == [{"title": "A", "x": {"y": [1, 2]}}, {"title": "B"}, 3, "s"]
+    assert list(iter_tickets(raw)) == expected
+
+
+def test_recovers_elements_around_broken_ones():
+    raw = '[{"title": "A"}, {"title": "B",, }, {"title": "C"}]'
+    parser = TicketStreamParser()
+    assert list(iter_tickets([raw], parser)) == [{"title": "A"}, {"title": "C"}]
+    assert len(parser.errors) == 1
+
+
+def test_recovers_ticket_swallowed_by_unclosed_object():
+    raw = '[{"title": "A", {"title": "B"}, {"title": "C"}]'
+    assert parse_tickets(raw) == [{"title": "B"}, {"title": "C"}]
+
+
+def test_truncated_stream_keeps_complete_tickets():
+    raw = '[{"title": "A"}, {"title": "B"}, {"title": "C", "beschr'
+    assert list(iter_tickets([raw])) == [{"title": "A"}, {"title": "B"}]
+
+
+def test_only_broken_elements_raise_with_extracted_json():
+    with pytest.raises(ValueError) as ei:
+        parse_tickets("text [{ invalid json }] text")
+    assert "Fehler beim Parsen" in str(ei.value)
+    assert "[{ invalid json }]" in str(ei.value)
@@ -0,0 +1,67 @@
+import json
+import threading
+import pytest
+import requests
+from scripts import gitlab_issues
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self._body = body or {}
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+    def json(self):
+        return self._body
+
+
+def write_tickets(tmp_path, n):
+    path = tmp_path / "tickets.json"
+    tickets = [{"title": f"T{i}", "file_path": f"f{i}.py", "beschreibung": "d"} for i in range(n)]
+    path.write_text(json.dumps(tickets), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(gitlab_issues.time, "sleep", slept.append)
+    return slept
+
+
+def test_retries_429_with_retry_after(monkeypatch, no_sleep):
+    responses = [FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(201, {"iid": 1})]
+    monkeypatch.setattr("core.http_client.post", lambda url, **kw: responses.pop(0))
+    issue = gitlab_issues.create_issue("t", "d", "https://gl", "1", "tok")
+    assert issue == {"iid": 1}
+    assert no_sleep and 6 <= no_sleep[0] <= 7
+
+def test_bulk_export_is_parallel_and_resumable(monkeypatch, tmp_path, no_sleep):
+    tickets_file = write_tickets(tmp_path, 6)
+    lock = threading.Lock()
+    created = []
+
+    def fake_post(url, headers, json):
+        with lock:
+            if json["title"] == "T3" and not any(t == "T3-failed" for t in created):
+                created.append("T3-failed")
+                return FakeResponse(400)
+            created.append(json["title"])
+            return FakeResponse(201, {"iid": len(created), "title": json["title"]})
+
+    monkeypatch.setattr("core.http_client.post", fake_post)
+    with pytest.raises(RuntimeError, match="1 von 6"):
+        gitlab_issues.create_issues_from_tickets(tickets_file, "https://gl", "1", "tok", max_workers=3)
+    checkpoint = json.loads((tmp_path / "gitlab_issues.json").read_text(encoding="utf-8"))
+    assert len(checkpoint["https://gl#1"]) == 5
+
+    # Zweiter Lauf legt nur das fehlgeschlagene Ticket an
+    issues = gitlab_issues.create_issues_from_tickets(tickets_file, "https://gl", "1", "tok")
+    assert [t for t in created if not t.endswith("failed")].count("T3") == 1
+    assert len(created) == 7
+    assert sum(1 for i in issues if i.get("skipped")) == 5
+    assert issues[3]["title"] == "T3"
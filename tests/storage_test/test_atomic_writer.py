@@ -0,0 +1,59 @@
+import os
+import threading
+import pytest
+from storage import atomic_writer
+
+def test_write_text_replaces_file_without_leftovers(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("alt", encoding="utf-8")
+    os.chmod(target, 0o640)
+
+    assert atomic_writer.write_text(target, "neu\r\n") == str(target)
+    assert target.read_bytes() == b"neu\r\n"
+    assert oct(target.stat().st_mode & 0o777) == oct(0o640)
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+def test_group_commit_defers_files_until_exit(tmp_path):
+    with atomic_writer.group_commit():
+        atomic_writer.write_text(tmp_path / "a.py", "a = 1\n")
+        atomic_writer.write_text(tmp_path / "b.py", "b = 1\n")
+        atomic_writer.write_text(tmp_path / "a.py", "a = 2\n")
+        assert not (tmp_path / "a.py").exists()
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "a = 2\n"
+    assert sorted(os.listdir(tmp_path)) == ["a.py", "b.py"]
+
+def test_group_commit_includes_threads_with_copied_context(tmp_path):
+    from contextvars import copy_context
+    with atomic_writer.group_commit():
+        ctx = copy_context()
+        worker = threading.Thread(
+            target=ctx.run, args=(atomic_writer.write_text, tmp_path / "w.py", "w\n"))
+        worker.start()
+        worker.join()
+        assert not (tmp_path / "w.py").exists()
+    assert (tmp_path / "w.py").read_text(encoding="utf-8") == "w\n"
+
+def test_failed_commit_removes_temp_files(tmp_path, monkeypatch):
+    def broken_replace(src, dst):
+        raise OSError("Platte voll")
+
+    with pytest.raises(OSError):
+        with atomic_writer.group_commit():
+            atomic_writer.write_text(tmp_path / "a.py", "a\n")
+            monkeypatch.setattr(atomic_writer.os, "replace", broken_replace)
+    assert os.listdir(tmp_path) == []
+
+def test_concurrent_writers_never_mix_contents(tmp_path):
+    target = tmp_path / "shared.txt"
+    contents = [str(i) * 20000 for i in range(8)]
+    threads = [threading.Thread(target=atomic_writer.write_text, args=(target, c)) for c in contents]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert target.read_text(encoding="utf-8") in contents
+    assert os.listdir(tmp_path) == ["shared.txt"]
+
+def test_configure_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        atomic_writer.configure(durable=True)
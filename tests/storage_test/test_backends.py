@@ -0,0 +1,73 @@
+import os
+import pytest
+from storage import backends
+from storage.backends import FilesystemBackend, ObjectStoreBackend, SQLiteBackend
+from storage.code_storage import save_code
+from storage.manifest_storage import load_manifest, save_manifest
+
+@pytest.fixture(params=["filesystem", "sqlite", "objects"])
+def backend(request, tmp_path):
+    if request.param == "filesystem":
+        yield FilesystemBackend()
+    elif request.param == "sqlite":
+        b = SQLiteBackend(str(tmp_path / "store.db"))
+        yield b
+        b.close()
+    else:
+        yield ObjectStoreBackend(str(tmp_path / "objects"))
+
+def test_backend_roundtrip_and_listing(backend, tmp_path):
+    proj = str(tmp_path / "proj")
+    saved = backend.write_text(proj, "src/pkg/a.py", "a = 1\n")
+    backend.write_text(proj, "src/b.py", "b = 1\n")
+    backend.write_text(proj, "src/b.py", "b = 2\n")
+
+    assert saved == os.path.join(proj, "src", "pkg", "a.py")
+    assert backend.read_text(proj, "src/b.py") == "b = 2\n"
+    assert backend.exists(proj) and backend.exists(proj, "src/pkg")
+    assert not backend.exists(str(tmp_path / "other"))
+    assert backend.paths(proj) == ["src/b.py", "src/pkg/a.py"]
+    assert backend.tree(proj) == {"src": {"b.py": None, "pkg": {"a.py": None}}}
+    listing = backend.list_dir(proj, "src", 0, 1)
+    assert (listing["dirs"], listing["files"], listing["next_offset"]) == (["pkg"], ["b.py"], None)
+
+def test_backend_errors(backend, tmp_path):
+    proj = str(tmp_path / "proj")
+    backend.write_text(proj, "README.md", "x")
+    with pytest.raises(FileNotFoundError):
+        backend.read_text(proj, "fehlt.py")
+    with pytest.raises(FileNotFoundError):
+        backend.list_dir(proj, "fehlt")
+    with pytest.raises(ValueError):
+        backend.read_text(proj, "../geheim.txt")
+
+def test_object_store_deduplicates_contents(tmp_path):
+    backend = ObjectStoreBackend(str(tmp_path))
+    backend.write_text("/p1", "src/a.py", "same\n")
+    backend.write_text("/p2", "src/b.py", "same\n")
+    objects = [f for _, _, files in os.walk(tmp_path / "objects") for f in files]
+    assert len(objects) == 1
+    assert backend.paths("/p1") == ["src/a.py"]
+
+def test_savers_use_configured_backend(tmp_path):
+    backends.configure(backend="sqlite", path=str(tmp_path / "store.db"))
+    try:
+        proj = str(tmp_path / "proj")
+        save_code(proj, "m.py", "```python\nx = 1\n```")
+        save_manifest(proj, {"version": 1, "tickets": {"m.py": {}}})
+        backend = backends.get_backend()
+        assert backend.read_text(proj, "src/m.py") == "x = 1\n"
+        assert load_manifest(proj)["tickets"] == {"m.py": {}}
+        assert not os.path.exists(proj)
+    finally:
+        backends.get_backend().close()
+        backends.configure(backend="filesystem", path=None)
+
+def test_configure_validates_options():
+    with pytest.raises(ValueError):
+        backends.configure(backend="s3")
+    with pytest.raises(ValueError):
+        backends.configure(backend="sqlite", path=None)
+    with pytest.raises(ValueError):
+        backends.configure(bucket="x")
+    assert isinstance(backends.get_backend(), FilesystemBackend)
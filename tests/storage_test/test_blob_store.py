@@ -0,0 +1,42 @@
+import os
+import pytest
+from storage import blob_store
+from storage.blob_store import BlobStore, write_artifact
+
+def _blob_files(directory):
+    return [f for _, _, files in os.walk(directory) for f in files]
+
+def test_put_deduplicates_and_compresses(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = b"plan " * 1000
+    digest = store.put(data)
+    assert BlobStore(str(tmp_path)).put(data) == digest
+    assert len(_blob_files(tmp_path)) == 1
+    assert (tmp_path / digest[:2] / digest).stat().st_size < len(data) // 10
+    assert store.get(digest) == data
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+def test_ref_keeps_short_texts_inline(tmp_path):
+    store = BlobStore(str(tmp_path))
+    assert store.ref("kurz") == "kurz"
+    ref = store.ref("x" * 1000)
+    assert set(ref) == {"blob"}
+    assert store.resolve(ref) == "x" * 1000
+    assert store.resolve("kurz") == "kurz"
+
+def test_write_artifact_skips_unchanged_files(tmp_path):
+    proj = str(tmp_path)
+    saved, written = write_artifact(proj, "src/a.py", "a = 1\n")
+    assert written and open(saved, encoding="utf-8").read() == "a = 1\n"
+    mtime = os.stat(saved).st_mtime_ns
+
+    assert write_artifact(proj, "src/a.py", "a = 1\n") == (saved, False)
+    assert os.stat(saved).st_mtime_ns == mtime
+    assert write_artifact(proj, "src/a.py", "a = 2\n")[1]
+    # Beide Fassungen liegen genau einmal im Blob-Speicher
+    assert len(_blob_files(tmp_path / "logs" / "blobs")) == 2
+
+def test_configure_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        blob_store.configure(compress=True)
@@ -1,6 +1,7 @@
 import os
 import pytest
-from storage.code_storage import _extract_code, save_code
+from storage.code_storage import _extract_code, save_code, save_code_patch, split_code_files
+from storage.patcher import PatchError
 
 @pytest.mark.parametrize("markdown,expected", [
     # Kein Fence → Rückgabe unverändert
@@ -52,3 +53,44 @@ def test_save_code_overwrites_existing(tmp_path):
     assert p1 == p2
     content = (project_folder / "src" / file_path).read_text(encoding="utf-8")
     assert content == "B\n"
+
+def test_save_code_patch_applies_changes(tmp_path):
+    target = tmp_path / "src" / "pkg" / "module.py"
+    target.parent.mkdir(parents=True)
+    target.write_text("x = 1\ny = 2\n", encoding="utf-8")
+
+    patch = "<<<<<<< SEARCH\ny = 2\n=======\ny = 3\n>>>>>>> REPLACE"
+    saved = save_code_patch(str(tmp_path), "pkg/module.py", patch)
+
+    assert saved == str(target)
+    assert target.read_text(encoding="utf-8") == "x = 1\ny = 3\n"
+    assert os.listdir(target.parent) == ["module.py"]
+
+def test_save_code_patch_leaves_file_untouched_on_error(tmp_path):
+    target = tmp_path / "src" / "module.py"
+    target.parent.mkdir(parents=True)
+    target.write_text("x = 1\n", encoding="utf-8")
+
+    with pytest.raises(PatchError):
+        save_code_patch(str(tmp_path), "module.py", "<<<<<<< SEARCH\nz = 0\n=======\nz = 1\n>>>>>>> REPLACE")
+    with pytest.raises(PatchError):
+        save_code_patch(str(tmp_path), "missing.py", "<<<<<<< SEARCH\n=======\nz = 1\n>>>>>>> REPLACE")
+    assert target.read_text(encoding="utf-8") == "x = 1\n"
+
+def test_save_code_writes_named_fences_to_their_files(tmp_path):
+    code_md = (
+        "```python src/pkg/module.py\nfrom pkg.util import f\n```\n"
+        "```python:pkg/util.py\ndef f():\n    return 1\n```\n"
+    )
+    saved = save_code(str(tmp_path), "pkg/module.py", code_md)
+
+    assert saved == str(tmp_path / "src" / "pkg" / "module.py")
+    assert (tmp_path / "src" / "pkg" / "module.py").read_text(encoding="utf-8") == "from pkg.util import f\n"
+    assert (tmp_path / "src" / "pkg" / "util.py").read_text(encoding="utf-8") == "def f():\n    return 1\n"
+
+def test_split_code_files_without_ticket_block_keeps_everything_together():
+    # Ohne Block für die Ticket-Datei landet wie bisher alles dort
+    assert split_code_files("```python util.py\nA\n```", "main.py") == [("main.py", "A\n")]
+    # Ungültige Pfade gehören zur Ticket-Datei
+    code_md = "```python ../escape.py\nB\n```\n```python util.py\nA\n```"
+    assert split_code_files(code_md, "main.py") == [("main.py", "B\n"), ("util.py", "A\n")]
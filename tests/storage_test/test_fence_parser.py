@@ -0,0 +1,39 @@
+import pytest
+from storage.fence_parser import FenceStreamParser, parse_fences, parse_info
+
+@pytest.mark.parametrize("info,expected", [
+    ("", ("", None)),
+    ("python", ("python", None)),
+    ("python src/app.py", ("python", "src/app.py")),
+    ("python:app.py", ("python", "app.py")),
+    ('py title="app.py"', ("py", "app.py")),
+    ("app.py", ("", "app.py")),
+])
+def test_parse_info(info, expected):
+    assert parse_info(info) == expected
+
+def test_feed_handles_fences_split_across_chunks():
+    parser = FenceStreamParser()
+    pieces = []
+    for chunk in ["Intro\n``", "`python a.py\nx = 1\n", "y = 2\n`", "``\nText\n```\nz\n```"]:
+        pieces += parser.feed(chunk)
+    pieces += parser.close()
+    assert pieces == [("a.py", "x = 1\ny = 2\n"), (None, "z\n")]
+    assert parser.found and not parser.unterminated
+
+def test_longer_fence_contains_shorter_one():
+    text = "````markdown\n```py\nx\n```\n````"
+    assert parse_fences(text) == (True, [(None, "```py\nx\n```\n")])
+
+def test_tilde_fence_ignores_backtick_closer():
+    text = "~~~\na\n```\nb\n~~~"
+    assert parse_fences(text) == (True, [(None, "a\n```\nb\n")])
+
+def test_unterminated_block_is_returned_on_close():
+    parser = FenceStreamParser()
+    assert parser.feed("```py\nx = 1\ny") == []
+    assert parser.close() == [(None, "x = 1\ny\n")]
+    assert parser.unterminated
+
+def test_no_fence_found():
+    assert parse_fences("just text\n``inline``") == (False, [])
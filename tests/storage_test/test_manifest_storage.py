@@ -0,0 +1,35 @@
+import json
+from storage.manifest_storage import (
+    load_manifest, save_manifest, ticket_fingerprint, is_up_to_date, record_ticket,
+)
+
+TICKET = {"title": "T", "file_path": "pkg/a.py", "beschreibung": "B", "anforderungen": ["R"]}
+
+def test_fingerprint_covers_prompt_inputs():
+    fp = ticket_fingerprint(TICKET, "m")
+    assert fp == ticket_fingerprint(dict(TICKET), "m")
+    assert fp != ticket_fingerprint(dict(TICKET, beschreibung="B2"), "m")
+    assert fp != ticket_fingerprint(TICKET, "m2")
+    assert fp != ticket_fingerprint(TICKET, "m", {"pkg/b.py": "x = 1"})
+
+def test_record_and_up_to_date_roundtrip(tmp_path):
+    src = tmp_path / "src" / "pkg" / "a.py"
+    src.parent.mkdir(parents=True)
+    src.write_text("x = 1\n", encoding="utf-8")
+    fp = ticket_fingerprint(TICKET, "m")
+
+    manifest = load_manifest(str(tmp_path))
+    assert not is_up_to_date(manifest, str(tmp_path), TICKET, fp)
+    record_ticket(manifest, str(tmp_path), TICKET, fp)
+    save_manifest(str(tmp_path), manifest)
+
+    manifest = load_manifest(str(tmp_path))
+    assert is_up_to_date(manifest, str(tmp_path), TICKET, fp)
+    # Manuelle Änderung an der Datei erzwingt Neugenerierung
+    src.write_text("x = 2\n", encoding="utf-8")
+    assert not is_up_to_date(manifest, str(tmp_path), TICKET, fp)
+
+def test_load_manifest_ignores_corrupt_file(tmp_path):
+    (tmp_path / "tickets").mkdir()
+    (tmp_path / "tickets" / "manifest.json").write_text("{kaputt", encoding="utf-8")
+    assert load_manifest(str(tmp_path)) == {"version": 1, "tickets": {}}
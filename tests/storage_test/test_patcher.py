@@ -0,0 +1,43 @@
+import pytest
+from storage.patcher import PatchError, apply_patch, parse_unified_diff
+
+ORIGINAL = "def a():\n    return 1\n\n\ndef b():\n    return 2\n"
+
+def test_apply_search_replace_block():
+    patch = (
+        "```\n<<<<<<< SEARCH\n    return 2\n=======\n    return 3\n>>>>>>> REPLACE\n```"
+    )
+    assert apply_patch(ORIGINAL, patch, "m.py") == ORIGINAL.replace("return 2", "return 3")
+
+def test_apply_unified_diff():
+    diff = (
+        "--- a/m.py\n+++ b/m.py\n"
+        "@@ -1,2 +1,3 @@\n def a():\n-    return 1\n+    x = 1\n+    return x\n"
+        "@@ -5,2 +6,2 @@\n def b():\n-    return 2\n+    return 20\n"
+    )
+    assert apply_patch(ORIGINAL, diff, "m.py") == (
+        "def a():\n    x = 1\n    return x\n\n\ndef b():\n    return 20\n"
+    )
+
+def test_diff_line_hint_resolves_ambiguous_context():
+    text = "x = 1\ny = 0\nx = 1\ny = 0\n"
+    (search, replace, hint), = parse_unified_diff("@@ -3,2 +3,2 @@\n x = 1\n-y = 0\n+y = 9\n")
+    assert hint == 3
+    assert apply_patch(text, "@@ -3,2 +3,2 @@\n x = 1\n-y = 0\n+y = 9\n") == (
+        "x = 1\ny = 0\nx = 1\ny = 9\n"
+    )
+
+@pytest.mark.parametrize("patch,message", [
+    ("Nur Text, keine Änderungen", "Keine"),
+    ("<<<<<<< SEARCH\nreturn 5\n=======\nreturn 6\n>>>>>>> REPLACE", "nicht gefunden"),
+    ("<<<<<<< SEARCH\n():\n=======\n(x):\n>>>>>>> REPLACE", "nicht gefunden"),
+    ("<<<<<<< SEARCH\n    return 1\n=======\n    return (\n>>>>>>> REPLACE", "syntaktisch"),
+])
+def test_apply_patch_rejects_unusable_patches(patch, message):
+    with pytest.raises(PatchError, match=message):
+        apply_patch(ORIGINAL, patch, "m.py")
+
+def test_ambiguous_search_block_is_rejected():
+    text = "x = 1\ny = 0\nx = 1\n"
+    with pytest.raises(PatchError, match="nicht eindeutig"):
+        apply_patch(text, "<<<<<<< SEARCH\nx = 1\n=======\nx = 2\n>>>>>>> REPLACE")
@@ -1,30 +1,88 @@
+import os
+import gzip
 import json
+import threading
 from pathlib import Path
 import pytest
-from storage.saver import save_response
+from storage import log_store
+from storage.saver import save_response, query_responses
+from storage.log_store import LogStore
 
 def test_save_response_in_project_logs(tmp_path):
     project_folder = tmp_path / "proj"
     user_input = "Eingabe1"
     response = "Antwort1"
 
-    returned = save_response(str(project_folder), user_input, response)
-    p = Path(returned)
+    record_id = save_response(str(project_folder), user_input, response, ticket="a.py")
+    records = query_responses(str(project_folder))
 
-    # Muss im logs-Ordner liegen
-    assert p.parent.name == "logs"
-    assert p.exists()
-
-    # JSON laden und Inhalt prüfen
-    data = json.loads(p.read_text(encoding="utf-8"))
+    # Muss im logs-Ordner als JSON Lines liegen
+    log_file = project_folder / "logs" / "responses.jsonl"
+    assert log_file.exists()
+    data = json.loads(log_file.read_text(encoding="utf-8").splitlines()[0])
+    assert data["id"] == record_id == records[0]["id"]
     assert data["input"] == user_input
     assert data["response"] == response
+    assert data["ticket"] == "a.py"
     assert "timestamp" in data
 
 def test_save_response_without_project_folder(tmp_path, monkeypatch):
     # Wenn project_folder leer, landet es in cwd/antworten
     monkeypatch.chdir(tmp_path)
-    returned = save_response("", "X", "Y")
-    p = Path(returned)
-    assert p.parent.name == "antworten"
-    assert p.exists()
+    save_response("", "X", "Y")
+    assert query_responses("")[0]["response"] == "Y"
+    assert (tmp_path / "antworten" / "responses.jsonl").exists()
+
+def test_concurrent_writes_lose_nothing_and_ids_are_unique(tmp_path):
+    store = LogStore(str(tmp_path), batch_size=7, flush_interval=0.01)
+    ids = []
+
+    def worker(n):
+        for i in range(50):
+            ids.append(store.append(f"in {n}/{i}", "out"))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    records = store.query()
+    store.close()
+    assert len(records) == len(set(ids)) == 400
+    assert [r["id"] for r in records] == sorted(ids)
+
+def test_query_by_time_range_ticket_and_limit(tmp_path, monkeypatch):
+    store = LogStore(str(tmp_path))
+    clock = iter([1_000 * 10**9, 2_000 * 10**9, 3_000 * 10**9])
+    monkeypatch.setattr(log_store.time, "time_ns", lambda: next(clock))
+    store.append("1", "r1", ticket="a.py")
+    store.append("2", "r2", ticket="b.py")
+    store.append("3", "r3", ticket="a.py")
+
+    assert [r["input"] for r in store.query(ticket="a.py")] == ["1", "3"]
+    assert [r["input"] for r in store.query(start=1_500, end=3_000)] == ["2"]
+    assert [r["input"] for r in store.query(limit=2)] == ["1", "2"]
+    store.close()
+
+def test_compressed_store_appends_gzip_members(tmp_path):
+    store = LogStore(str(tmp_path), compress=True)
+    store.append("a", "1", ticket="x.py")
+    store.flush()
+    store.append("b", "2")
+    assert [r["input"] for r in store.query()] == ["a", "b"]
+    assert [r["input"] for r in store.query(ticket="x.py")] == ["a"]
+    store.close()
+    lines = gzip.decompress((tmp_path / "responses.jsonl.gz").read_bytes()).splitlines()
+    assert len(lines) == 2
+
+def test_repeated_prompts_are_stored_once(tmp_path):
+    plan = "Projektplan " * 200
+    for i in range(3):
+        save_response(str(tmp_path), plan, f"Antwort {i}")
+    records = query_responses(str(tmp_path))
+    assert [r["input"] for r in records] == [plan] * 3
+
+    lines = (tmp_path / "logs" / "responses.jsonl").read_text(encoding="utf-8").splitlines()
+    assert all(len(line) < 400 for line in lines)
+    blobs = [f for _, _, files in os.walk(tmp_path / "logs" / "blobs") for f in files]
+    assert len(blobs) == 1
@@ -0,0 +1,56 @@
+import os
+import pytest
+from storage import tree_index
+from storage.code_storage import save_code
+from storage.tree_index import TreeIndex
+
+def make_project(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "a.py").write_text("a", encoding="utf-8")
+    (root / "README.md").write_text("r", encoding="utf-8")
+
+def test_tree_matches_nested_dict_format(tmp_path):
+    make_project(tmp_path)
+    assert TreeIndex(str(tmp_path)).tree() == {
+        "src": {"pkg": {"a.py": None}},
+        "README.md": None,
+    }
+
+def test_listing_is_cached_until_directory_changes(tmp_path, monkeypatch):
+    make_project(tmp_path)
+    index = TreeIndex(str(tmp_path))
+    index.tree()
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(tree_index.os, "scandir", lambda p: scans.append(p) or real_scandir(p))
+    index.tree()
+    assert scans == []
+
+    (tmp_path / "src" / "b.py").write_text("b", encoding="utf-8")
+    os.utime(tmp_path / "src", ns=(1, 1))  # mtime sicher ändern
+    assert "b.py" in index.tree()["src"]
+
+def test_storage_writers_invalidate_index(tmp_path):
+    make_project(tmp_path)
+    index = tree_index.get_index(str(tmp_path))
+    index.tree()
+    # Änderungszeit einfrieren: nur die explizite Invalidierung macht die Datei sichtbar
+    mtime = (tmp_path / "src" / "pkg").stat().st_mtime_ns
+    save_code(str(tmp_path), "pkg/c.py", "c = 1")
+    os.utime(tmp_path / "src" / "pkg", ns=(mtime, mtime))
+    assert "c.py" in index.tree()["src"]["pkg"]
+
+def test_list_dir_paginates_files_and_rejects_escape(tmp_path):
+    (tmp_path / "logs").mkdir()
+    for i in range(5):
+        (tmp_path / "logs" / f"r{i}.json").write_text("{}", encoding="utf-8")
+    index = TreeIndex(str(tmp_path))
+    page = index.list_dir("logs", offset=0, limit=2)
+    assert page["files"] == ["r0.json", "r1.json"]
+    assert page["total_files"] == 5
+    assert page["next_offset"] == 2
+    assert index.list_dir("logs", offset=4, limit=2)["next_offset"] is None
+    with pytest.raises(ValueError):
+        index.list_dir("../")
+    with pytest.raises(FileNotFoundError):
+        index.list_dir("fehlt")
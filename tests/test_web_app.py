@@ -109,3 +109,514 @@ def test_structure_and_file_content(client, tmp_path):
     })
     assert rv.status_code == 200
     assert "print('hello')" in rv.get_json()["content"]
+
+def test_structure_lists_single_directory_paginated(client, tmp_path):
+    client = register_and_login(client)
+    proj = tmp_path/"projectB"
+    (proj/"logs").mkdir(parents=True)
+    for i in range(3):
+        (proj/"logs"/f"response_{i}.json").write_text("{}", encoding="utf-8")
+
+    rv = client.post("/structure", json={"project_folder": str(proj), "path": "logs", "limit": 2})
+    listing = rv.get_json()["listing"]
+    assert listing["files"] == ["response_0.json", "response_1.json"]
+    assert listing["next_offset"] == 2
+
+    rv = client.post("/structure", json={"project_folder": str(proj), "path": "../.."})
+    assert rv.status_code == 400
+
+def test_sqlite_backend_serves_structure_and_files(monkeypatch, tmp_path):
+    from storage import backends
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path/'app.db'}",
+        "SECRET_KEY": "test-secret",
+        "STORAGE_BACKEND": {"backend": "sqlite", "path": str(tmp_path/"projects.db")},
+    })
+    try:
+        client = register_and_login(app.test_client())
+        proj = str(tmp_path/"nowhere"/"proj")
+        monkeypatch.setattr("web_app.generate_code_for_ticket", lambda *a, **kw: "```\nx = 1\n```")
+        rv = client.post("/generate_code", json={
+            "api_url": "u", "project_folder": proj, "ticket": {"file_path": "pkg/m.py"}})
+        assert rv.status_code == 200
+
+        rv = client.post("/structure", json={"project_folder": proj})
+        assert rv.get_json()["structure"] == {"src": {"pkg": {"m.py": None}}}
+        rv = client.post("/structure", json={"project_folder": proj, "path": "src/pkg"})
+        assert rv.get_json()["listing"]["files"] == ["m.py"]
+        rv = client.post("/file_content", json={"project_folder": proj, "file_path": "src/pkg/m.py"})
+        assert rv.get_json()["content"] == "x = 1\n"
+    finally:
+        backends.get_backend().close()
+        backends.configure(backend="filesystem", path=None)
+
+def _write_tickets(proj, tickets):
+    (proj/"tickets").mkdir(parents=True, exist_ok=True)
+    (proj/"tickets"/"tickets.json").write_text(json.dumps(tickets), encoding="utf-8")
+
+def test_generate_all_requires_tickets_file(client, tmp_path):
+    client = register_and_login(client)
+    rv = client.post("/generate_all", json={"api_url": "u", "project_folder": str(tmp_path)})
+    assert rv.status_code == 400
+    assert rv.get_json() == {"error": "tickets.json nicht gefunden."}
+
+def test_generate_all_runs_tickets_concurrently(monkeypatch, client, tmp_path):
+    import threading
+    client = register_and_login(client)
+    proj = tmp_path/"proj"
+    _write_tickets(proj, [
+        {"title": "A", "file_path": "a.py", "beschreibung": "", "anforderungen": []},
+        {"title": "B", "file_path": "b.py", "beschreibung": "", "anforderungen": []},
+    ])
+    # Beide Tickets müssen gleichzeitig laufen, sonst läuft die Barrier in den Timeout
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_tests(u, k, t, m):
+        barrier.wait()
+        return f"tests {t['file_path']}"
+
+    monkeypatch.setattr("web_app.generate_tests", fake_tests)
+    monkeypatch.setattr("web_app.generate_code_for_ticket",
+                        lambda u, k, f, t, m, **kw: f"# code {t['file_path']}")
+
+    rv = client.post("/generate_all", json={
+        "api_url": "u", "project_folder": str(proj), "max_workers": 2
+    })
+    assert rv.status_code == 200
+    data = rv.get_json()
+    assert data["max_workers"] == 2
+    assert [r["file_path"] for r in data["results"]] == ["a.py", "b.py"]
+    assert all(r["status"] == "ok" for r in data["results"])
+    assert data["results"][1]["code"] == "# code b.py"
+    assert (proj/"src"/"a.py").read_text(encoding="utf-8") == "# code a.py"
+    # Je Ticket ein Log für Tests und eines für Code, keines verloren
+    rv = client.post("/logs", json={"project_folder": str(proj)})
+    assert len(rv.get_json()["records"]) == 4
+    rv = client.post("/logs", json={"project_folder": str(proj), "ticket": "b.py"})
+    assert [r["response"] for r in rv.get_json()["records"]] == ["tests b.py", "# code b.py"]
+
+def test_generate_all_reports_per_ticket_errors(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    proj = tmp_path/"proj"
+    _write_tickets(proj, [
+        {"title": "A", "file_path": "a.py", "beschreibung": "", "anforderungen": []},
+        {"title": "B", "file_path": "b.py", "beschreibung": "", "anforderungen": []},
+    ])
+
+    def fake_code(u, k, f, t, m, **kw):
+        if t["file_path"] == "b.py":
+            raise RuntimeError("LLM down")
+        return "x = 1"
+
+    monkeypatch.setattr("web_app.generate_tests", lambda u, k, t, m: "tests")
+    monkeypatch.setattr("web_app.generate_code_for_ticket", fake_code)
+
+    rv = client.post("/generate_all", json={
+        "api_url": "u", "project_folder": str(proj), "max_workers": 100
+    })
+    assert rv.status_code == 200
+    data = rv.get_json()
+    # Obergrenze aus GENERATE_ALL_MAX_WORKERS greift
+    assert data["max_workers"] == 4
+    assert data["results"][0]["status"] == "ok"
+    assert data["results"][1]["status"] == "error"
+    assert "LLM down" in data["results"][1]["error"]
+
+def test_generate_all_runs_dependency_waves(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    proj = tmp_path/"proj"
+    _write_tickets(proj, [
+        {"title": "V", "file_path": "views.py", "beschreibung": "Nutzt models.py", "anforderungen": []},
+        {"title": "M", "file_path": "models.py", "beschreibung": "", "anforderungen": []},
+    ])
+    seen = {}
+
+    def fake_code(u, k, f, t, m, dependencies=None, existing_code=None):
+        seen[t["file_path"]] = dependencies
+        return f"# {t['file_path']}"
+
+    monkeypatch.setattr("web_app.generate_tests", lambda u, k, t, m: "tests")
+    monkeypatch.setattr("web_app.generate_code_for_ticket", fake_code)
+
+    rv = client.post("/generate_all", json={"api_url": "u", "project_folder": str(proj)})
+    data = rv.get_json()
+    assert data["waves"] == [["models.py"], ["views.py"]]
+    assert [r["file_path"] for r in data["results"]] == ["views.py", "models.py"]
+    # Code der fertigen Abhängigkeit fließt in den Prompt der späteren Welle
+    assert seen == {"models.py": {}, "views.py": {"models.py": "# models.py"}}
+
+def test_generate_all_regenerate_skips_unchanged_tickets(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    proj = tmp_path/"proj"
+    tickets = [
+        {"title": "A", "file_path": "a.py", "beschreibung": "", "anforderungen": []},
+        {"title": "B", "file_path": "b.py", "beschreibung": "", "anforderungen": []},
+        {"title": "C", "file_path": "c.py", "beschreibung": "", "anforderungen": []},
+    ]
+    _write_tickets(proj, tickets)
+    calls = []
+
+    def fake_code(u, k, f, t, m, **kw):
+        calls.append(t["file_path"])
+        return f"# {t['file_path']} {t['beschreibung']}"
+
+    monkeypatch.setattr("web_app.generate_tests", lambda u, k, t, m: "tests")
+    monkeypatch.setattr("web_app.generate_code_for_ticket", fake_code)
+    body = {"api_url": "u", "project_folder": str(proj), "mode": "regenerate"}
+    assert client.post("/generate_all", json=body).get_json()["skipped"] == 0
+    assert len(calls) == 3
+
+    # b: Beschreibung geändert, c: Datei manuell verändert, a: unverändert
+    tickets[1]["beschreibung"] = "neu"
+    _write_tickets(proj, tickets)
+    (proj/"src"/"c.py").write_text("# von Hand", encoding="utf-8")
+    calls.clear()
+    data = client.post("/generate_all", json=body).get_json()
+    assert sorted(calls) == ["b.py", "c.py"]
+    assert [r["status"] for r in data["results"]] == ["skipped", "ok", "ok"]
+    assert data["skipped"] == 1
+
+    # Ohne mode wird alles neu erzeugt
+    calls.clear()
+    client.post("/generate_all", json={"api_url": "u", "project_folder": str(proj)})
+    assert len(calls) == 3
+
+def test_generate_all_async_mode_uses_async_planners(monkeypatch, app, tmp_path):
+    import asyncio
+    app.config["GENERATE_ALL_ASYNC"] = True
+    client = register_and_login(app.test_client())
+    proj = tmp_path/"proj"
+    _write_tickets(proj, [
+        {"title": "A", "file_path": "a.py", "beschreibung": "", "anforderungen": []},
+        {"title": "B", "file_path": "b.py", "beschreibung": "", "anforderungen": []},
+    ])
+    running = {"now": 0, "max": 0}
+
+    async def fake_tests(u, k, t, m):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        return "tests"
+
+    async def fake_code(u, k, f, t, m, **kw):
+        return f"# code {t['file_path']}"
+
+    monkeypatch.setattr("web_app.async_generate_tests", fake_tests)
+    monkeypatch.setattr("web_app.async_generate_code_for_ticket", fake_code)
+
+    rv = client.post("/generate_all", json={"api_url": "u", "project_folder": str(proj)})
+    assert rv.status_code == 200
+    results = rv.get_json()["results"]
+    assert [r["code"] for r in results] == ["# code a.py", "# code b.py"]
+    assert running["max"] == 2
+    assert (proj/"src"/"b.py").read_text(encoding="utf-8") == "# code b.py"
+
+def test_generate_all_reports_invalid_ticket_entries(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    proj = tmp_path/"proj"
+    _write_tickets(proj, ["kein Ticket",
+                          {"title": "A", "file_path": "a.py", "beschreibung": "", "anforderungen": []}])
+    monkeypatch.setattr("web_app.generate_tests", lambda u, k, t, m: "tests")
+    monkeypatch.setattr("web_app.generate_code_for_ticket", lambda u, k, f, t, m, **kw: "x = 1")
+
+    rv = client.post("/generate_all", json={"api_url": "u", "project_folder": str(proj)})
+    assert rv.status_code == 200
+    results = rv.get_json()["results"]
+    assert results[0]["status"] == "error"
+    assert "Ungültiger Ticket-Eintrag" in results[0]["error"]
+    assert results[1]["status"] == "ok"
+
+def test_fresh_flag_bypasses_response_cache(monkeypatch, client):
+    from core import response_cache
+    client = register_and_login(client)
+    seen = []
+
+    def fake_plan(u, k, p, m):
+        seen.append(response_cache.is_bypassed())
+        return "PLAN"
+
+    monkeypatch.setattr("web_app.generate_project_plan", fake_plan)
+    monkeypatch.setattr("web_app.create_project_structure", lambda name, base_path=None: "/tmp/proj1")
+    monkeypatch.setattr("web_app.save_plan", lambda f, t: None)
+    monkeypatch.setattr("web_app.save_response", lambda f, i, r: None)
+    body = {"api_url": "u", "project_name": "P", "project_desc": "D"}
+    assert client.post("/plan", json=body).status_code == 200
+    assert client.post("/plan", json=dict(body, fresh=True)).status_code == 200
+    assert seen == [False, True]
+
+def test_cache_stats(client):
+    client = register_and_login(client)
+    rv = client.get("/cache_stats")
+    assert rv.status_code == 200
+    assert {"hits", "misses", "memory_entries"} <= set(rv.get_json())
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_plan_stream_sends_deltas_and_done(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    monkeypatch.setattr("web_app.stream_project_plan", lambda u, k, p, m: iter(["Schritt ", "1"]))
+    monkeypatch.setattr("web_app.create_project_structure", lambda name, base_path=None: str(tmp_path))
+    rv = client.post("/plan/stream", json={"api_url": "u", "project_name": "P", "project_desc": "D"})
+    assert rv.status_code == 200
+    assert rv.mimetype == "text/event-stream"
+    events = _parse_sse(rv.get_data(as_text=True))
+    assert events[:2] == [("delta", {"text": "Schritt "}), ("delta", {"text": "1"})]
+    assert events[2] == ("done", {"plan": "Schritt 1", "project_folder": str(tmp_path)})
+    assert (tmp_path/"docs"/"plan.txt").read_text(encoding="utf-8") == "Schritt 1"
+
+def test_plan_stream_uses_final_text_and_legacy_project_field(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    seen = {}
+
+    def fake_stream(u, k, p, m):
+        seen["prompt"] = p
+        yield "Vorschau"
+        return "Endgültiger Plan"
+
+    monkeypatch.setattr("web_app.stream_project_plan", fake_stream)
+    monkeypatch.setattr("web_app.create_project_structure", lambda name, base_path=None: str(tmp_path))
+    rv = client.post("/plan/stream", json={"api_url": "u", "project": "Alt"})
+    events = _parse_sse(rv.get_data(as_text=True))
+    assert seen["prompt"] == "Alt\nAlt"
+    assert events[-1] == ("done", {"plan": "Endgültiger Plan", "project_folder": str(tmp_path)})
+
+def test_plan_stream_bad_request(client):
+    client = register_and_login(client)
+    rv = client.post("/plan/stream", json={})
+    assert rv.status_code == 400
+
+def test_tickets_stream_reports_parse_error(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    monkeypatch.setattr("web_app.stream_tickets", lambda u, k, p, m: iter(["keine ", "tickets"]))
+    rv = client.post("/tickets/stream", json={
+        "api_url": "u", "project_folder": str(tmp_path), "plan_text": "p"})
+    events = _parse_sse(rv.get_data(as_text=True))
+    assert events[-1][0] == "error"
+    assert "Kein JSON-Array" in events[-1][1]["error"]
+
+def test_tickets_stream_emits_ticket_events_incrementally(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    chunks = ['[{"title":"A","file_path":"a.py"},', ' {"title":"B",', '"file_path":"b.py"}]']
+    monkeypatch.setattr("web_app.stream_tickets", lambda u, k, p, m: iter(chunks))
+    rv = client.post("/tickets/stream", json={
+        "api_url": "u", "project_folder": str(tmp_path), "plan_text": "p"})
+    events = _parse_sse(rv.get_data(as_text=True))
+    names = [e[0] for e in events]
+    assert names == ["delta", "ticket", "delta", "delta", "ticket", "done"]
+    assert events[1][1] == {"index": 0, "ticket": {"title": "A", "file_path": "a.py"}}
+    assert len(events[-1][1]["tickets"]) == 2
+
+def test_generate_code_stream_saves_file(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    monkeypatch.setattr("web_app.stream_code_for_ticket",
+                        lambda u, k, f, t, m: iter(["```py\nx = 1\n", "```"]))
+    rv = client.post("/generate_code/stream", json={
+        "api_url": "u", "project_folder": str(tmp_path), "ticket": {"file_path": "m.py"}})
+    events = _parse_sse(rv.get_data(as_text=True))
+    assert events[-1][0] == "done"
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "x = 1\n"
+
+def test_generate_code_stream_writes_named_fences_early(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    chunks = ["```python src/util.py\ndef f():\n", "    return 1\n```\n", "```py\nfrom util import f\n```"]
+    monkeypatch.setattr("web_app.stream_code_for_ticket", lambda u, k, f, t, m: iter(chunks))
+    rv = client.post("/generate_code/stream", json={
+        "api_url": "u", "project_folder": str(tmp_path), "ticket": {"file_path": "m.py"}})
+    events = _parse_sse(rv.get_data(as_text=True))
+    names = [e[0] for e in events]
+    assert names == ["delta", "delta", "file", "delta", "done"]
+    assert events[2][1]["file_path"] == "util.py"
+    assert set(events[-1][1]["files"]) == {"m.py", "util.py"}
+    assert (tmp_path/"src"/"util.py").read_text(encoding="utf-8") == "def f():\n    return 1\n"
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "from util import f\n"
+
+def test_generate_code_patch_mode_edits_existing_file(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    (tmp_path/"src").mkdir()
+    (tmp_path/"src"/"m.py").write_text("x = 1\ny = 2\n", encoding="utf-8")
+    seen = {}
+
+    def fake_patch(u, k, f, t, m, existing, dependencies=None):
+        seen["existing"] = existing
+        return "<<<<<<< SEARCH\ny = 2\n=======\ny = 3\n>>>>>>> REPLACE"
+
+    monkeypatch.setattr("web_app.generate_code_patch", fake_patch)
+    rv = client.post("/generate_code", json={
+        "api_url": "u", "project_folder": str(tmp_path), "patch": True,
+        "ticket": {"file_path": "m.py"}})
+    assert rv.status_code == 200
+    assert rv.get_json()["edit"] == "patch"
+    assert seen["existing"] == "x = 1\ny = 2\n"
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "x = 1\ny = 3\n"
+
+def test_generate_code_patch_mode_falls_back_to_full_file(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    (tmp_path/"src").mkdir()
+    (tmp_path/"src"/"m.py").write_text("x = 1\n", encoding="utf-8")
+    seen = {}
+
+    def fake_code(u, k, f, t, m, dependencies=None, existing_code=None):
+        seen["existing_code"] = existing_code
+        return "```python\nx = 2\n```"
+
+    monkeypatch.setattr("web_app.generate_code_patch", lambda *a, **kw: "kein Patch")
+    monkeypatch.setattr("web_app.generate_code_for_ticket", fake_code)
+    rv = client.post("/generate_code", json={
+        "api_url": "u", "project_folder": str(tmp_path), "patch": True,
+        "ticket": {"file_path": "m.py"}})
+    data = rv.get_json()
+    assert data["edit"] == "full"
+    assert "Keine" in data["patch_error"]
+    assert seen["existing_code"] == "x = 1\n"
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "x = 2\n"
+
+def test_generate_code_repairs_syntax_errors(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    seen = []
+
+    def fake_repair(u, k, f, t, m, previous, errors, dependencies=None):
+        seen.append(errors)
+        return "```python\nx = 2\n```"
+
+    monkeypatch.setattr("web_app.generate_code_for_ticket", lambda *a, **kw: "```python\nx = (\n```")
+    monkeypatch.setattr("web_app.repair_code", fake_repair)
+    rv = client.post("/generate_code", json={
+        "api_url": "u", "project_folder": str(tmp_path), "ticket": {"file_path": "m.py"}})
+    data = rv.get_json()
+    assert data["repairs"] == 1
+    assert "validation_errors" not in data
+    assert seen[0].startswith("m.py: Zeile 1:")
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "x = 2\n"
+
+def test_generate_code_reports_errors_after_last_attempt(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    calls = []
+    monkeypatch.setattr("web_app.generate_code_for_ticket", lambda *a, **kw: "```python\nx = (\n```")
+    monkeypatch.setattr("web_app.repair_code", lambda *a, **kw: calls.append(1) or "```python\ny = (\n```")
+    rv = client.post("/generate_code", json={
+        "api_url": "u", "project_folder": str(tmp_path), "ticket": {"file_path": "m.py"}})
+    data = rv.get_json()
+    assert len(calls) == data["repairs"] == 2
+    assert list(data["validation_errors"]) == ["m.py"]
+    assert (tmp_path/"src"/"m.py").read_text(encoding="utf-8") == "y = (\n"
+
+def _wait_for_job(client, job_id, timeout=5):
+    import time
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("Job wurde nicht fertig")
+
+def test_jobs_run_plan_in_background(monkeypatch, client, tmp_path):
+    client = register_and_login(client)
+    seen = {}
+
+    def fake_plan(u, k, p, m):
+        seen["key"] = k
+        return "JOB_PLAN"
+
+    monkeypatch.setattr("web_app.generate_project_plan", fake_plan)
+    monkeypatch.setattr("web_app.create_project_structure", lambda name, base_path=None: str(tmp_path))
+    rv = client.post("/jobs", json={
+        "kind": "plan", "api_url": "u", "api_key": "geheim",
+        "project_name": "P", "project_desc": "D",
+    })
+    assert rv.status_code == 202
+    job_id = rv.get_json()["job_id"]
+
+    job = _wait_for_job(client, job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"plan": "JOB_PLAN", "project_folder": str(tmp_path)}
+    # Der API-Key wird im Worker aus der DB gelesen, nicht im Job gespeichert
+    assert seen["key"] == "geheim"
+
+def test_jobs_validation_and_not_found(client):
+    client = register_and_login(client)
+    assert client.post("/jobs", json={"kind": "unknown"}).status_code == 400
+    rv = client.post("/jobs", json={"kind": "code", "api_url": "u", "project_folder": "/tmp"})
+    assert rv.status_code == 400
+    assert "ticket" in rv.get_json()["error"]
+    assert client.get("/jobs/doesnotexist").status_code == 404
+    assert client.post("/jobs/doesnotexist/cancel").status_code == 404
+
+def test_route_flag_fails_over_to_other_stored_endpoint(monkeypatch, client, tmp_path):
+    from core import router
+    router.reset()
+    client = register_and_login(client)
+    monkeypatch.setattr("web_app.generate_code_for_ticket", lambda *a, **kw: "```\nx\n```")
+    for url, key, model in (("http://down", "k1", "m1"), ("http://up", "k2", "m2")):
+        client.post("/generate_code", json={
+            "api_url": url, "api_key": key, "model": model,
+            "project_folder": str(tmp_path), "ticket": {"file_path": "a.py"}})
+    monkeypatch.undo()
+
+    class Resp:
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            if "down" in self.url:
+                raise ConnectionError(self.url)
+
+        def json(self):
+            return {"result": {"content": [{"type": "text", "text": f"```\n# {self.url}\n```"}]}}
+
+    monkeypatch.setattr("core.http_client.post", lambda url, **kw: Resp(url))
+    rv = client.post("/generate_code", json={
+        "api_url": "http://down", "model": "m1", "route": True, "fresh": True,
+        "project_folder": str(tmp_path),
+        "ticket": {"title": "B", "beschreibung": "b", "anforderungen": [], "file_path": "b.py"}})
+    assert rv.status_code == 200
+    assert "http://up" in rv.get_json()["code"]
+
+    stats = client.post("/router_stats", json={"api_url": "http://down", "model": "m1"}).get_json()
+    assert [(e["api_url"], e["failures"]) for e in stats["endpoints"]] == [
+        ("http://down", 1), ("http://up", 0)]
+    router.reset()
+
+def test_rate_limit_returns_429_with_retry_after(tmp_path):
+    from core import rate_limiter
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path/'rl.db'}",
+        "SECRET_KEY": "test-secret",
+        "RATE_LIMITS": {"user_rate": 0.01, "user_burst": 1},
+    })
+    try:
+        client = register_and_login(app.test_client())
+        payload = {"api_url": "u", "project_folder": str(tmp_path), "plan_text": ""}
+        assert client.post("/tickets", json=payload).status_code == 400
+        rv = client.post("/tickets", json=payload)
+        assert rv.status_code == 429
+        assert int(rv.headers["Retry-After"]) >= 1
+        # Nicht generierende Routen sind nicht begrenzt
+        assert client.get("/cache_stats").status_code == 200
+    finally:
+        rate_limiter.configure()
+
+def test_metrics_endpoint_exposes_route_labels(monkeypatch, client, tmp_path):
+    from core import metrics
+
+    metrics.reset()
+    client = register_and_login(client)
+    monkeypatch.setattr("web_app.generate_project_plan", lambda u, k, p, m: "Plan")
+    monkeypatch.setattr("web_app.create_project_structure", lambda name, base_path=None: str(tmp_path))
+    rv = client.post("/plan", json={"api_url": "u", "project_name": "P", "project_desc": "D"})
+    assert rv.status_code == 200
+
+    rv = client.get("/metrics")
+    assert rv.status_code == 200
+    assert rv.content_type.startswith("text/plain; version=0.0.4")
+    text = rv.get_data(as_text=True)
+    assert 'projectcoder_http_requests_total{route="plan",status="200"} 1' in text
+    assert 'projectcoder_stage_seconds_count{route="plan",stage="storage.save_plan"} 1' in text
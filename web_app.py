@@ -7,7 +7,25 @@ Es beinhaltet:
 """
 
 import os
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+import json
+import math
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from contextvars import copy_context
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    redirect,
+    url_for,
+    flash,
+    g,
+    stream_with_context,
+)
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import (
     LoginManager,
@@ -17,16 +35,44 @@ from flask_login import (
     current_user,
 )
 from models import db, User, APIKey
+from jobs.job_queue import JobQueue
+from core import (
+    async_runner, context_budget, http_client, metrics, providers, rate_limiter, response_cache,
+    router, single_flight,
+)
 from storage.project_storage import create_project_structure
 from storage.plan_storage import save_plan
 from storage.ticket_storage import save_tickets
 from storage.test_storage import save_tests
-from storage.code_storage import save_code
-from storage.saver import save_response
-from planner.planner import generate_project_plan
-from planner.ticket_generator import generate_tickets
-from planner.test_generator import generate_tests
-from planner.code_generator import generate_code_for_ticket
+from storage.code_storage import (
+    save_code, save_code_files, save_code_patch, save_code_piece, split_code_files,
+)
+from storage.fence_parser import FenceStreamParser
+from storage.patcher import PatchError
+from storage.saver import save_response, query_responses
+from storage import atomic_writer, backends, blob_store, log_store
+from storage.manifest_storage import (
+    load_manifest,
+    save_manifest,
+    ticket_fingerprint,
+    is_up_to_date,
+    record_ticket,
+)
+from planner.planner import generate_project_plan, stream_project_plan
+from planner.ticket_generator import generate_tickets, stream_tickets, parse_tickets
+from planner.ticket_parser import TicketStreamParser
+from planner.scheduler import find_dependencies, build_waves
+from planner.test_generator import generate_tests, async_generate_tests
+from planner.code_generator import (
+    generate_code_for_ticket,
+    async_generate_code_for_ticket,
+    generate_code_patch,
+    async_generate_code_patch,
+    repair_code,
+    async_repair_code,
+    stream_code_for_ticket,
+)
+from planner import code_validator
 from scripts.gitlab_issues import create_issues_from_tickets
 
 
@@ -46,9 +92,40 @@ def create_app(config: dict = None) -> Flask:
         SECRET_KEY="replace-with-your-secret",
         SQLALCHEMY_DATABASE_URI="sqlite:///users.db",
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        GENERATE_ALL_MAX_WORKERS=4,
+        GENERATE_ALL_ASYNC=False,
+        JOB_WORKERS=2,
+        JOB_RECOVER_ON_START=False,
+        GITLAB_EXPORT_WORKERS=4,
+        LLM_ROUTING={},
+        CODE_PATCH_MODE=False,
     )
     if config:
         app.config.update(config)
+    if app.config.get("HTTP_CLIENT"):
+        http_client.configure(**app.config["HTTP_CLIENT"])
+    if app.config.get("LLM_PROVIDERS"):
+        providers.configure(**app.config["LLM_PROVIDERS"])
+    if app.config.get("RATE_LIMITS"):
+        rate_limiter.configure(**app.config["RATE_LIMITS"])
+    if app.config.get("SINGLE_FLIGHT"):
+        single_flight.configure(**app.config["SINGLE_FLIGHT"])
+    if app.config.get("LLM_CACHE"):
+        response_cache.configure(**app.config["LLM_CACHE"])
+    if app.config.get("STORAGE_BACKEND"):
+        backends.configure(**app.config["STORAGE_BACKEND"])
+    if app.config.get("STORAGE_WRITES"):
+        atomic_writer.configure(**app.config["STORAGE_WRITES"])
+    if app.config.get("BLOB_STORE"):
+        blob_store.configure(**app.config["BLOB_STORE"])
+    if app.config.get("LOG_STORE"):
+        log_store.configure(**app.config["LOG_STORE"])
+    if app.config.get("METRICS"):
+        metrics.configure(**app.config["METRICS"])
+    if app.config.get("CONTEXT_BUDGET"):
+        context_budget.configure(**app.config["CONTEXT_BUDGET"])
+    if app.config.get("CODE_VALIDATION"):
+        code_validator.configure(**app.config["CODE_VALIDATION"])
 
     db.init_app(app)
     login_mgr = LoginManager()
@@ -63,6 +140,52 @@ def create_app(config: dict = None) -> Flask:
         """Callback für flask-login, um den aktuellen Benutzer anhand seiner ID zu laden."""
         return User.query.get(int(user_id))
 
+    # Routen, die LLM-Aufrufe auslösen und daher dem Rate-Limit unterliegen
+    rate_limited_routes = {
+        "plan", "tickets", "gen_tests", "gen_code", "plan_stream", "tickets_stream",
+        "gen_code_stream", "gen_all", "submit_job",
+    }
+
+    @app.before_request
+    def start_metrics():
+        """Setzt das Label `route` für alle Metriken des Requests und startet die Zeitmessung."""
+        g.metrics_scope = ExitStack()
+        g.metrics_scope.enter_context(metrics.bind(route=request.endpoint or "unknown"))
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_metrics(response: Response) -> Response:
+        if "metrics_start" in g:
+            metrics.observe("http_request_seconds", time.perf_counter() - g.metrics_start)
+            metrics.inc("http_requests_total", status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def stop_metrics(exc=None) -> None:
+        scope = g.pop("metrics_scope", None)
+        if scope is not None:
+            scope.close()
+
+    @app.before_request
+    def check_rate_limit():
+        """Lehnt Generierungs-Requests ab, wenn der User oder die API-URL ihr Limit erreicht hat."""
+        if request.endpoint not in rate_limited_routes or not current_user.is_authenticated:
+            return None
+        data = request.get_json(silent=True) or {}
+        api_url = data.get("api_url", "")
+        rate_limiter.get_limiter().admit(
+            current_user.id, api_url.strip() if isinstance(api_url, str) else ""
+        )
+        return None
+
+    @app.errorhandler(rate_limiter.RateLimitExceeded)
+    def rate_limit_exceeded(e: rate_limiter.RateLimitExceeded):
+        """Antwortet auf überschrittene Limits mit 429 und `Retry-After`."""
+        response = jsonify(error=str(e))
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+        return response
+
     @app.route("/register", methods=["GET", "POST"])
     def register():
         """
@@ -146,13 +269,85 @@ def create_app(config: dict = None) -> Flask:
             db.session.commit()
             return provided_key
 
-        rec = APIKey.query.filter_by(user_id=current_user.id, api_url=api_url).first()
+        return _lookup_api_key(current_user.id, api_url)
+
+    def _lookup_api_key(user_id: int, api_url: str) -> str:
+        """Liest den gespeicherten API-Key eines Users für eine API-URL (oder "")."""
+        rec = APIKey.query.filter_by(user_id=user_id, api_url=api_url).first()
         return rec.api_key_value if rec else ""
 
-    @app.route("/plan", methods=["POST"])
-    @login_required
-    def plan():
-        data = request.json or {}
+    def _router_for(user_id: int, data: dict) -> router.Router:
+        """
+        Baut einen Router über alle gespeicherten Endpunkte eines Users.
+
+        Der Endpunkt der Anfrage steht an erster Stelle; weitere `APIKey`-Einträge
+        werden mit ihrem eigenen Modell ergänzt. Die Optionen stammen aus `LLM_ROUTING`.
+        """
+        api_url = data.get("api_url", "")
+        endpoints = []
+        if api_url:
+            endpoints.append(router.get_endpoint(
+                api_url, _lookup_api_key(user_id, api_url), data.get("model", "")
+            ))
+        for rec in APIKey.query.filter_by(user_id=user_id).all():
+            endpoint = router.get_endpoint(rec.api_url, rec.api_key_value, rec.model or "")
+            if endpoint not in endpoints:
+                endpoints.append(endpoint)
+        return router.Router(endpoints, **app.config["LLM_ROUTING"])
+
+    def _llm_scope(data: dict, user_id: int = None):
+        """
+        Liefert den Kontext für LLM-Aufrufe eines Requests.
+
+        Bei `"fresh": true` im Request-Body wird der Antwort-Cache umgangen,
+        um eine neue Antwort vom LLM zu erzwingen. Bei `"route": true` werden die
+        Aufrufe über `core.router` auf alle Endpunkte des Users verteilt. Alle
+        Aufrufe zählen für die Limits aus `core.rate_limiter` zum jeweiligen User.
+        """
+        uid = user_id if user_id is not None else current_user.id
+        scope = ExitStack()
+        scope.enter_context(rate_limiter.scope(uid))
+        if data.get("fresh"):
+            scope.enter_context(response_cache.bypass())
+        if data.get("route"):
+            scope.enter_context(router.use(_router_for(uid, data)))
+        return scope
+
+    def _sse(event: str, data: dict) -> str:
+        """Formatiert ein Server-Sent-Event mit JSON-Nutzdaten."""
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def _sse_response(events) -> Response:
+        """Liefert einen Event-Stream, der ohne Proxy-Pufferung an den Browser geht."""
+        return Response(
+            stream_with_context(events),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def _relay(stream, result: dict):
+        """
+        Reicht die Textstücke eines Streams weiter und legt anschließend den
+        maßgeblichen Gesamttext (Rückgabewert des Streams) unter `result["text"]` ab.
+        """
+        chunks = []
+        iterator = iter(stream)
+        while True:
+            try:
+                chunk = next(iterator)
+            except StopIteration as stop:
+                result["text"] = stop.value if stop.value is not None else "".join(chunks)
+                return
+            chunks.append(chunk)
+            yield chunk
+
+    def _plan_inputs(data: dict) -> tuple:
+        """
+        Liest die Eingaben für `/plan` und `/plan/stream`.
+
+        Returns:
+            tuple: (api_url, api_key, model, name, desc, base_path)
+        """
         api_url = data.get("api_url", "").strip()
         api_key = data.get("api_key", "").strip()
         model = data.get("model", "").strip()
@@ -167,6 +362,222 @@ def create_app(config: dict = None) -> Flask:
                 name = project
             if not desc:
                 desc = project
+        return api_url, api_key, model, name, desc, base_path
+
+    @app.route("/cache_stats")
+    @login_required
+    def cache_stats():
+        """Liefert Treffer-/Fehlzähler und Belegung des LLM-Antwort-Caches sowie geteilte Aufrufe."""
+        return jsonify(dict(response_cache.get_cache().stats(), single_flight=single_flight.stats())), 200
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        """
+        Liefert alle Metriken aus `core.metrics` im Prometheus-Textformat.
+
+        Die Route ist ohne Login erreichbar, damit Prometheus sie abfragen kann;
+        sie enthält keine API-Schlüssel, aber API-URLs und Modellnamen.
+        """
+        return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.route("/router_stats", methods=["POST"])
+    @login_required
+    def router_stats():
+        """Liefert Last, Latenz und Circuit-Breaker-Zustand aller Endpunkte des Users."""
+        data = request.json or {}
+        return jsonify(endpoints=_router_for(current_user.id, data).stats()), 200
+
+    def _not_cancelled() -> None:
+        """Platzhalter für `check_cancelled` bei synchronen Requests."""
+
+    def _run_plan(
+        api_url: str, key: str, model: str, name: str, desc: str, base_path: str = "",
+        check_cancelled=_not_cancelled,
+    ) -> dict:
+        """Legt den Projektordner an, generiert den Plan und speichert ihn."""
+        # create_project_structure nimmt optional einen Basis-Pfad entgegen
+        if base_path:
+            project_folder = create_project_structure(name, base_path)
+        else:
+            project_folder = create_project_structure(name)
+        project_text = f"{name}\n{desc}"
+        plan_text = generate_project_plan(api_url, key, project_text, model)
+        check_cancelled()
+
+        save_plan(project_folder, plan_text)
+        save_response(project_folder, project_text, plan_text)
+        return {"plan": plan_text, "project_folder": project_folder}
+
+    def _run_tickets(
+        api_url: str, key: str, model: str, project_folder: str, plan_text: str,
+        check_cancelled=_not_cancelled,
+    ) -> dict:
+        """Generiert Tickets aus dem Plan und speichert sie."""
+        tickets = generate_tickets(api_url, key, plan_text, model)
+        check_cancelled()
+        save_tickets(project_folder, tickets)
+        save_response(project_folder, plan_text, str(tickets))
+        return {"tickets": tickets}
+
+    def _run_tests(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict,
+        check_cancelled=_not_cancelled,
+    ) -> dict:
+        """Generiert Tests für ein Ticket und speichert sie."""
+        tests_md = generate_tests(api_url, key, ticket, model)
+        check_cancelled()
+        tests_file = save_tests(project_folder, ticket["file_path"], tests_md)
+        save_response(project_folder, ticket["file_path"], tests_md, ticket=ticket["file_path"])
+        return {"tests": tests_md, "saved_test": tests_file}
+
+    def _patch_mode(data: dict) -> bool:
+        """Patch-Modus laut Request (`"patch": true/false`), sonst laut `CODE_PATCH_MODE`."""
+        patch = data.get("patch")
+        return app.config["CODE_PATCH_MODE"] if patch is None else bool(patch)
+
+    def _existing_code(project_folder: str, file_path: str):
+        """Liefert den bisherigen Inhalt von `src/<file_path>` oder None, wenn es keinen gibt."""
+        try:
+            code = backends.get_backend().read_text(project_folder, f"src/{file_path}")
+        except (OSError, ValueError):
+            return None
+        return code if code.strip() else None
+
+    def _code_errors(code_md: str, file_path: str) -> dict:
+        """Syntaxfehler je Datei einer Antwort (`planner.code_validator`)."""
+        return code_validator.validate_files(split_code_files(code_md, file_path))
+
+    def _validation_fields(repairs: int, errors: dict) -> dict:
+        """Ergebnisfelder der Prüfung: `repairs` und verbliebene `validation_errors`."""
+        fields = {}
+        if repairs:
+            fields["repairs"] = repairs
+        if errors:
+            fields["validation_errors"] = errors
+        return fields
+
+    def _validate_code(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict, code_md: str,
+        check_cancelled=_not_cancelled, dependencies: dict = None,
+    ):
+        """
+        Prüft den generierten Code vor dem Speichern auf Syntaxfehler und fordert
+        ihn mit den Fehlermeldungen neu an, höchstens `max_attempts` Mal
+        (`planner.code_validator`). Bleiben Fehler, wird die letzte Antwort trotzdem
+        gespeichert und die Fehler im Ergebnis gemeldet.
+
+        Returns:
+            Tuple[str, dict]: Die letzte Antwort und die Felder aus `_validation_fields`.
+        """
+        file_path = ticket["file_path"]
+        errors, repairs = _code_errors(code_md, file_path), 0
+        while errors and repairs < code_validator.max_attempts():
+            save_response(project_folder, file_path, code_md, ticket=file_path)
+            code_md = repair_code(
+                api_url, key, project_folder, ticket, model, code_md,
+                code_validator.format_errors(errors), dependencies=dependencies,
+            )
+            check_cancelled()
+            repairs += 1
+            errors = _code_errors(code_md, file_path)
+        return code_md, _validation_fields(repairs, errors)
+
+    async def _validate_code_async(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict, code_md: str,
+        dependencies: dict = None,
+    ):
+        """Asynchrone Variante von `_validate_code`."""
+        file_path = ticket["file_path"]
+        errors, repairs = _code_errors(code_md, file_path), 0
+        while errors and repairs < code_validator.max_attempts():
+            save_response(project_folder, file_path, code_md, ticket=file_path)
+            code_md = await async_repair_code(
+                api_url, key, project_folder, ticket, model, code_md,
+                code_validator.format_errors(errors), dependencies=dependencies,
+            )
+            repairs += 1
+            errors = _code_errors(code_md, file_path)
+        return code_md, _validation_fields(repairs, errors)
+
+    def _run_code(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict,
+        check_cancelled=_not_cancelled, dependencies: dict = None, patch: bool = False,
+    ) -> dict:
+        """
+        Generiert Code für ein Ticket (optional mit Code der Abhängigkeiten) und speichert ihn.
+
+        Im Patch-Modus wird für eine bereits vorhandene Datei nur ein Patch
+        angefordert und angewendet (`edit: "patch"`). Lässt er sich nicht
+        anwenden, wird die Datei mit ihrem bisherigen Inhalt als Kontext
+        vollständig neu generiert (`edit: "full"`, Grund in `patch_error`).
+
+        Vollständig generierter Code wird vor dem Speichern geprüft und bei
+        Syntaxfehlern neu angefordert, siehe `_validate_code`.
+        """
+        existing = _existing_code(project_folder, ticket["file_path"]) if patch else None
+        patch_error = None
+        if existing is not None:
+            patch_md = generate_code_patch(
+                api_url, key, project_folder, ticket, model, existing, dependencies=dependencies
+            )
+            check_cancelled()
+            save_response(project_folder, ticket["file_path"], patch_md, ticket=ticket["file_path"])
+            try:
+                code_file = save_code_patch(project_folder, ticket["file_path"], patch_md)
+                return {"code": patch_md, "edit": "patch", "saved_to": code_file}
+            except PatchError as e:
+                patch_error = str(e)
+        code_md = generate_code_for_ticket(
+            api_url, key, project_folder, ticket, model,
+            dependencies=dependencies, existing_code=existing,
+        )
+        check_cancelled()
+        code_md, validation = _validate_code(
+            api_url, key, model, project_folder, ticket, code_md, check_cancelled, dependencies
+        )
+        code_file = save_code(project_folder, ticket["file_path"], code_md)
+        save_response(project_folder, ticket["file_path"], code_md, ticket=ticket["file_path"])
+        result = {"code": code_md, "saved_to": code_file, **validation}
+        if existing is not None:
+            result.update(edit="full", patch_error=patch_error)
+        return result
+
+    async def _run_code_async(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict,
+        dependencies: dict = None, patch: bool = False,
+    ) -> dict:
+        """Asynchrone Variante von `_run_code` für `GENERATE_ALL_ASYNC`."""
+        existing = _existing_code(project_folder, ticket["file_path"]) if patch else None
+        patch_error = None
+        if existing is not None:
+            patch_md = await async_generate_code_patch(
+                api_url, key, project_folder, ticket, model, existing, dependencies=dependencies
+            )
+            save_response(project_folder, ticket["file_path"], patch_md, ticket=ticket["file_path"])
+            try:
+                code_file = save_code_patch(project_folder, ticket["file_path"], patch_md)
+                return {"code": patch_md, "edit": "patch", "saved_to": code_file}
+            except PatchError as e:
+                patch_error = str(e)
+        code_md = await async_generate_code_for_ticket(
+            api_url, key, project_folder, ticket, model,
+            dependencies=dependencies, existing_code=existing,
+        )
+        code_md, validation = await _validate_code_async(
+            api_url, key, model, project_folder, ticket, code_md, dependencies
+        )
+        code_file = save_code(project_folder, ticket["file_path"], code_md)
+        save_response(project_folder, ticket["file_path"], code_md, ticket=ticket["file_path"])
+        result = {"code": code_md, "saved_to": code_file, **validation}
+        if existing is not None:
+            result.update(edit="full", patch_error=patch_error)
+        return result
+
+    @app.route("/plan", methods=["POST"])
+    @login_required
+    def plan():
+        data = request.json or {}
+        api_url, api_key, model, name, desc, base_path = _plan_inputs(data)
 
         # Validierung: API-URL, Name und Beschreibung erforderlich
         if not api_url or not name or not desc:
@@ -174,17 +585,9 @@ def create_app(config: dict = None) -> Flask:
 
         key = _get_api_key(api_url, api_key, model)
         try:
-            # create_project_structure nimmt optional einen Basis-Pfad entgegen
-            if base_path:
-                project_folder = create_project_structure(name, base_path)
-            else:
-                project_folder = create_project_structure(name)
-            project_text = f"{name}\n{desc}"
-            plan_text = generate_project_plan(api_url, key, project_text, model)
-
-            save_plan(project_folder, plan_text)
-            save_response(project_folder, project_text, plan_text)
-            return jsonify({"plan": plan_text, "project_folder": project_folder}), 200
+            with _llm_scope(data):
+                result = _run_plan(api_url, key, model, name, desc, base_path)
+            return jsonify(result), 200
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -208,10 +611,9 @@ def create_app(config: dict = None) -> Flask:
 
         key = _get_api_key(api_url, api_key, model)
         try:
-            tickets = generate_tickets(api_url, key, plan_text, model)
-            save_tickets(project_folder, tickets)
-            save_response(project_folder, plan_text, str(tickets))
-            return jsonify(tickets=tickets), 200
+            with _llm_scope(data):
+                result = _run_tickets(api_url, key, model, project_folder, plan_text)
+            return jsonify(result), 200
         except ValueError as e:
             return jsonify(error=str(e)), 500
         except Exception:
@@ -236,10 +638,9 @@ def create_app(config: dict = None) -> Flask:
 
         key = _get_api_key(api_url, api_key, model)
         try:
-            tests_md = generate_tests(api_url, key, ticket_obj, model)
-            tests_file = save_tests(project_folder, ticket_obj["file_path"], tests_md)
-            save_response(project_folder, ticket_obj["file_path"], tests_md)
-            return jsonify(tests=tests_md, saved_test=tests_file), 200
+            with _llm_scope(data):
+                result = _run_tests(api_url, key, model, project_folder, ticket_obj)
+            return jsonify(result), 200
         except Exception as e:
             return jsonify(error=str(e)), 500
 
@@ -249,6 +650,115 @@ def create_app(config: dict = None) -> Flask:
         """
         Generiert Code für ein einzelnes Ticket,
         speichert die Datei und gibt Pfad & Inhalt zurück.
+
+        Mit `"patch": true` (bzw. `CODE_PATCH_MODE`) wird eine bestehende Datei
+        nur über einen Patch geändert, siehe `_run_code`.
+        """
+        data = request.json or {}
+        api_url = data.get("api_url", "").strip()
+        api_key = data.get("api_key", "").strip()
+        model = data.get("model", "").strip()
+        project_folder = data.get("project_folder", "").strip()
+        ticket_obj = data.get("ticket")
+
+        if not api_url or not project_folder or not ticket_obj:
+            return jsonify(error="API-URL, Projektordner und Ticket erforderlich."), 400
+
+        key = _get_api_key(api_url, api_key, model)
+        try:
+            with _llm_scope(data):
+                result = _run_code(
+                    api_url, key, model, project_folder, ticket_obj, patch=_patch_mode(data)
+                )
+            return jsonify(result), 200
+        except Exception as e:
+            return jsonify(error=str(e)), 500
+
+    @app.route("/plan/stream", methods=["POST"])
+    @login_required
+    def plan_stream():
+        """
+        Streaming-Variante von `/plan`: sendet den Plan als `delta`-Events, sobald
+        Text eintrifft, und abschließend ein `done`-Event mit Plan und Projektordner.
+        """
+        data = request.json or {}
+        api_url, api_key, model, name, desc, base_path = _plan_inputs(data)
+
+        if not api_url or not name or not desc:
+            return jsonify({"error": "API-URL, Projektname & Beschreibung nötig"}), 400
+
+        key = _get_api_key(api_url, api_key, model)
+
+        def events():
+            try:
+                if base_path:
+                    project_folder = create_project_structure(name, base_path)
+                else:
+                    project_folder = create_project_structure(name)
+                project_text = f"{name}\n{desc}"
+                final = {}
+                with _llm_scope(data):
+                    stream = stream_project_plan(api_url, key, project_text, model)
+                    for chunk in _relay(stream, final):
+                        yield _sse("delta", {"text": chunk})
+                plan_text = final["text"]
+                save_plan(project_folder, plan_text)
+                save_response(project_folder, project_text, plan_text)
+                yield _sse("done", {"plan": plan_text, "project_folder": project_folder})
+            except Exception as e:
+                yield _sse("error", {"error": str(e)})
+
+        return _sse_response(events())
+
+    @app.route("/tickets/stream", methods=["POST"])
+    @login_required
+    def tickets_stream():
+        """
+        Streaming-Variante von `/tickets`: sendet die Roh-Antwort als `delta`-Events,
+        jedes vollständig empfangene Ticket sofort als `ticket`-Event und nach dem
+        Parsen ein `done`-Event mit der Ticket-Liste.
+        """
+        data = request.json or {}
+        api_url = data.get("api_url", "").strip()
+        api_key = data.get("api_key", "").strip()
+        model = data.get("model", "").strip()
+        project_folder = data.get("project_folder", "").strip()
+        plan_text = data.get("plan_text", "").strip()
+
+        if not api_url or not project_folder or not plan_text:
+            return jsonify(error="Fehlende Daten"), 400
+
+        key = _get_api_key(api_url, api_key, model)
+
+        def events():
+            try:
+                final, parser, index = {}, TicketStreamParser(), 0
+                with _llm_scope(data):
+                    for chunk in _relay(stream_tickets(api_url, key, plan_text, model), final):
+                        yield _sse("delta", {"text": chunk})
+                        for ticket in parser.feed(chunk):
+                            yield _sse("ticket", {"index": index, "ticket": ticket})
+                            index += 1
+                tickets = parse_tickets(final["text"])
+                save_tickets(project_folder, tickets)
+                save_response(project_folder, plan_text, str(tickets))
+                yield _sse("done", {"tickets": tickets})
+            except Exception as e:
+                yield _sse("error", {"error": str(e)})
+
+        return _sse_response(events())
+
+    @app.route("/generate_code/stream", methods=["POST"])
+    @login_required
+    def gen_code_stream():
+        """
+        Streaming-Variante von `/generate_code`: sendet den Code als `delta`-Events
+        und nach dem Speichern ein `done`-Event mit Inhalt und Dateipfad.
+
+        Benennt die Antwort in ihren Fences weitere Dateien, wird jede gespeichert,
+        sobald ihr Block geschlossen ist, und als `file`-Event gemeldet; `files`
+        im `done`-Event listet alle geschriebenen Dateien. Syntaxfehler werden
+        dort als `validation_errors` gemeldet, aber nicht automatisch repariert.
         """
         data = request.json or {}
         api_url = data.get("api_url", "").strip()
@@ -261,15 +771,320 @@ def create_app(config: dict = None) -> Flask:
             return jsonify(error="API-URL, Projektordner und Ticket erforderlich."), 400
 
         key = _get_api_key(api_url, api_key, model)
+
+        def events():
+            try:
+                final, file_path = {}, ticket_obj["file_path"]
+                parser = FenceStreamParser()
+                with _llm_scope(data):
+                    stream = stream_code_for_ticket(api_url, key, project_folder, ticket_obj, model)
+                    for chunk in _relay(stream, final):
+                        yield _sse("delta", {"text": chunk})
+                        for piece in parser.feed(chunk):
+                            written = save_code_piece(project_folder, file_path, piece)
+                            if written:
+                                yield _sse("file", {"file_path": written[0], "saved_to": written[1]})
+                code_md = final["text"]
+                files = save_code_files(project_folder, file_path, code_md)
+                save_response(project_folder, file_path, code_md, ticket=file_path)
+                done = {"code": code_md, "saved_to": files[file_path], "files": files}
+                done.update(_validation_fields(0, _code_errors(code_md, file_path)))
+                yield _sse("done", done)
+            except Exception as e:
+                yield _sse("error", {"error": str(e)})
+
+        return _sse_response(events())
+
+    def _generate_ticket(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict,
+        dependencies: dict = None, patch: bool = False,
+    ) -> dict:
+        """
+        Erzeugt Tests und Code für ein einzelnes Ticket und speichert beides.
+
+        Fehler werden nicht weitergereicht, sondern im Ergebnis vermerkt, damit
+        ein fehlerhaftes Ticket die übrigen Tickets eines Batches nicht abbricht.
+
+        Returns:
+            dict: Ergebnis mit `file_path`, `status` sowie Tests/Code und Pfaden
+                  oder `error` im Fehlerfall.
+        """
+        if not isinstance(ticket, dict):
+            return {"title": None, "file_path": None, "status": "error",
+                    "error": f"Ungültiger Ticket-Eintrag: {ticket!r}"}
+        result = {"title": ticket.get("title"), "file_path": ticket.get("file_path")}
         try:
-            code_md = generate_code_for_ticket(
-                api_url, key, project_folder, ticket_obj, model
+            result.update(_run_tests(api_url, key, model, project_folder, ticket))
+            result.update(_run_code(
+                api_url, key, model, project_folder, ticket,
+                dependencies=dependencies, patch=patch,
+            ))
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        return result
+
+    async def _generate_ticket_async(
+        api_url: str, key: str, model: str, project_folder: str, ticket: dict,
+        dependencies: dict, semaphore: asyncio.Semaphore, patch: bool = False,
+    ) -> dict:
+        """
+        Asynchrone Variante von `_generate_ticket` für `GENERATE_ALL_ASYNC`.
+
+        Die LLM-Aufrufe laufen über `async_send_llm_request`; das Semaphor begrenzt
+        die Anzahl gleichzeitig bearbeiteter Tickets auf `max_workers`.
+        """
+        if not isinstance(ticket, dict):
+            return {"title": None, "file_path": None, "status": "error",
+                    "error": f"Ungültiger Ticket-Eintrag: {ticket!r}"}
+        result = {"title": ticket.get("title"), "file_path": ticket.get("file_path")}
+        async with semaphore:
+            try:
+                tests_md = await async_generate_tests(api_url, key, ticket, model)
+                result["tests"] = tests_md
+                result["saved_test"] = save_tests(project_folder, ticket["file_path"], tests_md)
+                save_response(project_folder, ticket["file_path"], tests_md, ticket=ticket["file_path"])
+                result.update(await _run_code_async(
+                    api_url, key, model, project_folder, ticket,
+                    dependencies=dependencies, patch=patch,
+                ))
+                result["status"] = "ok"
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+        return result
+
+    def _wave_dependencies(tickets: list, deps: dict, finished: dict, index: int) -> dict:
+        """Liefert den Code aller bereits erfolgreich generierten Abhängigkeiten eines Tickets."""
+        paths = (tickets[j]["file_path"] for j in sorted(deps.get(index, ())))
+        return {path: finished[path] for path in paths if path in finished}
+
+    def _record_finished(finished: dict, project_folder: str, result: dict) -> None:
+        """Merkt sich den gespeicherten Code eines fertigen Tickets für spätere Wellen."""
+        if result.get("status") in ("ok", "skipped"):
+            try:
+                finished[result["file_path"]] = backends.get_backend().read_text(
+                    project_folder, f"src/{result['file_path']}"
+                )
+            except (OSError, ValueError):
+                pass
+
+    async def _generate_wave_async(
+        api_url: str, key: str, model: str, project_folder: str, tickets: list,
+        pending: dict, max_workers: int, patch: bool = False,
+    ) -> dict:
+        """Bearbeitet die Tickets einer Welle nebenläufig auf der Event-Loop von `core.async_runner`."""
+        semaphore = asyncio.Semaphore(max_workers)
+        indices = list(pending)
+        wave_results = await asyncio.gather(*(
+            _generate_ticket_async(
+                api_url, key, model, project_folder, tickets[i], pending[i], semaphore, patch
             )
-            code_file = save_code(project_folder, ticket_obj["file_path"], code_md)
-            save_response(project_folder, ticket_obj["file_path"], code_md)
-            return jsonify(code=code_md, saved_to=code_file), 200
+            for i in indices
+        ))
+        return dict(zip(indices, wave_results))
+
+    @app.route("/generate_all", methods=["POST"])
+    @login_required
+    def gen_all():
+        """
+        Generiert Tests und Code für alle Tickets aus `tickets/tickets.json`
+        parallel über einen begrenzten Worker-Pool.
+
+        Die Tickets werden über `planner.scheduler` in Wellen eingeteilt: Tickets
+        einer Welle hängen nicht voneinander ab und laufen parallel; der Code
+        fertiger Abhängigkeiten fließt in die Prompts späterer Wellen ein.
+
+        Die Anzahl paralleler Tickets wird über `max_workers` im Request gesteuert
+        und durch `GENERATE_ALL_MAX_WORKERS` nach oben begrenzt. Die Ergebnisse
+        werden in Ticket-Reihenfolge zurückgegeben, `waves` enthält den Ablaufplan
+        als Listen von Dateipfaden.
+
+        Mit `mode: "regenerate"` werden Tickets übersprungen, deren Prompt-Eingaben
+        laut Manifest (`storage.manifest_storage`) unverändert sind und deren Datei
+        unter `src/` seit der letzten Generierung nicht verändert wurde.
+
+        Mit `GENERATE_ALL_ASYNC=True` laufen die Tickets statt im Thread-Pool als
+        Koroutinen auf einer gemeinsamen Event-Loop (`core.async_runner`).
+
+        Die Dateien einer Welle werden gesammelt festgeschrieben
+        (`storage.atomic_writer.group_commit`).
+
+        Mit `"patch": true` (bzw. `CODE_PATCH_MODE`) werden bereits vorhandene
+        Dateien nur über Patches geändert, siehe `_run_code`.
+        """
+        data = request.json or {}
+        api_url = data.get("api_url", "").strip()
+        api_key = data.get("api_key", "").strip()
+        model = data.get("model", "").strip()
+        project_folder = data.get("project_folder", "").strip()
+
+        if not api_url or not project_folder:
+            return jsonify(error="API-URL und Projektordner erforderlich."), 400
+
+        backend = backends.get_backend()
+        if not backend.exists(project_folder, "tickets/tickets.json"):
+            return jsonify(error="tickets.json nicht gefunden."), 400
+
+        limit = app.config["GENERATE_ALL_MAX_WORKERS"]
+        try:
+            max_workers = int(data.get("max_workers") or limit)
+        except (TypeError, ValueError):
+            return jsonify(error="max_workers muss eine Zahl sein."), 400
+        max_workers = max(1, min(max_workers, limit))
+
+        key = _get_api_key(api_url, api_key, model)
+        try:
+            ticket_list = json.loads(backend.read_text(project_folder, "tickets/tickets.json"))
         except Exception as e:
             return jsonify(error=str(e)), 500
+        if not isinstance(ticket_list, list):
+            return jsonify(error="tickets.json muss eine Liste enthalten."), 400
+
+        deps = find_dependencies(
+            ticket_list, read_source=lambda path: backend.read_text(project_folder, f"src/{path}")
+        )
+        waves = build_waves(len(ticket_list), deps)
+        plan = [
+            [ticket_list[i].get("file_path") if isinstance(ticket_list[i], dict) else None
+             for i in wave]
+            for wave in waves
+        ]
+
+        regenerate = data.get("mode") == "regenerate"
+        patch = _patch_mode(data)
+        manifest = load_manifest(project_folder)
+        use_async = app.config["GENERATE_ALL_ASYNC"]
+        results, finished = [None] * len(ticket_list), {}
+        pool_scope = nullcontext() if use_async else ThreadPoolExecutor(max_workers=max_workers)
+        with _llm_scope(data), pool_scope as pool:
+            for wave in waves:
+                # Abhängigkeiten und Fingerabdrücke stehen erst nach der vorigen Welle fest
+                pending, fingerprints = {}, {}
+                for i in wave:
+                    ticket = ticket_list[i]
+                    dependencies = _wave_dependencies(ticket_list, deps, finished, i)
+                    if isinstance(ticket, dict) and ticket.get("file_path"):
+                        fingerprints[i] = ticket_fingerprint(ticket, model, dependencies)
+                        if regenerate and is_up_to_date(
+                            manifest, project_folder, ticket, fingerprints[i]
+                        ):
+                            results[i] = {
+                                "title": ticket.get("title"),
+                                "file_path": ticket["file_path"],
+                                "status": "skipped",
+                                "saved_to": backend.locator(
+                                    project_folder, f"src/{ticket['file_path']}"
+                                ),
+                            }
+                            _record_finished(finished, project_folder, results[i])
+                            continue
+                    pending[i] = dependencies
+
+                # Dateien der Welle werden gemeinsam festgeschrieben, bevor die
+                # nächste Welle sie als Abhängigkeiten liest
+                with atomic_writer.group_commit():
+                    if use_async:
+                        wave_results = async_runner.run(_generate_wave_async(
+                            api_url, key, model, project_folder, ticket_list, pending, max_workers,
+                            patch,
+                        ))
+                    else:
+                        # Jeder Task erhält eine Kopie des Request-Kontexts (z. B. Cache-Bypass)
+                        futures = {
+                            i: pool.submit(
+                                copy_context().run,
+                                _generate_ticket, api_url, key, model, project_folder,
+                                ticket_list[i], dependencies, patch,
+                            )
+                            for i, dependencies in pending.items()
+                        }
+                        wave_results = {i: f.result() for i, f in futures.items()}
+
+                for i, result in wave_results.items():
+                    results[i] = result
+                    _record_finished(finished, project_folder, result)
+                    if result["status"] == "ok" and i in fingerprints:
+                        record_ticket(manifest, project_folder, ticket_list[i], fingerprints[i])
+                save_manifest(project_folder, manifest)
+
+        skipped = sum(1 for r in results if r["status"] == "skipped")
+        return jsonify(results=results, max_workers=max_workers, waves=plan, skipped=skipped), 200
+
+    job_queue = JobQueue(app, max_workers=app.config["JOB_WORKERS"])
+    app.extensions["job_queue"] = job_queue
+
+    # Pflichtfelder (neben api_url) und Ausführung je Job-Art
+    job_kinds = {
+        "plan": (("project_name", "project_desc"), lambda p, args, check: _run_plan(
+            *args, p["project_name"], p["project_desc"], p.get("project_path", ""), check)),
+        "tickets": (("project_folder", "plan_text"), lambda p, args, check: _run_tickets(
+            *args, p["project_folder"], p["plan_text"], check)),
+        "tests": (("project_folder", "ticket"), lambda p, args, check: _run_tests(
+            *args, p["project_folder"], p["ticket"], check)),
+        "code": (("project_folder", "ticket"), lambda p, args, check: _run_code(
+            *args, p["project_folder"], p["ticket"], check, patch=_patch_mode(p))),
+    }
+
+    def _job_handler(run):
+        """Erzeugt einen Job-Handler, der den API-Key im Worker aus der DB liest."""
+        def handler(params: dict, check_cancelled) -> dict:
+            key = _lookup_api_key(params["user_id"], params["api_url"])
+            args = (params["api_url"], key, params.get("model", ""))
+            with _llm_scope(params, params["user_id"]):
+                return run(params, args, check_cancelled)
+        return handler
+
+    for kind, (_, run) in job_kinds.items():
+        job_queue.register(kind, _job_handler(run))
+
+    @app.route("/jobs", methods=["POST"])
+    @login_required
+    def submit_job():
+        """
+        Reiht eine Generierung (`kind`: plan, tickets, tests oder code) als
+        Hintergrund-Job ein und antwortet sofort mit der Job-ID.
+
+        Die übrigen Felder entsprechen denen der synchronen Routen. Der API-Key
+        wird nicht im Job gespeichert, sondern im Worker aus der DB gelesen.
+        """
+        data = request.json or {}
+        kind = data.get("kind", "")
+        if kind not in job_kinds:
+            return jsonify(error="Unbekannte Job-Art."), 400
+
+        params = {
+            k: v.strip() if isinstance(v, str) else v
+            for k, v in data.items()
+            if k not in ("kind", "api_key")
+        }
+        required, _ = job_kinds[kind]
+        if not params.get("api_url") or not all(params.get(f) for f in required):
+            return jsonify(error=f"Erforderlich: api_url, {', '.join(required)}."), 400
+
+        _get_api_key(params["api_url"], data.get("api_key", "").strip(), params.get("model", ""))
+        params["user_id"] = current_user.id
+        job_id = job_queue.submit(kind, params, current_user.id)
+        return jsonify(job_id=job_id, status="queued"), 202
+
+    @app.route("/jobs/<job_id>")
+    @login_required
+    def job_status(job_id: str):
+        """Liefert Status, Ergebnis oder Fehler eines eigenen Jobs."""
+        job = job_queue.get(job_id, current_user.id)
+        if job is None:
+            return jsonify(error="Job nicht gefunden."), 404
+        return jsonify(job), 200
+
+    @app.route("/jobs/<job_id>/cancel", methods=["POST"])
+    @login_required
+    def cancel_job(job_id: str):
+        """Bricht einen wartenden Job ab bzw. fordert den Abbruch eines laufenden Jobs an."""
+        status = job_queue.cancel(job_id, current_user.id)
+        if status is None:
+            return jsonify(error="Job nicht gefunden."), 404
+        return jsonify(job_id=job_id, status=status), 200
 
     @app.route("/gitlab_issues", methods=["POST"])
     @login_required
@@ -293,7 +1108,8 @@ def create_app(config: dict = None) -> Flask:
 
         try:
             issues = create_issues_from_tickets(
-                tickets_file, gitlab_url, project_id, token
+                tickets_file, gitlab_url, project_id, token,
+                max_workers=app.config["GITLAB_EXPORT_WORKERS"],
             )
             return jsonify(issues=issues), 200
         except Exception as e:
@@ -304,31 +1120,68 @@ def create_app(config: dict = None) -> Flask:
     def structure():
         """
         Gibt die Ordner- und Dateistruktur des Projekts als JSON-Tree zurück.
+
+        Die Struktur stammt aus dem Storage-Backend (`storage.backends`; im
+        Dateisystem aus dem gecachten Index `storage.tree_index`). Wird `path`
+        angegeben, liefert die Route stattdessen nur die Einträge dieses
+        Verzeichnisses (`listing`) – Dateien seitenweise über `offset` und `limit`.
         """
         data = request.json or {}
         project_folder = data.get("project_folder", "").strip()
 
         if not project_folder:
             return jsonify(error="Projektordner erforderlich."), 400
+        backend = backends.get_backend()
+        if not backend.exists(project_folder):
+            return jsonify(structure={}), 200
 
-        tree = {}
-        for root, dirs, files in os.walk(project_folder):
-            rel = os.path.relpath(root, project_folder)
-            node = tree
-            if rel != ".":
-                for part in rel.split(os.sep):
-                    node = node.setdefault(part, {})
-            for d in dirs:
-                node.setdefault(d, {})
-            for f in files:
-                node[f] = None
-        return jsonify(structure=tree), 200
+        if "path" not in data:
+            return jsonify(structure=backend.tree(project_folder)), 200
+
+        try:
+            offset = max(0, int(data.get("offset") or 0))
+            limit = data.get("limit")
+            limit = None if limit is None else max(1, int(limit))
+        except (TypeError, ValueError):
+            return jsonify(error="offset und limit müssen Zahlen sein."), 400
+        try:
+            listing = backend.list_dir(
+                project_folder, str(data["path"]).strip().strip("/"), offset, limit
+            )
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        except FileNotFoundError as e:
+            return jsonify(error=str(e)), 404
+        return jsonify(listing=listing), 200
+
+    @app.route("/logs", methods=["POST"])
+    @login_required
+    def logs():
+        """
+        Liefert gespeicherte LLM-Aufrufe eines Projekts aus dem Log-Speicher,
+        optional gefiltert nach Zeitraum (`start`/`end` in Epoch-Sekunden) und `ticket`.
+        """
+        data = request.json or {}
+        project_folder = data.get("project_folder", "").strip()
+        if not project_folder:
+            return jsonify(error="Projektordner erforderlich."), 400
+        try:
+            filters = {
+                "start": None if data.get("start") is None else float(data["start"]),
+                "end": None if data.get("end") is None else float(data["end"]),
+                "limit": None if data.get("limit") is None else int(data["limit"]),
+                "ticket": data.get("ticket"),
+            }
+        except (TypeError, ValueError):
+            return jsonify(error="start, end und limit müssen Zahlen sein."), 400
+        return jsonify(records=query_responses(project_folder, **filters)), 200
 
     @app.route("/file_content", methods=["POST"])
     @login_required
     def file_content():
         """
-        Liest den Inhalt einer Datei im Projektverzeichnis und liefert ihn als Text zurück.
+        Liest den Inhalt einer Datei im Projekt (über `storage.backends`) und
+        liefert ihn als Text zurück.
         """
         data = request.json or {}
         project_folder = data.get("project_folder", "").strip()
@@ -337,14 +1190,17 @@ def create_app(config: dict = None) -> Flask:
         if not project_folder or not file_path:
             return jsonify(error="Projektordner und file_path erforderlich."), 400
 
-        abs_path = os.path.join(project_folder, file_path)
         try:
-            with open(abs_path, encoding="utf-8") as f:
-                content = f.read()
+            content = backends.get_backend().read_text(project_folder, file_path)
         except Exception as e:
             return jsonify(error=str(e)), 500
         return jsonify(content=content), 200
 
+    # Optional: nach einem Neustart liegengebliebene Jobs wieder aufnehmen
+    if app.config["JOB_RECOVER_ON_START"]:
+        with app.app_context():
+            job_queue.recover()
+
     return app
 
 